@@ -4,6 +4,7 @@ import re
 import math
 import json
 import logging
+import weakref
 import itertools
 
 from pysb import (Model, Monomer, Parameter, Expression, Observable, Rule,
@@ -11,6 +12,11 @@ from pysb import (Model, Monomer, Parameter, Expression, Observable, Rule,
         ReactionPattern, ANY, WILD, InvalidInitialConditionError)
 from pysb.core import SelfExporter
 import pysb.export
+try:
+    from pysb import Initial
+# pysb < 1.8
+except ImportError:
+    Initial = None
 
 from indra import statements as ist
 from indra.databases import context_client, get_identifiers_url
@@ -92,6 +98,11 @@ def get_agent_rule_str(agent):
 
 def add_rule_to_model(model, rule, annotations=None):
     """Add a Rule to a PySB model and handle duplicate component errors."""
+    # Rules generated by several Statements have the same name so this is
+    # checked before trying to add the rule
+    if model.rules.get(rule.name) is not None:
+        logger.debug("Rule %s already in model! Skipping." % rule.name)
+        return
     try:
         model.add_component(rule)
         # If the rule was actually added, also add the annotations
@@ -124,12 +135,16 @@ def get_create_parameter(model, param):
         return parameter
 
     if param.unique:
-        pnum = 1
+        # The search for a free number starts after the last number given
+        # to a parameter with this name in the model
+        param_nums = _unique_param_nums.setdefault(model, {})
+        pnum = param_nums.get(norm_name, 1)
         while True:
             pname = norm_name + '_%d' % pnum
             if model.parameters.get(pname) is None:
                 break
             pnum += 1
+        param_nums[norm_name] = pnum + 1
     else:
         pname = norm_name
 
@@ -138,6 +153,9 @@ def get_create_parameter(model, param):
     return parameter
 
 
+_unique_param_nums = weakref.WeakKeyDictionary()
+
+
 def get_uncond_agent(agent):
     """Construct the unconditional state of an Agent.
 
@@ -175,30 +193,19 @@ def grounded_monomer_patterns(model, agent, ignore_activities=False):
         if not monomer:
             return
         yield monomer()
-    # Iterate over all model annotations to identify the monomer associated
-    # with this agent
+    # Look up the monomer associated with this agent by its grounding. If
+    # several monomers match, the one annotated first is returned.
+    ann_index = _get_annotation_index(model)
     monomer = None
-    for ann in model.annotations:
-        if monomer:
-            break
-        if not ann.predicate == 'is':
-            continue
-        if not isinstance(ann.subject, Monomer):
-            continue
-        (ns, id) = parse_identifiers_url(ann.object)
-        if ns is None and id is None:
+    monomer_pos = None
+    for db_ns, db_id in agent.db_refs.items():
+        # Only string IDs can match the IDs parsed from identifiers.org URLs
+        if not isinstance(db_id, basestring):
             continue
-        # We now have an identifiers.org namespace/ID for a given monomer;
-        # we check to see if there is a matching identifier in the db_refs
-        # for this agent
-        for db_ns, db_id in agent.db_refs.items():
-            # We've found a match! Return first match
-            # FIXME Could also update this to check for alternative
-            # FIXME matches, or make sure that all grounding IDs match,
-            # FIXME etc.
-            if db_ns == ns and db_id == id:
-                monomer = ann.subject
-                break
+        pos_monomer = ann_index.monomers_by_grounding.get((db_ns, db_id))
+        if pos_monomer is not None and \
+                (monomer_pos is None or pos_monomer[0] < monomer_pos):
+            monomer_pos, monomer = pos_monomer
     # We looked at all the annotations in the model and didn't find a
     # match
     if monomer is None:
@@ -264,11 +271,9 @@ def grounded_monomer_patterns(model, agent, ignore_activities=False):
         # FIXME act_type = agent.activity.activity_type
         rel_type = 'has_active_pattern' if agent.activity.is_active \
                                         else 'has_inactive_pattern'
-        active_form_list = []
-        for ann in model.annotations:
-            if ann.subject == monomer and ann.predicate == rel_type:
-                # The annotation object contains the active/inactive pattern
-                active_form_list.append(ann.object)
+        # The annotation objects contain the active/inactive patterns
+        active_form_list = \
+            list(ann_index.objects_by_subject.get((monomer, rel_type), []))
         sc_list.append(active_form_list)
     # Now that we've got a list of conditions
     for pattern_combo in itertools.product(*sc_list):
@@ -280,14 +285,63 @@ def grounded_monomer_patterns(model, agent, ignore_activities=False):
     if not sc_list:
         yield monomer()
 
+
 def rules_with_annotation(model, monomer_name, predicate):
-    rules = []
-    for ann in model.annotations:
-        if not ann.predicate == predicate:
-            continue
-        if ann.object == monomer_name:
-            rules.append(model.rules[ann.subject])
-    return rules
+    """Return the rules annotated with a monomer name and predicate."""
+    ann_index = _get_annotation_index(model)
+    return [model.rules[rule_name] for rule_name in
+            ann_index.subjects_by_object.get((monomer_name, predicate), [])]
+
+
+class _AnnotationIndex(object):
+    """An index of the annotations of a PySB model.
+
+    The index is extended with the annotations added to the model since it
+    was last updated, so that looking up monomers by grounding and rules by
+    annotation doesn't require iterating over all the annotations.
+    """
+    def __init__(self, annotations):
+        self.annotations = annotations
+        self.n_indexed = 0
+        # (namespace, ID) -> (position of the annotation, Monomer)
+        self.monomers_by_grounding = {}
+        # (Monomer, predicate) -> list of annotation objects
+        self.objects_by_subject = {}
+        # (object, predicate) -> list of annotation subjects, for string
+        # objects such as monomer names
+        self.subjects_by_object = {}
+
+    def update(self):
+        for pos in range(self.n_indexed, len(self.annotations)):
+            ann = self.annotations[pos]
+            if isinstance(ann.subject, Monomer):
+                self.objects_by_subject.setdefault(
+                    (ann.subject, ann.predicate), []).append(ann.object)
+                if ann.predicate == 'is':
+                    ns, id = parse_identifiers_url(ann.object)
+                    if ns is not None or id is not None:
+                        self.monomers_by_grounding.setdefault(
+                            (ns, id), (pos, ann.subject))
+            if isinstance(ann.object, basestring):
+                self.subjects_by_object.setdefault(
+                    (ann.object, ann.predicate), []).append(ann.subject)
+        self.n_indexed = len(self.annotations)
+
+
+_annotation_indices = weakref.WeakKeyDictionary()
+
+
+def _get_annotation_index(model):
+    """Return the annotation index of a model, updated to its annotations."""
+    ann_index = _annotation_indices.get(model)
+    # The index is rebuilt if the list of annotations was replaced or
+    # shortened, otherwise only the new annotations are indexed
+    if ann_index is None or ann_index.annotations is not model.annotations \
+            or ann_index.n_indexed > len(model.annotations):
+        ann_index = _AnnotationIndex(model.annotations)
+        _annotation_indices[model] = ann_index
+    ann_index.update()
+    return ann_index
 
 
 def get_monomer_pattern(model, agent, extra_fields=None):
@@ -377,6 +431,55 @@ def get_site_pattern(agent):
 
 def set_base_initial_condition(model, monomer, value):
     """Set an initial condition for a monomer in its 'default' state."""
+    mp = _get_base_initial_pattern(monomer)
+    pname = monomer.name + '_0'
+    try:
+        p = model.parameters[pname]
+        p.value = value
+    except KeyError:
+        p = Parameter(pname, value)
+        model.add_component(p)
+        model.initial(mp, p)
+
+
+def set_base_initial_conditions(model, value):
+    """Set initial conditions for all monomers in their 'default' state.
+
+    This gives the same result as calling set_base_initial_condition for
+    each monomer. However, PySB checks each new initial condition against
+    all the existing ones in the model, which takes quadratic time, while
+    here it is only checked against those of the same monomer.
+    """
+    if Initial is None:
+        for monomer in model.monomers:
+            set_base_initial_condition(model, monomer, value)
+        return
+    # Patterns of a single monomer can only be equivalent to patterns of
+    # the same monomer
+    patterns_by_monomer = {}
+    for initial in model.initials:
+        mps = initial.pattern.monomer_patterns
+        if len(mps) == 1:
+            patterns_by_monomer.setdefault(mps[0].monomer.name,
+                                           []).append(initial.pattern)
+    for monomer in model.monomers:
+        pname = monomer.name + '_0'
+        p = model.parameters.get(pname)
+        if p is not None:
+            p.value = value
+            continue
+        p = Parameter(pname, value)
+        model.add_component(p)
+        initial = Initial(_get_base_initial_pattern(monomer), p)
+        monomer_patterns = patterns_by_monomer.setdefault(monomer.name, [])
+        if any(initial.pattern.is_equivalent_to(pattern)
+               for pattern in monomer_patterns):
+            raise InvalidInitialConditionError('Duplicate species')
+        model.initials.append(initial)
+        monomer_patterns.append(initial.pattern)
+
+
+def _get_base_initial_pattern(monomer):
     # Build up monomer pattern dict
     sites_dict = {}
     for site in monomer.sites:
@@ -387,15 +490,8 @@ def set_base_initial_condition(model, monomer, value):
                 sites_dict[site] = monomer.site_states[site][0]
         else:
             sites_dict[site] = None
-    mp = monomer(**sites_dict)
-    pname = monomer.name + '_0'
-    try:
-        p = model.parameters[pname]
-        p.value = value
-    except KeyError:
-        p = Parameter(pname, value)
-        model.add_component(p)
-        model.initial(mp, p)
+    return monomer(**sites_dict)
+
 
 def set_extended_initial_condition(model, monomer=None, value=0):
     """Set an initial condition for monomers in "modified" state.
@@ -644,8 +740,7 @@ class PysbAssembler(object):
             value_num = self.default_initial_amount
         if self.model is None:
             return
-        for m in self.model.monomers:
-            set_base_initial_condition(self.model, m, value_num)
+        set_base_initial_conditions(self.model, value_num)
 
     def set_expression(self, expression_dict):
         """Set protein expression amounts as initial conditions
@@ -6,8 +6,10 @@ import json
 import numpy
 import logging
 import networkx
+import itertools
 from os import path, pardir
 from collections import namedtuple
+from indra.statements import cached_matches_keys
 
 
 logger = logging.getLogger(__name__)
@@ -181,6 +183,60 @@ class SimpleScorer(BeliefScorer):
         all_evidence = st.evidence + extra_evidence
         return self.score_evidence_list(all_evidence)
 
+    def score_evidence_counts(self, tags, pos_counts, neg_counts):
+        """Return belief scores given counts of evidence by source and subtype.
+
+        This computes the same scores as `score_evidence_list` for many
+        evidence lists at once, each evidence list being given as the number
+        of its positive and negative evidences with each (source, subtype)
+        tag.
+
+        Parameters
+        ----------
+        tags : list[tuple]
+            The list of (source, subtype) tags of evidences, as returned by
+            `tag_evidence_subtype`, corresponding to the columns of the
+            count matrices.
+        pos_counts : numpy.ndarray
+            A matrix with the number of non-negated evidences with each tag
+            (columns) in each evidence list (rows).
+        neg_counts : numpy.ndarray
+            A matrix with the number of negated evidences with each tag
+            (columns) in each evidence list (rows).
+
+        Returns
+        -------
+        numpy.ndarray
+            The belief score of each evidence list.
+        """
+        rand_factors = numpy.array(
+            [_get_random_noise_prior(stype, subtype,
+                                     self.prior_probs['rand'],
+                                     self.subtype_probs)
+             for stype, subtype in tags])
+        source_cols = {}
+        for col, (source, _) in enumerate(tags):
+            source_cols.setdefault(source, []).append(col)
+
+        def _score(counts):
+            neg_prob_prior = numpy.ones(counts.shape[0])
+            # Sources are multiplied in the same (sorted) order as in
+            # score_evidence_list and sources without evidence contribute
+            # a factor of 1
+            for source in sorted(source_cols):
+                cols = source_cols[source]
+                source_counts = counts[:, cols]
+                rand_prod = numpy.prod(rand_factors[cols] ** source_counts,
+                                       axis=1)
+                neg_prob_prior *= \
+                    numpy.where(source_counts.any(axis=1),
+                                self.prior_probs['syst'][source] + rand_prod,
+                                1)
+            return 1 - neg_prob_prior
+        pp = _score(pos_counts)
+        np = _score(neg_counts)
+        return pp * (1 - np)
+
     def check_prior_probs(self, statements):
         """Throw Exception if BeliefEngine parameter is missing.
 
@@ -291,6 +347,17 @@ default_scorer = SimpleScorer()
 class BeliefEngine(object):
     """Assigns beliefs to INDRA Statements based on supporting evidence.
 
+    Parameters
+    ----------
+    scorer : Optional[BeliefScorer]
+        A BeliefScorer object, the default SimpleScorer is used if None.
+    batch : Optional[bool]
+        If True, and the scorer is a SimpleScorer or a BayesianScorer, the
+        beliefs of all the Statements are computed at once with NumPy from
+        matrices of evidence counts by source and subtype, instead of
+        scoring each Statement's evidence list separately. The beliefs
+        are the same up to floating point rounding. Default: False
+
     Attributes
     ----------
     scorer : BeliefScorer
@@ -302,11 +369,26 @@ class BeliefEngine(object):
         verifies that the scorer has all the information it needs to score
         every statement in the list, and raises an exception if not.
     """
-    def __init__(self, scorer=None):
+    def __init__(self, scorer=None, batch=False):
         if scorer is None:
             scorer = default_scorer
         assert(isinstance(scorer, BeliefScorer))
         self.scorer = scorer
+        self.batch = batch
+
+    def _can_score_batch(self):
+        # Batch scoring reproduces SimpleScorer's scores so it can't be
+        # used with scorers that compute them differently
+        if not self.batch or not isinstance(self.scorer, SimpleScorer):
+            return False
+        scorer_cls = type(self.scorer)
+        for method in ('score_statement', 'score_evidence_list'):
+            if _get_function(getattr(scorer_cls, method)) is not \
+                    _get_function(getattr(SimpleScorer, method)):
+                logger.debug('Not using batch scoring since %s overrides %s'
+                             % (scorer_cls.__name__, method))
+                return False
+        return True
 
     def set_prior_probs(self, statements):
         """Sets the prior belief probabilities for a list of INDRA Statements.
@@ -325,6 +407,11 @@ class BeliefEngine(object):
             by this function.
         """
         self.scorer.check_prior_probs(statements)
+        if self._can_score_batch():
+            beliefs = _score_statements_batch(self.scorer, statements)
+            for st, belief in zip(statements, beliefs):
+                st.belief = belief
+            return
         for st in statements:
             st.belief = self.scorer.score_statement(st)
 
@@ -372,23 +459,31 @@ class BeliefEngine(object):
             msg = 'Cycle found in hierarchy graph: %s' % cyc
             assert False, msg
 
-        g = build_hierarchy_graph(statements)
-        assert_no_cycle(g)
-        ranked_stmts = get_ranked_stmts(g)
-        for st in ranked_stmts:
-            bps = _get_belief_package(st)
-            supporting_evidences = []
-            # NOTE: the last belief package in the list is this statement's own
-            for bp in bps[:-1]:
-                # Iterate over all the parent evidences and add only
-                # non-negated ones
-                for ev in bp.evidences:
-                    if not ev.epistemics.get('negated'):
-                        supporting_evidences.append(ev)
-            # Now add the Statement's own evidence
-            # Now score all the evidences
-            belief = self.scorer.score_statement(st, supporting_evidences)
-            st.belief = belief
+        with cached_matches_keys():
+            g = build_hierarchy_graph(statements)
+            assert_no_cycle(g)
+            ranked_stmts = get_ranked_stmts(g)
+            if self._can_score_batch():
+                beliefs = _score_statements_batch(self.scorer, ranked_stmts,
+                                                  hierarchy=True)
+                for st, belief in zip(ranked_stmts, beliefs):
+                    st.belief = belief
+                return
+            for st in ranked_stmts:
+                bps = _get_belief_package(st)
+                supporting_evidences = []
+                # NOTE: the last belief package in the list is this
+                # statement's own
+                for bp in bps[:-1]:
+                    # Iterate over all the parent evidences and add only
+                    # non-negated ones
+                    for ev in bp.evidences:
+                        if not ev.epistemics.get('negated'):
+                            supporting_evidences.append(ev)
+                # Now add the Statement's own evidence
+                # Now score all the evidences
+                belief = self.scorer.score_statement(st, supporting_evidences)
+                st.belief = belief
 
     def set_linked_probs(self, linked_statements):
         """Sets the belief probabilities for a list of linked INDRA Statements.
@@ -412,6 +507,121 @@ class BeliefEngine(object):
 BeliefPackage = namedtuple('BeliefPackage', 'statement_key evidences')
 
 
+def _get_function(method):
+    # Unbound methods in Python 2 wrap the function defined in the class
+    return getattr(method, '__func__', method)
+
+
+def _score_statements_batch(scorer, stmts, hierarchy=False, chunk_size=10000):
+    """Return the beliefs of Statements computed with evidence count matrices.
+
+    If hierarchy is True, the non-negated evidences of all the Statements
+    that each Statement supports, directly or indirectly, are counted
+    towards its belief, as in BeliefEngine.set_hierarchy_probs.
+    """
+    # The Statements to score come first, followed by the Statements they
+    # support which are only needed for their evidence counts
+    all_stmts = list(stmts)
+    if hierarchy:
+        rows = {st.matches_key(): row for row, st in enumerate(all_stmts)}
+        stack = [sup for st in all_stmts for sup in st.supports]
+        while stack:
+            st = stack.pop()
+            key = st.matches_key()
+            if key in rows:
+                continue
+            rows[key] = len(all_stmts)
+            all_stmts.append(st)
+            stack += st.supports
+        descendants = _get_descendant_rows(
+            [[rows[sup.matches_key()] for sup in st.supports]
+             for st in all_stmts])
+    tags, pos_counts, neg_counts = _get_evidence_counts(all_stmts)
+    beliefs = []
+    for start in range(0, len(stmts), chunk_size):
+        end = min(start + chunk_size, len(stmts))
+        chunk_pos = pos_counts[start:end].copy()
+        if hierarchy:
+            desc_rows = [sorted(descendants[row])
+                         for row in range(start, end)]
+            lengths = numpy.array([len(dr) for dr in desc_rows],
+                                  dtype=numpy.int64)
+            nonempty = numpy.flatnonzero(lengths)
+            if len(nonempty):
+                indices = numpy.fromiter(itertools.chain(*desc_rows),
+                                         dtype=numpy.int64,
+                                         count=int(lengths.sum()))
+                starts = (numpy.cumsum(lengths) - lengths)[nonempty]
+                chunk_pos[nonempty] += \
+                    numpy.add.reduceat(pos_counts[indices], starts, axis=0)
+        beliefs += scorer.score_evidence_counts(tags, chunk_pos,
+                                                neg_counts[start:end]).tolist()
+    return beliefs
+
+
+def _get_descendant_rows(supports_rows):
+    """Return the set of rows each row supports directly or indirectly."""
+    # Rows are visited in post-order so that the descendants of a row are
+    # known by the time the row itself is reached
+    descendants = [None] * len(supports_rows)
+    for root in range(len(supports_rows)):
+        if descendants[root] is not None:
+            continue
+        stack = [(root, False)]
+        while stack:
+            row, children_done = stack.pop()
+            if descendants[row] is not None:
+                continue
+            if not children_done:
+                stack.append((row, True))
+                stack += [(child, False) for child in supports_rows[row]
+                          if descendants[child] is None]
+                continue
+            desc = set()
+            for child in supports_rows[row]:
+                desc.add(child)
+                desc |= descendants[child] or set()
+            desc.discard(row)
+            descendants[row] = desc
+    return descendants
+
+
+def _get_evidence_counts(stmts):
+    """Return matrices of evidence counts by tag for a list of Statements."""
+    tags = []
+    tag_cols = {}
+    # Tagging evidence can involve regular expression matching so tags are
+    # cached by the values they are determined by
+    tag_cache = {}
+    entries = {False: ([], []), True: ([], [])}
+    for row, stmt in enumerate(stmts):
+        for ev in stmt.evidence:
+            ann = ev.annotations
+            tag_key = (ev.source_api, ann.get('found_by'),
+                       ann.get('source_sub_id'), ann.get('actiontype'))
+            tag = tag_cache.get(tag_key)
+            if tag is None:
+                tag = tag_evidence_subtype(ev)
+                tag_cache[tag_key] = tag
+            col = tag_cols.get(tag)
+            if col is None:
+                col = len(tags)
+                tag_cols[tag] = col
+                tags.append(tag)
+            rows, cols = entries[bool(ev.epistemics.get('negated'))]
+            rows.append(row)
+            cols.append(col)
+    counts = []
+    for negated in (False, True):
+        rows, cols = entries[negated]
+        flat_idx = numpy.array(rows, dtype=numpy.int64) * len(tags) + \
+            numpy.array(cols, dtype=numpy.int64)
+        counts.append(numpy.bincount(flat_idx,
+                                     minlength=len(stmts) * len(tags))
+                      .reshape(len(stmts), len(tags)))
+    return tags, counts[0], counts[1]
+
+
 def _get_belief_package(stmt):
     """Return the belief packages of a given statement recursively."""
     # This list will contain the belief packages for the given statement
@@ -471,8 +681,10 @@ def evidence_random_noise_prior(evidence, type_probs, subtype_probs):
     Otherwise, gives the random-noise prior for the overall rule type.
     """
     (stype, subtype) = tag_evidence_subtype(evidence)
-    # Get the subtype, if available
+    return _get_random_noise_prior(stype, subtype, type_probs, subtype_probs)
+
 
+def _get_random_noise_prior(stype, subtype, type_probs, subtype_probs):
     # Return the subtype random noise prior, if available
     if subtype_probs is not None:
         if stype in subtype_probs:
@@ -0,0 +1,172 @@
+"""Benchmark the ModelChecker on a large PySB model.
+
+The model is assembled from random Statements between human genes. First,
+the rules matching the subjects of the Statements are found both by
+matching against every rule in the model and by looking them up in a
+RuleLhsIndex. Then, another set of random Statements is checked against the
+model one by one and in a batch with check_model, and the results are
+compared with those of enumerating the paths with _find_sources and
+_find_sources_with_paths, as was done before paths were found with a single
+search upstream of each observable.
+
+Usage: python benchmark_model_checker.py [num_stmts]
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+import sys
+import time
+import random
+import logging
+from indra.statements import *
+from indra.databases import hgnc_client
+from indra.assemblers.pysb import PysbAssembler
+from indra.assemblers.pysb import assembler as pa
+from indra.explanation.model_checker import ModelChecker, RuleLhsIndex, \
+    PathMetric, PathResult, _match_lhs, _find_sources, \
+    _find_sources_with_paths, _flip
+
+logger = logging.getLogger('benchmark_model_checker')
+
+
+def get_random_stmts(num_stmts, num_genes=500, seed=1):
+    """Return random Statements between a set of human genes."""
+    random.seed(seed)
+    hgnc_ids = sorted(hgnc_client.hgnc_names)[:num_genes]
+    agents = [Agent(hgnc_client.hgnc_names[hgnc_id],
+                    db_refs={'HGNC': hgnc_id})
+              for hgnc_id in hgnc_ids]
+    stmt_types = [Phosphorylation, Dephosphorylation, Activation,
+                  Inhibition, IncreaseAmount, DecreaseAmount]
+    stmts = []
+    for _ in range(num_stmts):
+        subj, obj = random.sample(agents, 2)
+        stmts.append(random.choice(stmt_types)(subj, obj))
+    return stmts
+
+
+def make_model(stmts):
+    pysb_asmb = PysbAssembler(stmts)
+    ts = time.time()
+    model = pysb_asmb.make_model(policies='one_step')
+    print('Assembled %d rules from %d statements in %.2fs' %
+          (len(model.rules), len(stmts), time.time() - ts))
+    return model
+
+
+def run_benchmark(num_stmts):
+    stmts = get_random_stmts(num_stmts)
+    model = make_model(stmts)
+
+    subj_mps = []
+    for stmt in stmts:
+        subj_mps += list(pa.grounded_monomer_patterns(model,
+                                                      stmt.agent_list()[0],
+                                                      ignore_activities=True))
+
+    ts = time.time()
+    old_matches = [_match_lhs(mp, model.rules) for mp in subj_mps]
+    old_time = time.time() - ts
+
+    ts = time.time()
+    index = RuleLhsIndex(model.rules)
+    build_time = time.time() - ts
+    ts = time.time()
+    new_matches = [index.match(mp) for mp in subj_mps]
+    new_time = time.time() - ts
+
+    assert old_matches == new_matches
+    print('Matched %d monomer patterns' % len(subj_mps))
+    print('Matching against all rules: %.2fs' % old_time)
+    print('Index lookup: %.2fs (%.2fs to build the index)' %
+          (new_time, build_time))
+
+
+class ReferenceModelChecker(ModelChecker):
+    """A ModelChecker which enumerates the paths to each observable.
+
+    The influence map generated by another ModelChecker is reused.
+    """
+    def __init__(self, model, statements, im):
+        super(ReferenceModelChecker, self).__init__(model, statements)
+        self._reference_im = im
+
+    def generate_im(self, model):
+        return self._reference_im
+
+    def _find_im_paths(self, subj_mp, obs_name, target_polarity,
+                       max_paths=1, max_path_length=5):
+        if subj_mp is None:
+            input_rule_set = None
+        else:
+            input_rule_set = self._get_input_rules(subj_mp)
+            if not input_rule_set:
+                return PathResult(False, 'INPUT_RULES_NOT_FOUND',
+                                  max_paths, max_path_length)
+        im = self.get_im()
+        path_metrics = [PathMetric(source, obs_name, polarity, path_length)
+                        for source, polarity, path_length in
+                        _find_sources(im, obs_name, input_rule_set,
+                                      target_polarity)]
+        if not path_metrics:
+            return PathResult(False, 'NO_PATHS_FOUND', max_paths,
+                              max_path_length)
+        if max_paths == 0:
+            result_code = 'MAX_PATHS_ZERO'
+        elif min(pm.length for pm in path_metrics) > max_path_length:
+            result_code = 'MAX_PATH_LENGTH_EXCEEDED'
+        else:
+            result_code = 'PATHS_FOUND'
+        pr = PathResult(True, result_code, max_paths, max_path_length)
+        pr.path_metrics = path_metrics
+        if result_code != 'PATHS_FOUND':
+            return pr
+        for path in _find_sources_with_paths(im, obs_name, input_rule_set,
+                                             target_polarity):
+            pr.add_path(_flip(im, path))
+            if len(pr.paths) >= max_paths:
+                break
+        return pr
+
+
+def run_check_model_benchmark(num_stmts, max_paths=1, max_path_length=5):
+    model = make_model(get_random_stmts(num_stmts))
+    test_stmts = get_random_stmts(num_stmts, seed=2)
+    mc = ModelChecker(model, test_stmts)
+    ts = time.time()
+    mc.get_im()
+    print('Generated the influence map in %.2fs' % (time.time() - ts))
+    ref_mc = ReferenceModelChecker(model, test_stmts, mc.get_im())
+
+    ts = time.time()
+    ref_results = [ref_mc.check_statement(stmt, max_paths, max_path_length)
+                   for stmt in test_stmts]
+    ref_time = time.time() - ts
+
+    ts = time.time()
+    stmt_results = [mc.check_statement(stmt, max_paths, max_path_length)
+                    for stmt in test_stmts]
+    stmt_time = time.time() - ts
+
+    ts = time.time()
+    model_results = [res for _, res in mc.check_model(max_paths,
+                                                      max_path_length)]
+    model_time = time.time() - ts
+
+    # The results of both ways of checking are the same as the ones of
+    # enumerating the paths
+    for ref_res, stmt_res, model_res in zip(ref_results, stmt_results,
+                                            model_results):
+        for res in (stmt_res, model_res):
+            assert res.result_code == ref_res.result_code
+            assert res.paths == ref_res.paths
+            assert [pm.__dict__ for pm in res.path_metrics] == \
+                [pm.__dict__ for pm in ref_res.path_metrics]
+    print('Checked %d statements' % len(test_stmts))
+    print('Enumerating paths one by one: %.2fs' % ref_time)
+    print('Checking statements one by one: %.2fs' % stmt_time)
+    print('Checking statements in a batch: %.2fs' % model_time)
+
+if __name__ == '__main__':
+    logging.getLogger('indra').setLevel(logging.WARNING)
+    num_stmts = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    run_benchmark(num_stmts)
+    run_check_model_benchmark(num_stmts)
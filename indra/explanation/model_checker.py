@@ -1,11 +1,13 @@
 from __future__ import print_function, unicode_literals, absolute_import
 from builtins import dict, str
 from future.utils import python_2_unicode_compatible
+import sys
 import logging
 import numbers
 import textwrap
 import networkx as nx
 import itertools
+import multiprocessing as mp
 import numpy as np
 import scipy.stats
 from copy import deepcopy
@@ -182,6 +184,8 @@ class ModelChecker(object):
         self.agent_to_obs = {}
         # Map between rules and downstream observables
         self.rule_obs_dict = {}
+        # Index of the reactant patterns of the rules in the model
+        self._rule_lhs_index = None
 
     def add_statements(self, stmts):
         """Add to the list of statements to check against the model.
@@ -326,9 +330,14 @@ class ModelChecker(object):
             self.rule_obs_dict[rule.name] = obs_list
         return self._im
 
-    def check_model(self, max_paths=1, max_path_length=5):
+    def check_model(self, max_paths=1, max_path_length=5, poolsize=None):
         """Check all the statements added to the ModelChecker.
 
+        Unless paths are sampled, the Statements are checked in a batch:
+        the influence map is searched upstream of each observable once, and
+        the paths to the subjects of all the Statements with that observable
+        are found from the same search.
+
         Parameters
         ----------
         max_paths : Optional[int]
@@ -336,6 +345,10 @@ class ModelChecker(object):
             to be explained. Default: 1
         max_path_length : Optional[int]
             The maximum length of specific paths to return. Default: 5
+        poolsize : Optional[int]
+            The number of worker processes to use to search the influence
+            map upstream of the observables. If None, the search is done in
+            the current process. Default: None
 
         Returns
         -------
@@ -343,12 +356,74 @@ class ModelChecker(object):
             Each tuple contains the Statement checked against the model and
             a PathResult object describing the results of model checking.
         """
+        if self.do_sampling:
+            results = []
+            for idx, stmt in enumerate(self.statements):
+                logger.info('---')
+                logger.info('Checking statement (%d/%d): %s' % \
+                    (idx + 1, len(self.statements), stmt))
+                result = self.check_statement(stmt, max_paths,
+                                              max_path_length)
+                results.append((stmt, result))
+            return results
+
+        # Make sure the influence map is initialized
+        im = self.get_im()
+        # Collect the input rules, observables and polarities to find paths
+        # for, grouped by observable
+        stmt_checks = []
+        obs_queries = {}
+        input_rules_by_mp = {}
+        for stmt in self.statements:
+            checks = self._get_statement_checks(stmt, max_paths,
+                                                max_path_length)
+            if isinstance(checks, PathResult):
+                stmt_checks.append(checks)
+                continue
+            queries = []
+            for subj_mp, obs_name, target_polarity in checks:
+                if subj_mp is None:
+                    input_rule_set = None
+                else:
+                    mp_key = str(subj_mp)
+                    if mp_key not in input_rules_by_mp:
+                        input_rules_by_mp[mp_key] = \
+                            frozenset(self._get_input_rules(subj_mp))
+                    input_rule_set = input_rules_by_mp[mp_key]
+                    if not input_rule_set:
+                        continue
+                query = (input_rule_set, target_polarity)
+                queries.append((obs_name, query))
+                obs_queries.setdefault(obs_name, set()).add(query)
+            stmt_checks.append(queries)
+        logger.info('Checking %d statements against %d observables' %
+                    (len(self.statements), len(obs_queries)))
+        query_args = [(obs_name, list(queries))
+                      for obs_name, queries in obs_queries.items()]
+        if poolsize is None:
+            path_results = _find_grouped_paths((im, query_args, max_paths,
+                                                max_path_length))
+        else:
+            path_results = _find_grouped_paths_mp(im, query_args, max_paths,
+                                                  max_path_length, poolsize)
+
         results = []
-        for idx, stmt in enumerate(self.statements):
-            logger.info('---')
-            logger.info('Checking statement (%d/%d): %s' % \
-                (idx + 1, len(self.statements), stmt))
-            result = self.check_statement(stmt, max_paths, max_path_length)
+        used_results = set()
+        for stmt, checks in zip(self.statements, stmt_checks):
+            if isinstance(checks, PathResult):
+                results.append((stmt, checks))
+                continue
+            for obs_name, query in checks:
+                result = path_results[(obs_name, query)]
+                if result.path_found:
+                    # Statements with the same query get separate results
+                    if id(result) in used_results:
+                        result = deepcopy(result)
+                    used_results.add(id(result))
+                    break
+            else:
+                result = PathResult(False, 'NO_PATHS_FOUND',
+                                    max_paths, max_path_length)
             results.append((stmt, result))
         return results
 
@@ -372,6 +447,31 @@ class ModelChecker(object):
         """
         # Make sure the influence map is initialized
         self.get_im()
+        checks = self._get_statement_checks(stmt, max_paths, max_path_length)
+        if isinstance(checks, PathResult):
+            return checks
+        for subj_mp, obs_name, target_polarity in checks:
+            # NOTE: Returns on the path found for the first enz_mp/obs combo
+            result = self._find_im_paths(subj_mp, obs_name, target_polarity,
+                                         max_paths, max_path_length)
+            # If a path was found, then we return it; otherwise, that means
+            # there was no path for this observable, so we have to try the next
+            # one
+            if result.path_found:
+                logger.info('Found paths for %s' % stmt)
+                return result
+        # If we got here, then there was no path for any observable
+        logger.info('No paths found for %s' % stmt)
+        return PathResult(False, 'NO_PATHS_FOUND',
+                          max_paths, max_path_length)
+
+    def _get_statement_checks(self, stmt, max_paths, max_path_length):
+        """Return the subject patterns and observables to check a Statement.
+
+        Returns a PathResult if the Statement can't be checked, otherwise
+        a list of (subject MonomerPattern, observable name, polarity)
+        tuples in the order in which they are to be checked.
+        """
         # Check if this is one of the statement types that we can check
         if not isinstance(stmt, (Modification, RegulateAmount,
                                  RegulateActivity, Influence)):
@@ -412,25 +512,14 @@ class ModelChecker(object):
             logger.info("No observables for stmt %s, returning False" % stmt)
             return PathResult(False, 'OBSERVABLES_NOT_FOUND',
                               max_paths, max_path_length)
-        for subj_mp, obs_name in itertools.product(subj_mps, obs_names):
-            # NOTE: Returns on the path found for the first enz_mp/obs combo
-            result = self._find_im_paths(subj_mp, obs_name, target_polarity,
-                                         max_paths, max_path_length)
-            # If a path was found, then we return it; otherwise, that means
-            # there was no path for this observable, so we have to try the next
-            # one
-            if result.path_found:
-                logger.info('Found paths for %s' % stmt)
-                return result
-        # If we got here, then there was no path for any observable
-        logger.info('No paths found for %s' % stmt)
-        return PathResult(False, 'NO_PATHS_FOUND',
-                          max_paths, max_path_length)
+        return [(subj_mp, obs_name, target_polarity)
+                for subj_mp, obs_name in itertools.product(subj_mps,
+                                                           obs_names)]
 
     def _get_input_rules(self, subj_mp):
         if subj_mp is None:
             raise ValueError("Cannot take None as an argument for subj_mp.")
-        input_rules = _match_lhs(subj_mp, self.model.rules)
+        input_rules = self._get_rule_lhs_index().match(subj_mp)
         logger.debug('Found %s input rules matching %s' %
                      (len(input_rules), str(subj_mp)))
         # Filter to include only rules where the subj_mp is actually the
@@ -450,6 +539,13 @@ class ModelChecker(object):
                      len(input_rule_set))
         return input_rule_set
 
+    def _get_rule_lhs_index(self):
+        # The index is rebuilt if the rules of the model changed
+        if self._rule_lhs_index is None or \
+                not self._rule_lhs_index.is_current(self.model.rules):
+            self._rule_lhs_index = RuleLhsIndex(self.model.rules)
+        return self._rule_lhs_index
+
     def _sample_paths(self, input_rule_set, obs_name, target_polarity,
                       max_paths=1, max_path_length=5):
         if max_paths == 0:
@@ -601,49 +697,13 @@ class ModelChecker(object):
                                max_paths, max_path_length)
 
         # -- Do Breadth-First Enumeration --
-        # Generate the predecessors to our observable and count the paths
-        path_lengths = []
-        path_metrics = []
-        for source, polarity, path_length in \
-                    _find_sources(self.get_im(), obs_name, input_rule_set,
-                                  target_polarity):
-
-            pm = PathMetric(source, obs_name, polarity, path_length)
-            path_metrics.append(pm)
-            path_lengths.append(path_length)
         logger.info('Finding paths between %s and %s with polarity %s' %
                     (subj_mp, obs_name, target_polarity))
-        # Now, look for paths
-        paths = []
-        if path_metrics and max_paths == 0:
-            pr = PathResult(True, 'MAX_PATHS_ZERO',
-                            max_paths, max_path_length)
-            pr.path_metrics = path_metrics
-            return pr
-        elif path_metrics:
-            if min(path_lengths) <= max_path_length:
-                pr = PathResult(True, 'PATHS_FOUND', max_paths, max_path_length)
-                pr.path_metrics = path_metrics
-                # Get the first path
-                path_iter = enumerate(_find_sources_with_paths(
-                                           self.get_im(), obs_name,
-                                           input_rule_set, target_polarity))
-                for path_ix, path in path_iter:
-                    flipped = _flip(self.get_im(), path)
-                    pr.add_path(flipped)
-                    if len(pr.paths) >= max_paths:
-                        break
-                return pr
-            # There are no paths shorter than the max path length, so we
-            # don't bother trying to get them
-            else:
-                pr = PathResult(True, 'MAX_PATH_LENGTH_EXCEEDED',
-                                max_paths, max_path_length)
-                pr.path_metrics = path_metrics
-                return pr
-        else:
-            return PathResult(False, 'NO_PATHS_FOUND',
-                              max_paths, max_path_length)
+        # The influence map can be pruned in place between checks, so the
+        # edges are looked up in it for each search
+        upstream = UpstreamSources(self.get_im(), obs_name)
+        return _get_path_result(self.get_im(), upstream, input_rule_set,
+                                target_polarity, max_paths, max_path_length)
 
     def score_paths(self, paths, agents_values, loss_of_function=False,
                     sigma=0.15, include_final_node=False):
@@ -1037,6 +1097,222 @@ def _find_sources(im, target, sources, polarity):
     return
 
 
+class UpstreamSources(object):
+    """The nodes upstream of a target in an influence map, with polarities.
+
+    The influence map is searched breadth-first upstream of the target once,
+    in the same order as by :py:func:`_find_sources`, and the result is
+    used to find the sources with paths of a given polarity to the target
+    for any set of sources.
+
+    Parameters
+    ----------
+    im : networkx.MultiDiGraph
+        Graph containing the influence map.
+    target : str
+        The node (observable name) in the influence map to search upstream
+        of.
+    signed_predecessors : Optional[dict]
+        The predecessors of each node in the influence map with the signs
+        of the edges to them, as returned by
+        :py:func:`get_signed_predecessor_map`, to reuse across searches
+        in the same influence map. If None, the edge signs are looked up
+        in the influence map for the nodes reached by the search.
+    """
+    def __init__(self, im, target, signed_predecessors=None):
+        if signed_predecessors is None:
+            def get_predecessors(node):
+                return _get_signed_predecessors(im, node, 1)
+        else:
+            def get_predecessors(node):
+                return signed_predecessors.get(node, [])
+        self.target = target
+        # For each node, the (visit order, polarity, path length) of each
+        # edge to it traversed in the search
+        self._visits_by_node = {}
+        # The (node, polarity) the search went to each (node, polarity)
+        # from when it was first reached, and the order it was reached in
+        self._parents = {}
+        self._first_visits = {}
+        target_tuple = (target, 1)
+        visited = set([target_tuple])
+        queue = deque([(target_tuple, 0)])
+        order = 0
+        while queue:
+            parent, path_length = queue.popleft()
+            for child, edge_sign in get_predecessors(parent[0]):
+                sign = edge_sign * parent[1]
+                self._visits_by_node.setdefault(child, []).append(
+                    (order, sign, path_length + 1))
+                if (child, sign) not in visited:
+                    visited.add((child, sign))
+                    self._parents[(child, sign)] = parent
+                    self._first_visits[(child, sign)] = \
+                        (path_length + 1, order)
+                    queue.append(((child, sign), path_length + 1))
+                order += 1
+
+    def find_sources(self, sources, polarity):
+        """Return the sources with paths of a given polarity to the target.
+
+        Parameters
+        ----------
+        sources : set of str or None
+            The nodes (rules) corresponding to the subject or upstream
+            influence being checked. If None, all nodes are sources.
+        polarity : int
+            Required polarity of the path between source and target.
+
+        Returns
+        -------
+        list of (source, polarity, path_length)
+            The same tuples as those generated by :py:func:`_find_sources`,
+            in the same order.
+        """
+        if sources is None:
+            sources = self._visits_by_node
+        found = []
+        for source in sources:
+            for order, sign, path_length in \
+                    self._visits_by_node.get(source, []):
+                if sign == polarity:
+                    found.append((order, source, path_length))
+        return [(source, polarity, path_length)
+                for _, source, path_length in sorted(found)]
+
+    def find_shortest_path(self, sources, polarity):
+        """Return a shortest path of a given polarity from a source.
+
+        Parameters
+        ----------
+        sources : set of str or None
+            The nodes (rules) corresponding to the subject or upstream
+            influence being checked. If None, all nodes are sources.
+        polarity : int
+            Required polarity of the path between source and target.
+
+        Returns
+        -------
+        tuple or None
+            The path from the target to the source, as a tuple of (node,
+            polarity) tuples, which is the first path generated by
+            :py:func:`_find_sources_with_paths`. None if there is no path.
+        """
+        if sources is None:
+            sources = self._visits_by_node
+        reached = [(self._first_visits[(source, polarity)],
+                    (source, polarity)) for source in sources
+                   if (source, polarity) in self._first_visits]
+        if not reached:
+            return None
+        node = min(reached)[1]
+        path = [node]
+        while node in self._parents:
+            node = self._parents[node]
+            path.append(node)
+        return tuple(reversed(path))
+
+
+def get_signed_predecessor_map(im):
+    """Return the predecessors of each node in an influence map with signs.
+
+    Parameters
+    ----------
+    im : networkx.MultiDiGraph
+        Graph containing the influence map.
+
+    Returns
+    -------
+    dict
+        A dict keyed by node, whose values are lists of (predecessor, edge
+        sign) tuples in the order of :py:func:`_get_signed_predecessors`.
+    """
+    return {node: list(_get_signed_predecessors(im, node, 1))
+            for node in im.nodes()}
+
+
+def _get_path_result(im, upstream, sources, polarity, max_paths,
+                     max_path_length):
+    """Return the PathResult for paths from sources to an observable."""
+    path_metrics = [PathMetric(source, upstream.target, sign, path_length)
+                    for source, sign, path_length in
+                    upstream.find_sources(sources, polarity)]
+    if not path_metrics:
+        return PathResult(False, 'NO_PATHS_FOUND',
+                          max_paths, max_path_length)
+    if max_paths == 0:
+        pr = PathResult(True, 'MAX_PATHS_ZERO', max_paths, max_path_length)
+        pr.path_metrics = path_metrics
+        return pr
+    # There are no paths shorter than the max path length, so we
+    # don't bother trying to get them
+    if min(pm.length for pm in path_metrics) > max_path_length:
+        pr = PathResult(True, 'MAX_PATH_LENGTH_EXCEEDED',
+                        max_paths, max_path_length)
+        pr.path_metrics = path_metrics
+        return pr
+    pr = PathResult(True, 'PATHS_FOUND', max_paths, max_path_length)
+    pr.path_metrics = path_metrics
+    # The first path is a shortest path, which doesn't need the paths
+    # to be enumerated
+    if max_paths == 1:
+        pr.add_path(_flip(im, upstream.find_shortest_path(sources,
+                                                          polarity)))
+        return pr
+    for path in _find_sources_with_paths(im, upstream.target, sources,
+                                         polarity):
+        pr.add_path(_flip(im, path))
+        if len(pr.paths) >= max_paths:
+            break
+    return pr
+
+
+def _find_grouped_paths(args):
+    """Return PathResults for sources and polarities grouped by observable.
+
+    The argument is a tuple of the influence map, a list of (observable
+    name, list of (sources, polarity)) tuples, max_paths and
+    max_path_length. The influence map is searched upstream of each
+    observable once. Returns a dict of PathResults keyed by (observable
+    name, (sources, polarity)).
+    """
+    im, obs_queries, max_paths, max_path_length = args
+    signed_predecessors = get_signed_predecessor_map(im)
+    path_results = {}
+    for obs_name, queries in obs_queries:
+        upstream = UpstreamSources(im, obs_name, signed_predecessors)
+        for sources, polarity in queries:
+            path_results[(obs_name, (sources, polarity))] = \
+                _get_path_result(im, upstream, sources, polarity,
+                                 max_paths, max_path_length)
+    return path_results
+
+
+def _find_grouped_paths_mp(im, obs_queries, max_paths, max_path_length,
+                           poolsize):
+    chunk_size = max(1, -(-len(obs_queries) // poolsize))
+    chunks = [(im, obs_queries[i:i + chunk_size], max_paths,
+               max_path_length)
+              for i in range(0, len(obs_queries), chunk_size)]
+    logger.info('Finding paths for %d observables in %d chunks using '
+                'multiprocessing with poolsize %d' %
+                (len(obs_queries), len(chunks), poolsize))
+    if sys.version_info[0] >= 3 and sys.version_info[1] >= 4:
+        ctx = mp.get_context('spawn')
+    else:
+        ctx = mp
+    pool = ctx.Pool(poolsize)
+    try:
+        chunk_results = pool.map(_find_grouped_paths, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    path_results = {}
+    for chunk_path_results in chunk_results:
+        path_results.update(chunk_path_results)
+    return path_results
+
+
 def _get_signed_predecessors(im, node, polarity):
     """Get upstream nodes in the influence map.
 
@@ -1124,6 +1400,91 @@ def _match_lhs(cp, rules):
     return rule_matches
 
 
+class RuleLhsIndex(object):
+    """An index of the reactant monomer patterns of the rules in a model.
+
+    The rules are indexed by the names of the monomers and by the site
+    conditions in their reactant patterns, so that the rules whose
+    left-hand side matches a monomer pattern can be looked up instead of
+    matched against every rule in the model.
+
+    Parameters
+    ----------
+    rules : list[pysb.Rule]
+        The rules to index, typically model.rules.
+    """
+    def __init__(self, rules):
+        self._source_rules = rules
+        self.rules = list(rules)
+        # Monomer name -> positions of rules with the monomer on the LHS
+        self._by_monomer = {}
+        # (monomer name, site, state) -> positions of rules with a monomer
+        # pattern with this site condition on the LHS
+        self._by_site_condition = {}
+        for pos, rule in enumerate(self.rules):
+            reactant_pattern = rule.rule_expression.reactant_pattern
+            for rule_cp in reactant_pattern.complex_patterns:
+                if rule_cp is None:
+                    continue
+                for mp in as_complex_pattern(rule_cp).monomer_patterns:
+                    name = mp.monomer.name
+                    self._by_monomer.setdefault(name, set()).add(pos)
+                    for site, state in mp.site_conditions.items():
+                        key = (name, site, _get_state_key(state))
+                        self._by_site_condition.setdefault(key,
+                                                           set()).add(pos)
+
+    def is_current(self, rules):
+        """Return True if the index is up to date with the given rules.
+
+        Rules are only added to a model, so the index is up to date if it
+        was built from the same set of rules and no rules were added since.
+        """
+        return rules is self._source_rules and len(rules) == len(self.rules)
+
+    def match(self, mp):
+        """Return the rules with a left-hand side matching a MonomerPattern.
+
+        Parameters
+        ----------
+        mp : pysb.MonomerPattern
+            The monomer pattern to match.
+
+        Returns
+        -------
+        list[pysb.Rule]
+            The rules, in the order of the model, with a reactant monomer
+            pattern that satisfies all the site conditions of mp. This is
+            the same as the result of _match_lhs on all the rules.
+        """
+        name = mp.monomer.name
+        positions = self._by_monomer.get(name, set())
+        # Each site condition narrows down the candidate rules, which are
+        # then checked by matching their reactant patterns directly
+        for site, state in mp.site_conditions.items():
+            if not positions:
+                break
+            site_positions = self._by_site_condition.get(
+                (name, site, _get_state_key(state)), set())
+            unhashable_positions = self._by_site_condition.get(
+                (name, site, _UNHASHABLE_STATE), set())
+            positions = positions & (site_positions | unhashable_positions)
+        return _match_lhs(mp, [self.rules[pos] for pos in sorted(positions)])
+
+
+# Site states that can't be used in dict keys, e.g., lists of bonds, are
+# indexed under this key and are always checked directly
+_UNHASHABLE_STATE = object()
+
+
+def _get_state_key(state):
+    try:
+        hash(state)
+    except TypeError:
+        return _UNHASHABLE_STATE
+    return state
+
+
 def _cp_embeds_into(cp1, cp2):
     """Check that any state in ComplexPattern2 is matched in ComplexPattern1.
     """
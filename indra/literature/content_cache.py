@@ -0,0 +1,189 @@
+"""A local cache of the content of articles by PMID.
+
+Getting the full text or abstract of an article from S3 or from the
+literature web services takes one or more requests per PMID, which adds up
+when a corpus of thousands of articles is read repeatedly. This module
+stores the gzipped content of articles, keyed by PMID and content type, in an
+SQLite database. Content that is not in the cache is fetched from an
+upstream source, e.g., :py:func:`indra.literature.s3_client.get_full_text`,
+for many PMIDs at a time in a pool of threads, and is added to the cache so
+that it isn't fetched again.
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import gzip
+import zlib
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+
+# The types of content in order of desirability, as in s3_client.get_full_text
+content_types = ('pmc_oa_xml', 'pmc_auth_xml', 'elsevier_xml', 'pmc_oa_txt',
+                 'txt', 'abstract')
+
+
+class ContentCache(object):
+    """An SQLite cache of article content with an optional upstream source.
+
+    Parameters
+    ----------
+    path : str
+        The path to the SQLite database file of the cache. The file is
+        created if it doesn't exist.
+    upstream : Optional[function]
+        A function taking a PMID and returning a (content, content_type)
+        tuple, or (None, None) if no content is found, for example,
+        :py:func:`indra.literature.s3_client.get_full_text`. The function is
+        called from multiple threads at once. If None, only content already
+        in the cache is returned. Default: None
+    timeout : Optional[float]
+        The number of seconds to wait for another process writing to the
+        cache to finish. Default: 60
+    """
+    def __init__(self, path, upstream=None, timeout=60):
+        self.path = path
+        self.upstream = upstream
+        self._conn = sqlite3.connect(path, timeout=timeout)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS content '
+                               '(pmid TEXT, content_type TEXT, content BLOB, '
+                               'PRIMARY KEY (pmid, content_type))')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the connection to the database."""
+        self._conn.close()
+
+    def get_content(self, pmid, content_type=None):
+        """Return the content of an article from the cache.
+
+        Parameters
+        ----------
+        pmid : str
+            The PMID of the article, with or without the PMID prefix.
+        content_type : Optional[str]
+            The type of content to return, e.g., 'abstract'. If None, the
+            most desirable type of content in the cache is returned.
+            Default: None
+
+        Returns
+        -------
+        tuple
+            The content and its type, or (None, None) if the article has no
+            content of the given type in the cache.
+        """
+        pmid = _get_pmid(pmid)
+        rows = self._conn.execute('SELECT content_type, content FROM content '
+                                  'WHERE pmid=?', (pmid,)).fetchall()
+        if content_type is not None:
+            rows = [row for row in rows if row[0] == content_type]
+        if not rows:
+            return (None, None)
+        ct, content_gz = min(rows, key=lambda row: _content_type_rank(row[0]))
+        return (_gunzip(content_gz), ct)
+
+    def put_content(self, pmid, content, content_type):
+        """Add the content of an article to the cache.
+
+        Parameters
+        ----------
+        pmid : str
+            The PMID of the article, with or without the PMID prefix.
+        content : str
+            The content of the article.
+        content_type : str
+            The type of the content, e.g., 'pmc_oa_xml' or 'abstract'.
+        """
+        self._put_contents([(_get_pmid(pmid), content, content_type)])
+
+    def get_contents(self, pmids, poolsize=10):
+        """Return the content of a list of articles.
+
+        The content found in the cache is returned directly. The content of
+        the other articles is fetched from the upstream source in a pool of
+        threads and added to the cache.
+
+        Parameters
+        ----------
+        pmids : list[str]
+            The PMIDs of the articles, with or without the PMID prefix.
+        poolsize : Optional[int]
+            The maximum number of requests to the upstream source made at
+            the same time. Default: 10
+
+        Returns
+        -------
+        dict
+            A dict of (content, content_type) tuples keyed by the PMIDs as
+            given. Articles without content have (None, None).
+        """
+        contents = {}
+        missing_pmids = []
+        for pmid in pmids:
+            contents[pmid] = self.get_content(pmid)
+            if contents[pmid][0] is None:
+                missing_pmids.append(pmid)
+        logger.info('Found %d articles in the cache' %
+                    (len(contents) - len(missing_pmids)))
+        if not missing_pmids or self.upstream is None:
+            return contents
+
+        logger.info('Getting %d articles from upstream' % len(missing_pmids))
+        # The threads only make requests, the cache is written to in this
+        # thread since the SQLite connection can't be shared between threads
+        with ThreadPoolExecutor(max_workers=poolsize) as executor:
+            futures = {executor.submit(self.upstream, pmid): pmid
+                       for pmid in missing_pmids}
+            new_contents = []
+            for future in as_completed(futures):
+                pmid = futures[future]
+                try:
+                    content, content_type = future.result()
+                except Exception as e:
+                    logger.error('Could not get content for %s: %s' %
+                                 (pmid, e))
+                    continue
+                contents[pmid] = (content, content_type)
+                if content is not None:
+                    new_contents.append((_get_pmid(pmid), content,
+                                         content_type))
+        self._put_contents(new_contents)
+        return contents
+
+    def _put_contents(self, contents):
+        rows = [(pmid, content_type, _gzip(content))
+                for pmid, content, content_type in contents]
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO content '
+                                   'VALUES (?, ?, ?)', rows)
+        logger.debug('Cached %d articles in %s' % (len(rows), self.path))
+
+
+def _get_pmid(pmid):
+    pmid = str(pmid)
+    if pmid.startswith('PMID'):
+        pmid = pmid[4:]
+    return pmid
+
+
+def _content_type_rank(content_type):
+    if content_type in content_types:
+        return content_types.index(content_type)
+    return len(content_types)
+
+
+def _gzip(content):
+    return sqlite3.Binary(gzip.compress(content.encode('utf8')))
+
+
+def _gunzip(content_gz):
+    return zlib.decompress(content_gz, 16+zlib.MAX_WBITS).decode('utf8')
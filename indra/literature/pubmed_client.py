@@ -1,10 +1,14 @@
 """
 Search and get metadata for articles in Pubmed.
 """
-import xml.etree.ElementTree as ET
-import requests
+import time
 import logging
+import threading
+import requests
+import xml.etree.ElementTree as ET
+from io import BytesIO
 from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from indra.databases import hgnc_client
 from indra.util import UnicodeXMLTreeBuilder as UTB
 
@@ -337,33 +341,39 @@ def get_metadata_from_xml_tree(tree, get_issns_from_nlm=False,
     results = {}
     pm_articles = tree.findall('./PubmedArticle')
     for art_ix, pm_article in enumerate(pm_articles):
-        medline_citation = pm_article.find('./MedlineCitation')
-
-        article_info = _get_article_info(medline_citation,
-                                         pm_article.find('PubmedData'))
-        journal_info = _get_journal_info(medline_citation, get_issns_from_nlm)
-        context_info = _get_annotations(medline_citation)
-
-        # Build the result
-        result = {}
-        result.update(article_info)
-        result.update(journal_info)
-        result.update(context_info)
-
-        # Get the abstracts if requested
-        if get_abstracts:
-            abstract = _abstract_from_article_element(
-                medline_citation.find('Article'),
-                prepend_title=prepend_title
-                )
-            result['abstract'] = abstract
-
+        result = _get_pubmed_article_metadata(pm_article, get_issns_from_nlm,
+                                              get_abstracts, prepend_title)
         # Add to dict
-        results[article_info['pmid']] = result
+        results[result['pmid']] = result
 
     return results
 
 
+def _get_pubmed_article_metadata(pm_article, get_issns_from_nlm,
+                                 get_abstracts, prepend_title):
+    medline_citation = pm_article.find('./MedlineCitation')
+
+    article_info = _get_article_info(medline_citation,
+                                     pm_article.find('PubmedData'))
+    journal_info = _get_journal_info(medline_citation, get_issns_from_nlm)
+    context_info = _get_annotations(medline_citation)
+
+    # Build the result
+    result = {}
+    result.update(article_info)
+    result.update(journal_info)
+    result.update(context_info)
+
+    # Get the abstracts if requested
+    if get_abstracts:
+        abstract = _abstract_from_article_element(
+            medline_citation.find('Article'),
+            prepend_title=prepend_title
+            )
+        result['abstract'] = abstract
+    return result
+
+
 def _get_annotations(medline_citation):
 
     def _major_topic(e):
@@ -392,6 +402,8 @@ def get_metadata_for_ids(pmid_list, get_issns_from_nlm=False,
                          get_abstracts=False, prepend_title=False):
     """Get article metadata for up to 200 PMIDs from the Pubmed database.
 
+    To get the metadata for more PMIDs, use iter_metadata_for_ids.
+
     Parameters
     ----------
     pmid_list : list of PMIDs as strings
@@ -425,6 +437,142 @@ def get_metadata_for_ids(pmid_list, get_issns_from_nlm=False,
                                       prepend_title)
 
 
+def iter_metadata_for_ids(pmid_list, get_issns_from_nlm=False,
+                          get_abstracts=False, prepend_title=False,
+                          chunk_size=200, poolsize=3, max_rate=3,
+                          transport=None):
+    """Yield article metadata for any number of PMIDs from Pubmed.
+
+    The PMIDs are split into chunks which are fetched from the Pubmed
+    database concurrently, while keeping the number of requests per second
+    under the limit of the NCBI E-utilities. The XML of each response is
+    parsed incrementally and the metadata of each article is yielded as soon
+    as its chunk arrives, so the chunks may come in any order.
+
+    Parameters
+    ----------
+    pmid_list : list of PMIDs as strings
+        The PMIDs to get metadata for.
+    get_issns_from_nlm : boolean
+        Look up the full list of ISSN number for the journal associated with
+        the article, which helps to match articles to CrossRef search results.
+        Defaults to False, since it slows down performance.
+    get_abstracts : boolean
+        Indicates whether to include the Pubmed abstract in the results.
+    prepend_title : boolean
+        If get_abstracts is True, specifies whether the article title should
+        be prepended to the abstract text.
+    chunk_size : Optional[int]
+        The number of PMIDs to fetch in one request. Default: 200
+    poolsize : Optional[int]
+        The number of requests made at the same time. Default: 3
+    max_rate : Optional[float]
+        The maximum number of requests started per second. NCBI allows 3
+        requests per second, or 10 with an API key. Default: 3
+    transport : Optional[function]
+        A function taking a URL and a dict of request parameters, and
+        returning the content of the response as bytes, or None if the
+        request failed. It is called from multiple threads at once. If None,
+        the requests are sent with one requests Session per thread.
+        Default: None
+
+    Returns
+    -------
+    generator of dict
+        A generator of dicts with the metadata of an article. Each dict
+        contains the same fields as the values returned by
+        get_metadata_for_ids, including 'pmid'.
+    """
+    if transport is None:
+        transport = _send_session_request
+    chunks = [pmid_list[i:i + chunk_size]
+              for i in range(0, len(pmid_list), chunk_size)]
+    rate_limiter = _RateLimiter(max_rate)
+
+    def fetch_chunk(chunk):
+        params = {'db': 'pubmed',
+                  'retmode': 'xml',
+                  'id': ','.join(chunk)}
+        rate_limiter.wait()
+        return transport(pubmed_fetch, params)
+
+    # Only a few chunks are requested ahead of the ones being parsed so that
+    # responses don't pile up in memory when the caller is slow
+    chunk_iter = iter(chunks)
+    with ThreadPoolExecutor(max_workers=poolsize) as executor:
+        pending = set()
+        while True:
+            for chunk in chunk_iter:
+                pending.add(executor.submit(fetch_chunk, chunk))
+                if len(pending) >= 2 * poolsize:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    content = future.result()
+                except Exception as e:
+                    logger.error('PubMed request exception')
+                    logger.error(e)
+                    continue
+                if content is None:
+                    continue
+                for pm_article in _iter_pubmed_articles(content):
+                    yield _get_pubmed_article_metadata(pm_article,
+                                                       get_issns_from_nlm,
+                                                       get_abstracts,
+                                                       prepend_title)
+
+
+def _iter_pubmed_articles(content):
+    """Yield the PubmedArticle elements of an XML response one by one."""
+    for _, elem in ET.iterparse(BytesIO(content), parser=UTB()):
+        if elem.tag == 'PubmedArticle':
+            yield elem
+            # Free the article once it's been processed
+            elem.clear()
+
+
+class _RateLimiter(object):
+    """Space out the requests made by multiple threads."""
+    def __init__(self, max_rate):
+        self.interval = 1.0 / max_rate
+        self._next_time = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.time()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+# Requests Sessions aren't guaranteed to be thread safe, so each thread
+# gets its own
+_thread_local = threading.local()
+
+
+def _send_session_request(url, params):
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = _thread_local.session = requests.Session()
+    try:
+        res = session.get(url, params=params)
+    except requests.exceptions.RequestException as e:
+        logger.error('PubMed request exception')
+        logger.error('url: %s, data: %s' % (url, params))
+        logger.error(e)
+        return None
+    if not res.status_code == 200:
+        logger.error('Got return code %d from pubmed client.'
+                     % res.status_code)
+        return None
+    return res.content
+
+
 @lru_cache(maxsize=1000)
 def get_issns_for_journal(nlm_id):
     """Get a list of the ISSN numbers for a journal given its NLM ID.
@@ -11,6 +11,7 @@ from io import BytesIO
 from xml.etree import ElementTree as ET
 from indra import literature as lit
 from indra.literature import elsevier_client, pubmed_client
+from indra.literature.content_cache import ContentCache
 from indra.util import UnicodeXMLTreeBuilder as UTB
 # Python 2
 try:
@@ -59,6 +60,19 @@ def filter_keys(prefix):
     return list(bucket.objects.filter(Prefix=prefix))
 
 
+def list_keys(prefix):
+    """Return the keys of the objects with a given prefix.
+
+    Unlike filter_keys, this uses the S3 client, which, unlike the S3
+    resource, can be shared between threads.
+    """
+    paginator = client.get_paginator('list_objects_v2')
+    keys = []
+    for page in paginator.paginate(Bucket=bucket_name, Prefix=prefix):
+        keys += [obj['Key'] for obj in page.get('Contents', [])]
+    return keys
+
+
 def get_upload_content(pmid, force_fulltext_lookup=False):
     """Get full text and/or abstract for paper and upload to S3."""
     # Make sure that the PMID doesn't start with PMID so that it doesn't
@@ -173,10 +187,9 @@ def get_full_text(pmid, metadata=False):
     pmid = check_pmid(pmid)
     # Check for Open Access nxml source
     ft_prefix = get_pmid_key(pmid) + '/fulltext/'
-    ft_objs = filter_keys(ft_prefix)
+    ft_keys = list_keys(ft_prefix)
     # We have at least one full text
-    if len(ft_objs) > 0:
-        ft_keys = [ft_obj.key for ft_obj in ft_objs]
+    if len(ft_keys) > 0:
         # Look for full texts in order of desirability
         for content_type in ('pmc_oa_xml', 'pmc_auth_xml', 'elsevier_xml',
                              'pmc_oa_txt', 'txt'):
@@ -217,6 +230,33 @@ def get_full_text(pmid, metadata=False):
             return (abstract, 'abstract')
 
 
+def get_full_texts(pmids, cache_path, poolsize=10):
+    """Return the full texts or abstracts of articles, using a local cache.
+
+    The content of the articles not in the local cache is fetched from S3
+    with get_full_text, in a pool of threads, and added to the cache.
+
+    Parameters
+    ----------
+    pmids : list[str]
+        The PMIDs of the articles.
+    cache_path : str
+        The path to the SQLite database file of the local cache, see
+        :py:class:`indra.literature.content_cache.ContentCache`.
+    poolsize : Optional[int]
+        The maximum number of articles fetched from S3 at the same time.
+        Default: 10
+
+    Returns
+    -------
+    dict
+        A dict of (content, content_type) tuples keyed by PMID. Articles
+        without content on S3 have (None, None).
+    """
+    with ContentCache(cache_path, upstream=get_full_text) as cache:
+        return cache.get_contents(pmids, poolsize=poolsize)
+
+
 def put_full_text(pmid, text, full_text_type='pmc_oa_xml'):
     pmid = check_pmid(pmid)
     xml_key = prefix + pmid + '/fulltext/' + full_text_type
@@ -2,6 +2,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 
 import sys
+import copy
 import time
 import logging
 import itertools
@@ -16,6 +17,7 @@ except ImportError:
 from indra.util import fast_deepcopy
 from indra.statements import *
 from indra.statements import stmt_type as indra_stmt_type
+from .refinement import RefinementIndex, get_candidate_pairs
 
 logger = logging.getLogger(__name__)
 
@@ -65,20 +67,25 @@ class Preassembler(object):
         """
         self.stmts += fast_deepcopy(stmts)
 
-    def combine_duplicates(self):
+    def combine_duplicates(self, poolsize=None):
         """Combine duplicates among `stmts` and save result in `unique_stmts`.
 
         A wrapper around the static method :py:meth:`combine_duplicate_stmts`.
+
+        Parameters
+        ----------
+        poolsize : Optional[int]
+            The number of worker processes to combine duplicates with.
+            If None (default), no parallelization is performed.
         """
         if self.unique_stmts is None:
-            self.unique_stmts = self.combine_duplicate_stmts(self.stmts)
+            self.unique_stmts = self.combine_duplicate_stmts(self.stmts,
+                                                             poolsize)
         return self.unique_stmts
 
     @staticmethod
     def _get_stmt_matching_groups(stmts):
         """Use the matches_key method to get sets of matching statements."""
-        def match_func(x): return x.matches_key()
-
         # Remove exact duplicates using a set() call, then make copies:
         logger.debug('%d statements before removing object duplicates.' %
                      len(stmts))
@@ -87,13 +94,15 @@ class Preassembler(object):
                      len(stmts))
         # Group statements according to whether they are matches (differing
         # only in their evidence).
-        # Sort the statements in place by matches_key()
-        st.sort(key=match_func)
-
-        return itertools.groupby(st, key=match_func)
+        # Sort the statements by matches_key(), which is only computed once
+        # per Statement since it is expensive
+        keyed_stmts = sorted(((stmt.matches_key(), stmt) for stmt in st),
+                             key=lambda x: x[0])
+        for key, group in itertools.groupby(keyed_stmts, key=lambda x: x[0]):
+            yield key, (stmt for _, stmt in group)
 
     @staticmethod
-    def combine_duplicate_stmts(stmts):
+    def combine_duplicate_stmts(stmts, poolsize=None):
         """Combine evidence from duplicate Statements.
 
         Statements are deemed to be duplicates if they have the same key
@@ -109,6 +118,14 @@ class Preassembler(object):
         ----------
         stmts : list of :py:class:`indra.statements.Statement`
             Set of statements to de-duplicate.
+        poolsize : Optional[int]
+            The number of worker processes to use. If given, the statements
+            are sharded by their shallow hash, so that duplicates end up in
+            the same shard, and the duplicates in each shard are combined
+            in a separate process. The unique statements are then returned
+            shard by shard, rather than in the order of their matches keys.
+            If None (default), no parallelization is performed. NOTE:
+            Parallelization is only available on Python 3.4 and above.
 
         Returns
         -------
@@ -132,6 +149,11 @@ class Preassembler(object):
         >>> sorted([e.text for e in uniq_stmts[0].evidence]) # doctest:+IGNORE_UNICODE
         ['evidence 1', 'evidence 2']
         """
+        if poolsize is not None:
+            if sys.version_info[0] >= 3 and sys.version_info[1] >= 4:
+                return _combine_duplicate_stmts_mp(stmts, poolsize)
+            logger.info('combine_duplicate_stmts: Python < 3.4 detected, '
+                        'not using multiprocessing.')
         # Helper function to get a list of evidence matches keys
         def _ev_keys(sts):
             ev_keys = []
@@ -152,30 +174,7 @@ class Preassembler(object):
                     new_stmt = stmt.make_generic_copy()
                 if len(duplicates) == 1:
                     new_stmt.uuid = stmt.uuid
-                raw_text = [None if ag is None else ag.db_refs.get('TEXT')
-                            for ag in stmt.agent_list(deep_sorted=True)]
-                raw_grounding = [None if ag is None else ag.db_refs
-                                 for ag in stmt.agent_list(deep_sorted=True)]
-                for ev in stmt.evidence:
-                    ev_key = ev.matches_key() + str(raw_text) + \
-                        str(raw_grounding)
-                    if ev_key not in ev_keys:
-                        # In case there are already agents annotations, we
-                        # just add a new key for raw_text, otherwise create
-                        # a new key
-                        if 'agents' in ev.annotations:
-                            ev.annotations['agents']['raw_text'] = raw_text
-                            ev.annotations['agents']['raw_grounding'] = \
-                                raw_grounding
-                        else:
-                            ev.annotations['agents'] = \
-                                {'raw_text': raw_text,
-                                 'raw_grounding': raw_grounding}
-                        if 'prior_uuids' not in ev.annotations:
-                            ev.annotations['prior_uuids'] = []
-                        ev.annotations['prior_uuids'].append(stmt.uuid)
-                        new_stmt.evidence.append(ev)
-                        ev_keys.add(ev_key)
+                _merge_duplicate_evidence(new_stmt, stmt, ev_keys)
             end_ev_keys = _ev_keys([new_stmt])
             if len(end_ev_keys) != len(start_ev_keys):
                 logger.debug('%d redundant evidences eliminated.' %
@@ -471,7 +470,12 @@ class Preassembler(object):
            `refinement_of()` method implemented for the Statement), then the
            more refined statement is added to the `supports` field of the more
            general statement, and the more general statement is added to the
-           `supported_by` field of the more refined statement.
+           `supported_by` field of the more refined statement. If the entity
+           hierarchy has its transitive closures built, the statements in
+           each group are first indexed by their Agents' entities and
+           hierarchy ancestors (see
+           :py:class:`indra.preassembler.refinement.RefinementIndex`) so that
+           only candidate pairs found in the index are compared.
         5. A new flat list of statements is created that contains only those
            statements that have no `supports` entries (statements containing
            such entries are not eliminated, because they will be retrievable
@@ -548,7 +552,9 @@ class Preassembler(object):
         unique_stmts = self.combine_duplicates()
 
         # Generate the index map, linking related statements.
-        idx_map = self._generate_id_maps(unique_stmts, poolsize, size_cutoff)
+        with cached_matches_keys():
+            idx_map = self._generate_id_maps(unique_stmts, poolsize,
+                                             size_cutoff)
 
         # Now iterate over all indices and set supports/supported by
         for ix1, ix2 in idx_map:
@@ -562,15 +568,88 @@ class Preassembler(object):
         else:
             return unique_stmts
 
-    def find_contradicts(self):
+    def find_contradicts(self, poolsize=None):
         """Return pairs of contradicting Statements.
 
+        Parameters
+        ----------
+        poolsize : Optional[int]
+            The number of worker processes to check candidate pairs of
+            Statements with. If None (default), no parallelization is
+            performed. NOTE: Parallelization is only available on Python 3.4
+            and above.
+
         Returns
         -------
         contradicts : list(tuple(Statement, Statement))
             A list of Statement pairs that are contradicting.
         """
+        return list(self.iter_contradicts(poolsize=poolsize))
+
+    def iter_contradicts(self, poolsize=None, chunk_size=10000):
+        """Yield pairs of contradicting Statements.
+
+        If the entity hierarchy has its closures built, only the pairs of
+        Statements whose Agents are related to each other, as looked up in a
+        :py:class:`indra.preassembler.refinement.RefinementIndex`, are
+        checked with `contradicts`. The candidate pairs are checked in chunks
+        so that contradicting pairs are produced as the checking proceeds.
+
+        Parameters
+        ----------
+        poolsize : Optional[int]
+            The number of worker processes to check candidate pairs of
+            Statements with. If None (default), no parallelization is
+            performed. NOTE: Parallelization is only available on Python 3.4
+            and above.
+        chunk_size : Optional[int]
+            The number of candidate pairs of Statements checked at a time,
+            either in this process or in a worker process. Default: 10000
+
+        Yields
+        ------
+        tuple(Statement, Statement)
+            A pair of Statements that are contradicting.
+        """
+        if poolsize is not None and \
+                not (sys.version_info[0] >= 3 and sys.version_info[1] >= 4):
+            logger.info('find_contradicts: Python < 3.4 detected, '
+                        'not using multiprocessing.')
+            poolsize = None
+        chunks = _get_chunks(self._get_contradict_candidates(), chunk_size)
+        if poolsize is None:
+            for chunk in chunks:
+                for pair_idx in _get_contradicts_in_chunk(chunk,
+                                                          self.hierarchies):
+                    yield chunk[pair_idx]
+            return
+        # The chunks are kept so that the original Statements, rather than
+        # the copies made in the worker processes, are returned
+        sent_chunks = collections.deque()
+
+        def _send_chunks():
+            for chunk in chunks:
+                sent_chunks.append(chunk)
+                yield chunk
+        # The hierarchies are sent to each worker process once rather than
+        # with every chunk
+        ctx = mp.get_context('spawn')
+        pool = ctx.Pool(poolsize, initializer=_init_worker_hierarchies,
+                        initargs=(self.hierarchies,))
+        try:
+            for pair_idxs in pool.imap(_get_contradicts_in_worker_chunk,
+                                       _send_chunks()):
+                chunk = sent_chunks.popleft()
+                for pair_idx in pair_idxs:
+                    yield chunk[pair_idx]
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _get_contradict_candidates(self):
+        """Yield pairs of Statements that may be contradicting."""
         eh = self.hierarchies['entity']
+        use_index = RefinementIndex.can_index(self.hierarchies)
 
         # Make a dict of Statement by type
         stmts_by_type = collections.defaultdict(lambda: [])
@@ -584,28 +663,133 @@ class Preassembler(object):
         pos_stmts += [Activation, IncreaseAmount]
         neg_stmts += [Inhibition, DecreaseAmount]
 
-        contradicts = []
         for pst, nst in zip(pos_stmts, neg_stmts):
             poss = stmts_by_type.get(pst, [])
             negs = stmts_by_type.get(nst, [])
-
+            if not poss or not negs:
+                continue
+            if use_index:
+                ri = RefinementIndex(self.hierarchies)
+                for pos, (_, stmt) in enumerate(negs):
+                    ri.add_statement(pos, stmt)
+                for _, st1 in poss:
+                    for pos in sorted(ri.get_related(st1, stmt_type=nst)):
+                        yield st1, negs[pos][1]
+                continue
             pos_stmt_by_group = self._get_stmt_by_group(pst, poss, eh)
             neg_stmt_by_group = self._get_stmt_by_group(nst, negs, eh)
             for key, pg in pos_stmt_by_group.items():
                 ng = neg_stmt_by_group.get(key, [])
                 for (_, st1), (_, st2) in itertools.product(pg, ng):
-                    if st1.contradicts(st2, self.hierarchies):
-                        contradicts.append((st1, st2))
+                    yield st1, st2
 
         # Handle neutral Statements next
         neu_stmts = [Influence, ActiveForm]
         for stt in neu_stmts:
             stmts = stmts_by_type.get(stt, [])
-            for (_, st1), (_, st2) in itertools.combinations(stmts, 2):
-                if st1.contradicts(st2, self.hierarchies):
-                    contradicts.append((st1, st2))
-
-        return contradicts
+            if not use_index:
+                for (_, st1), (_, st2) in itertools.combinations(stmts, 2):
+                    yield st1, st2
+                continue
+            ri = RefinementIndex(self.hierarchies)
+            for pos, (_, stmt) in enumerate(stmts):
+                ri.add_statement(pos, stmt)
+            # Influences also contradict if their concepts are opposites.
+            # Since Statements are checked against the ones that follow them,
+            # the pairs come out in the same orientation as all the
+            # combinations would.
+            for pos1, (_, st1) in enumerate(stmts):
+                related = ri.get_related(st1, opposites=(stt == Influence))
+                for pos2 in sorted(related):
+                    if pos2 > pos1:
+                        yield st1, stmts[pos2][1]
+
+
+def _get_chunks(iterable, chunk_size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _get_contradicts_in_chunk(stmt_pairs, hierarchies):
+    # Return the positions of the contradicting pairs in the chunk. The
+    # Statements aren't modified here so their matches keys can be cached.
+    with cached_matches_keys():
+        return [pair_idx for pair_idx, (st1, st2) in enumerate(stmt_pairs)
+                if st1.contradicts(st2, hierarchies)]
+
+
+_worker_hierarchies = None
+
+
+def _init_worker_hierarchies(hierarchies):
+    global _worker_hierarchies
+    _worker_hierarchies = hierarchies
+
+
+def _get_contradicts_in_worker_chunk(stmt_pairs):
+    return _get_contradicts_in_chunk(stmt_pairs, _worker_hierarchies)
+
+
+def _combine_duplicate_stmts_mp(stmts, poolsize):
+    # Statements with the same matches key have the same shallow hash, so
+    # all the duplicates of a Statement end up in the same shard
+    shards = [[] for _ in range(poolsize)]
+    for stmt in set(stmts):
+        shard_idx = stmt.get_hash(shallow=True, refresh=True) % poolsize
+        shards[shard_idx].append(stmt)
+    shards = [shard for shard in shards if shard]
+    logger.info('Combining duplicates in %d shards using multiprocessing '
+                'with poolsize %d' % (len(shards), poolsize))
+    ctx = mp.get_context('spawn')
+    pool = ctx.Pool(poolsize)
+    try:
+        shard_results = pool.map(Preassembler.combine_duplicate_stmts, shards)
+    finally:
+        pool.close()
+        pool.join()
+    unique_stmts = []
+    for shard_unique_stmts in shard_results:
+        unique_stmts += shard_unique_stmts
+    return unique_stmts
+
+
+def _merge_duplicate_evidence(new_stmt, stmt, ev_keys):
+    """Add the Evidence of a duplicate Statement to a unique Statement.
+
+    Each Evidence is annotated with the raw text and grounding of the
+    duplicate Statement's Agents and with its UUID, and is only added if its
+    key is not already in ev_keys. The set ev_keys is updated in place.
+    """
+    raw_text = [None if ag is None else ag.db_refs.get('TEXT')
+                for ag in stmt.agent_list(deep_sorted=True)]
+    raw_grounding = [None if ag is None else ag.db_refs
+                     for ag in stmt.agent_list(deep_sorted=True)]
+    for ev in stmt.evidence:
+        ev_key = ev.matches_key() + str(raw_text) + \
+            str(raw_grounding)
+        if ev_key not in ev_keys:
+            # In case there are already agents annotations, we
+            # just add a new key for raw_text, otherwise create
+            # a new key
+            if 'agents' in ev.annotations:
+                ev.annotations['agents']['raw_text'] = raw_text
+                ev.annotations['agents']['raw_grounding'] = \
+                    raw_grounding
+            else:
+                ev.annotations['agents'] = \
+                    {'raw_text': raw_text,
+                     'raw_grounding': raw_grounding}
+            if 'prior_uuids' not in ev.annotations:
+                ev.annotations['prior_uuids'] = []
+            ev.annotations['prior_uuids'].append(stmt.uuid)
+            new_stmt.evidence.append(ev)
+            ev_keys.add(ev_key)
 
 
 def _set_supports_stmt_pairs(stmt_tuples, split_idx=None, hierarchies=None,
@@ -616,30 +800,38 @@ def _set_supports_stmt_pairs(stmt_tuples, split_idx=None, hierarchies=None,
     #              % (len(stmt_tuples), [idx for idx, _ in stmt_tuples],
     #                 [(s.get_hash(shallow=True), s) for _, s in stmt_tuples],
     #                 split_idx))
-    #  Make the iterator by one of two methods, depending on the case
-    if split_idx is None:
-        stmt_pair_iter = itertools.combinations(stmt_tuples, 2)
-    else:
-        stmt_group_a = []
-        stmt_group_b = []
-        for idx, stmt in stmt_tuples:
-            if idx <= split_idx:
-                stmt_group_a.append((idx, stmt))
-            else:
-                stmt_group_b.append((idx, stmt))
-        stmt_pair_iter = itertools.product(stmt_group_a, stmt_group_b)
-
-    # Actually create the index maps.
-    ix_map = []
-    for stmt_tuple1, stmt_tuple2 in stmt_pair_iter:
-        stmt_ix1, stmt1 = stmt_tuple1
-        stmt_ix2, stmt2 = stmt_tuple2
-        if check_entities_match and not stmt1.entities_match(stmt2):
-            continue
-        if stmt1.refinement_of(stmt2, hierarchies):
-            ix_map.append((stmt_ix1, stmt_ix2))
-        elif stmt2.refinement_of(stmt1, hierarchies):
-            ix_map.append((stmt_ix2, stmt_ix1))
+    # The Statements aren't modified here so their matches keys, which are
+    # used repeatedly in refinement_of, can be cached
+    with cached_matches_keys():
+        # If the entity hierarchy has its closures built, we can look up the
+        # candidate pairs in an index instead of comparing all pairs
+        if RefinementIndex.can_index(hierarchies):
+            stmt_pair_iter = get_candidate_pairs(stmt_tuples, hierarchies,
+                                                 split_idx)
+        #  Make the iterator by one of two methods, depending on the case
+        elif split_idx is None:
+            stmt_pair_iter = itertools.combinations(stmt_tuples, 2)
+        else:
+            stmt_group_a = []
+            stmt_group_b = []
+            for idx, stmt in stmt_tuples:
+                if idx <= split_idx:
+                    stmt_group_a.append((idx, stmt))
+                else:
+                    stmt_group_b.append((idx, stmt))
+            stmt_pair_iter = itertools.product(stmt_group_a, stmt_group_b)
+
+        # Actually create the index maps.
+        ix_map = []
+        for stmt_tuple1, stmt_tuple2 in stmt_pair_iter:
+            stmt_ix1, stmt1 = stmt_tuple1
+            stmt_ix2, stmt2 = stmt_tuple2
+            if check_entities_match and not stmt1.entities_match(stmt2):
+                continue
+            if stmt1.refinement_of(stmt2, hierarchies):
+                ix_map.append((stmt_ix1, stmt_ix2))
+            elif stmt2.refinement_of(stmt1, hierarchies):
+                ix_map.append((stmt_ix2, stmt_ix1))
     return ix_map
 
 
@@ -816,7 +1008,9 @@ def flatten_evidence(stmts, collect_from=None):
     stmts : list of :py:class:`indra.statements.Statement`
         Statement hierarchy identical to the one passed, but with the
         evidence lists for each statement now containing all of the evidence
-        associated with the statements they are supported by.
+        associated with the statements they are supported by. The
+        statements and evidences are shallow copies of the ones passed,
+        and share their Agents with them.
 
     Examples
     --------
@@ -845,39 +1039,105 @@ def flatten_evidence(stmts, collect_from=None):
         raise ValueError('collect_from must be one of "supports", '
                          '"supported_by"')
     logger.info('Flattening evidence based on %s' % collect_from)
-    # Copy all of the statements--these will be the ones where we update
-    # the evidence lists
-    stmts = fast_deepcopy(stmts)
+    # Copy the statement hierarchy--the evidence lists of the copies of the
+    # given statements are the ones we update
+    stmt_copies = _copy_stmt_hierarchy(stmts)
+    total_evidence = _get_flattened_evidence(stmts, collect_from)
+    flattened_stmts = []
     for stmt in stmts:
         # We get the original evidence keys here so we can differentiate them
         # from ones added during flattening.
-        orig_ev_keys = [ev.matches_key() for ev in stmt.evidence]
-        # We now do the flattening
-        total_evidence = _flatten_evidence_for_stmt(stmt, collect_from)
+        orig_ev_keys = {ev.matches_key() for ev in stmt.evidence}
         # Here we add annotations for each evidence in the list,
         # depending on whether it's an original direct evidence or one that
         # was added during flattening
         new_evidence = []
-        for ev in total_evidence:
-            ev_key = ev.matches_key()
-            if ev_key in orig_ev_keys:
-                ev.annotations['support_type'] = 'direct'
-                new_evidence.append(ev)
+        for ev in total_evidence[id(stmt)]:
+            if ev.matches_key() in orig_ev_keys:
+                support_type = 'direct'
             else:
-                ev_copy = fast_deepcopy(ev)
-                ev_copy.annotations['support_type'] = collect_from
-                new_evidence.append(ev_copy)
+                support_type = collect_from
+            new_evidence.append(_copy_evidence(ev, support_type))
         # Now set the new evidence list as the copied statement's evidence
-        stmt.evidence = new_evidence
-    return stmts
-
-
-def _flatten_evidence_for_stmt(stmt, collect_from):
-    supp_stmts = (stmt.supports if collect_from == 'supports'
-                                else stmt.supported_by)
-    total_evidence = set(stmt.evidence)
-    for supp_stmt in supp_stmts:
-        child_evidence = _flatten_evidence_for_stmt(supp_stmt, collect_from)
-        total_evidence = total_evidence.union(child_evidence)
-    return list(total_evidence)
+        stmt_copy = stmt_copies[id(stmt)]
+        stmt_copy.evidence = new_evidence
+        flattened_stmts.append(stmt_copy)
+    return flattened_stmts
+
+
+def _copy_stmt_hierarchy(stmts):
+    """Return shallow copies of all the Statements in a hierarchy by id.
+
+    The supports and supported_by lists of the copies refer to the copies
+    and each copy has its own evidence list, but the Agents and Evidences
+    are shared with the original Statements.
+    """
+    stmt_copies = {}
+    stack = list(stmts)
+    while stack:
+        stmt = stack.pop()
+        if id(stmt) in stmt_copies:
+            continue
+        stmt_copies[id(stmt)] = copy.copy(stmt)
+        stack += stmt.supports
+        stack += stmt.supported_by
+    for stmt_copy in stmt_copies.values():
+        stmt_copy.evidence = list(stmt_copy.evidence)
+        stmt_copy.supports = [stmt_copies[id(st)]
+                              for st in stmt_copy.supports]
+        stmt_copy.supported_by = [stmt_copies[id(st)]
+                                  for st in stmt_copy.supported_by]
+    return stmt_copies
+
+
+def _get_flattened_evidence(stmts, collect_from):
+    """Return the evidence of each Statement and the ones supporting it.
+
+    The hierarchy is traversed once, in topological order, and the evidence
+    of each Statement is collected from the already flattened evidence of
+    the Statements it is supported by (or supports), so that shared parts
+    of the hierarchy are not walked again. Returns a dict of evidence lists
+    keyed by the id of each Statement, without duplicate Evidences.
+    """
+    total_evidence = {}
+    expanded = set()
+    for root in stmts:
+        # Iterative post-order traversal; a statement is flattened once
+        # all of the statements it collects evidence from are
+        stack = [(root, False)]
+        while stack:
+            stmt, children_done = stack.pop()
+            if id(stmt) in total_evidence:
+                continue
+            supp_stmts = (stmt.supports if collect_from == 'supports'
+                          else stmt.supported_by)
+            if not children_done:
+                if id(stmt) in expanded:
+                    continue
+                expanded.add(id(stmt))
+                stack.append((stmt, True))
+                stack += [(supp_stmt, False) for supp_stmt in supp_stmts
+                          if id(supp_stmt) not in total_evidence]
+                continue
+            evidence = list(stmt.evidence)
+            ev_ids = {id(ev) for ev in evidence}
+            for supp_stmt in supp_stmts:
+                # A cycle in the hierarchy leaves this unset
+                for ev in total_evidence.get(id(supp_stmt), []):
+                    if id(ev) not in ev_ids:
+                        ev_ids.add(id(ev))
+                        evidence.append(ev)
+            total_evidence[id(stmt)] = evidence
+    return total_evidence
+
+
+def _copy_evidence(ev, support_type):
+    """Return a shallow copy of an Evidence annotated with a support type."""
+    # copy.copy would share the __dict__ of the Evidence since
+    # Evidence.__setstate__ assigns the state dict it gets directly
+    ev_copy = ev.__class__.__new__(ev.__class__)
+    ev_copy.__setstate__(dict(ev.__dict__))
+    ev_copy.annotations = dict(ev.annotations)
+    ev_copy.annotations['support_type'] = support_type
+    return ev_copy
 
@@ -6,8 +6,9 @@ import sys
 import json
 import pickle
 import logging
-from copy import deepcopy
-from collections import Counter
+import multiprocessing as mp
+from copy import copy, deepcopy
+from collections import Counter, defaultdict
 from itertools import groupby, chain
 from indra.statements import Agent
 from indra.databases import uniprot_client, hgnc_client
@@ -147,7 +148,8 @@ class GroundingMapper(object):
                 agent.name = gene_name
         return
 
-    def map_agents_for_stmt(self, stmt, do_rename=True):
+    def map_agents_for_stmt(self, stmt, do_rename=True,
+                            copy_on_write=False, do_deft=True):
         """Return a new Statement whose agents have been grounding mapped.
 
         Parameters
@@ -159,13 +161,35 @@ class GroundingMapper(object):
             If do_rename is True the priority for setting the name is
             FamPlex ID, HGNC symbol, then the gene name
             from Uniprot. Default: True
+        copy_on_write : Optional[bool]
+            If True, a Statement none of whose Agents need mapping is
+            returned as is, and otherwise only its Agents are copied while
+            its evidence and other attributes are shared with the original
+            Statement. If False, the Statement is always deep-copied.
+            Default: False
+        do_deft : Optional[bool]
+            If False, Deft isn't used to disambiguate the Agents even if
+            use_deft is True, for instance, because they are disambiguated
+            in a batch afterwards. Default: True
 
         Returns
         -------
         mapped_stmt : :py:class:`indra.statements.Statement`
             The mapped Statement.
         """
-        mapped_stmt = deepcopy(stmt)
+        do_deft = self.use_deft and do_deft
+        if not copy_on_write:
+            mapped_stmt = deepcopy(stmt)
+        else:
+            agent_texts = self._get_agent_texts(stmt)
+            if not any(self._needs_mapping(txt, do_deft)
+                       for txt in agent_texts):
+                return stmt
+            # Deft adds its scores to the annotations of the first Evidence
+            # so in that case the evidence needs to be copied too
+            copy_evidence = do_deft and \
+                any(txt in deft_disambiguators for txt in agent_texts)
+            mapped_stmt = _copy_agents(stmt, copy_evidence)
         # Iterate over the agents
 
         # Update agents directly participating in the statement
@@ -180,7 +204,7 @@ class GroundingMapper(object):
             new_agent, maps_to_none = self.map_agent(agent, do_rename)
 
             # Check if a deft model exists for agent text
-            if self.use_deft and agent_txt in deft_disambiguators:
+            if do_deft and agent_txt in deft_disambiguators:
                 try:
                     run_deft_disambiguation(mapped_stmt, agent_list, idx,
                                             new_agent, agent_txt)
@@ -267,7 +291,23 @@ class GroundingMapper(object):
             self.update_agent_db_refs(agent, agent_text, do_rename)
         return agent, False
 
-    def map_agents(self, stmts, do_rename=True):
+    def _needs_mapping(self, agent_text, do_deft=True):
+        return agent_text in self.gm or agent_text in self.agent_map or \
+            (self.use_deft and do_deft and agent_text in deft_disambiguators)
+
+    @staticmethod
+    def _get_agent_texts(stmt):
+        agent_texts = []
+        for agent in stmt.agent_list():
+            if agent is None:
+                continue
+            agent_texts.append(agent.db_refs.get('TEXT'))
+            agent_texts += [bc.agent.db_refs.get('TEXT')
+                            for bc in agent.bound_conditions]
+        return [txt for txt in agent_texts if txt is not None]
+
+    def map_agents(self, stmts, do_rename=True, copy_on_write=False,
+                   poolsize=None):
         """Return a new list of statements whose agents have been mapped
 
         Parameters
@@ -279,6 +319,16 @@ class GroundingMapper(object):
             If do_rename is True the priority for setting the name is
             FamPlex ID, HGNC symbol, then the gene name
             from Uniprot. Default: True
+        copy_on_write : Optional[bool]
+            If True, Statements none of whose Agents need mapping are
+            returned as they are, and for the other Statements only the
+            Agents are copied. This means that the returned Statements share
+            evidence with the input Statements. If False, each Statement is
+            deep-copied before mapping. Default: False
+        poolsize : Optional[int]
+            The number of worker processes to map the statements with. If
+            None (default), no parallelization is performed. NOTE:
+            Parallelization is only available on Python 3.4 and above.
 
         Returns
         -------
@@ -286,17 +336,26 @@ class GroundingMapper(object):
             A list of statements given by mapping the agents from each
             statement in the input list
         """
-        # Make a copy of the stmts
-        mapped_stmts = []
-        num_skipped = 0
-        # Iterate over the statements
-        for stmt in stmts:
-            mapped_stmt = self.map_agents_for_stmt(stmt, do_rename)
-            # Check if we should skip the statement
-            if mapped_stmt is not None:
-                mapped_stmts.append(mapped_stmt)
-            else:
-                num_skipped += 1
+        if poolsize is not None and \
+                not (sys.version_info[0] >= 3 and sys.version_info[1] >= 4):
+            logger.info('map_agents: Python < 3.4 detected, not using '
+                        'multiprocessing.')
+            poolsize = None
+        # Deft disambiguation is done in a second pass below so that Agents
+        # with the same text can be disambiguated in a single batch
+        if poolsize is None:
+            mapped_stmts = [self.map_agents_for_stmt(stmt, do_rename,
+                                                     copy_on_write,
+                                                     do_deft=False)
+                            for stmt in stmts]
+        else:
+            mapped_stmts = _map_agents_mp(self, stmts, do_rename,
+                                          copy_on_write, poolsize)
+        if self.use_deft:
+            _run_deft_batches(stmts, mapped_stmts)
+        # Check if we should skip any of the statements
+        num_skipped = mapped_stmts.count(None)
+        mapped_stmts = [stmt for stmt in mapped_stmts if stmt is not None]
         logger.info('%s statements filtered out' % num_skipped)
         return mapped_stmts
 
@@ -707,7 +766,123 @@ def save_sentences(twg, stmts, filename, agent_limit=300):
                       quoting=csv.QUOTE_MINIMAL, lineterminator='\r\n')
 
 
+def _copy_agents(stmt, copy_evidence=False):
+    """Return a shallow copy of a Statement with its Agents deep-copied."""
+    new_stmt = copy(stmt)
+    new_stmt.set_agent_list(deepcopy(stmt.agent_list()))
+    if copy_evidence:
+        new_stmt.evidence = deepcopy(stmt.evidence)
+    return new_stmt
+
+
+def _map_agents_chunk(args):
+    mapper, stmts, do_rename, copy_on_write = args
+    # Deft disambiguation is done by the parent process after mapping
+    return [mapper.map_agents_for_stmt(stmt, do_rename, copy_on_write,
+                                       do_deft=False)
+            for stmt in stmts]
+
+
+def _map_agents_mp(mapper, stmts, do_rename, copy_on_write, poolsize):
+    # The statements are split into contiguous chunks so that the mapped
+    # statements can be put back together in their original order
+    chunk_size = max(1, -(-len(stmts) // poolsize))
+    chunks = [(mapper, stmts[i:i + chunk_size], do_rename, copy_on_write)
+              for i in range(0, len(stmts), chunk_size)]
+    logger.info('Mapping agents in %d chunks using multiprocessing with '
+                'poolsize %d' % (len(chunks), poolsize))
+    ctx = mp.get_context('spawn')
+    pool = ctx.Pool(poolsize)
+    try:
+        chunk_results = pool.map(_map_agents_chunk, chunks)
+    finally:
+        pool.close()
+        pool.join()
+    mapped_stmts = []
+    for chunk_mapped_stmts in chunk_results:
+        mapped_stmts += chunk_mapped_stmts
+    return mapped_stmts
+
+
+def _run_deft_batches(stmts, mapped_stmts):
+    """Disambiguate the Agents of mapped Statements with Deft in batches.
+
+    The Agents to disambiguate are grouped by their text, and each Deft
+    model is run once on the texts for all the Agents in its group. The
+    mapped Statements are modified in place, and None entries, standing
+    for Statements that were filtered out, are skipped.
+    """
+    deft_agents = defaultdict(list)
+    for stmt_idx, (stmt, mapped_stmt) in enumerate(zip(stmts, mapped_stmts)):
+        if mapped_stmt is None:
+            continue
+        for idx, agent in enumerate(stmt.agent_list()):
+            if agent is None:
+                continue
+            agent_txt = agent.db_refs.get('TEXT')
+            if agent_txt in deft_disambiguators:
+                deft_agents[agent_txt].append((stmt_idx, idx))
+    if not deft_agents:
+        return
+
+    # Deft adds its scores to the annotations of the first Evidence, which
+    # in copy-on-write mode is shared with the original Statement
+    for stmt_idx in {stmt_idx for agents in deft_agents.values()
+                     for stmt_idx, _ in agents}:
+        stmt, mapped_stmt = stmts[stmt_idx], mapped_stmts[stmt_idx]
+        if mapped_stmt is stmt:
+            mapped_stmts[stmt_idx] = _copy_agents(stmt, copy_evidence=True)
+        elif mapped_stmt.evidence is stmt.evidence:
+            mapped_stmt.evidence = deepcopy(stmt.evidence)
+
+    text_cache = {}
+    for agent_txt, agents in deft_agents.items():
+        batch = []
+        for stmt_idx, idx in agents:
+            mapped_stmt = mapped_stmts[stmt_idx]
+            agent_list = mapped_stmt.agent_list()
+            try:
+                annots = _init_deft_annotations(mapped_stmt, agent_list)
+                grounding_text = _get_text_for_grounding(mapped_stmt,
+                                                         agent_txt,
+                                                         text_cache)
+            except Exception as e:
+                logger.error('There was an error during Deft'
+                             ' disambiguation.')
+                logger.error(e)
+                continue
+            if grounding_text:
+                batch.append((annots, agent_list[idx], idx, grounding_text))
+        if not batch:
+            continue
+        logger.info('Disambiguating %d agents with text %s using Deft.' %
+                    (len(batch), agent_txt))
+        try:
+            results = deft_disambiguators[agent_txt].disambiguate(
+                [grounding_text for _, _, _, grounding_text in batch])
+        except Exception as e:
+            logger.error('There was an error during Deft disambiguation.')
+            logger.error(e)
+            continue
+        for (annots, new_agent, idx, _), res in zip(batch, results):
+            try:
+                _apply_deft_result(annots, idx, new_agent, agent_txt, res)
+            except Exception as e:
+                logger.error('There was an error during Deft'
+                             ' disambiguation.')
+                logger.error(e)
+
+
 def run_deft_disambiguation(stmt, agent_list, idx, new_agent, agent_txt):
+    annots = _init_deft_annotations(stmt, agent_list)
+    grounding_text = _get_text_for_grounding(stmt, agent_txt)
+    if grounding_text:
+        res = deft_disambiguators[agent_txt].disambiguate(
+                                                [grounding_text])
+        _apply_deft_result(annots, idx, new_agent, agent_txt, res[0])
+
+
+def _init_deft_annotations(stmt, agent_list):
     # Initialize annotations if needed so Deft predicted
     # probabilities can be added to Agent annotations
     annots = stmt.evidence[0].annotations if stmt.evidence else {}
@@ -717,30 +892,30 @@ def run_deft_disambiguation(stmt, agent_list, idx, new_agent, agent_txt):
                 {'deft': [None for _ in agent_list]}
     else:
         annots['agents'] = {'deft': [None for _ in agent_list]}
-    grounding_text = _get_text_for_grounding(stmt, agent_txt)
-    if grounding_text:
-        res = deft_disambiguators[agent_txt].disambiguate(
-                                                [grounding_text])
-        ns_and_id, standard_name, disamb_scores = res[0]
-        # If the highest score is ungrounded we don't do anything
-        # TODO: should we explicitly remove grounding if we conclude it
-        # doesn't match any of the choices?
-        if ns_and_id == 'ungrounded':
-            return
-        db_ns, db_id = ns_and_id.split(':')
-        new_agent.db_refs = {'TEXT': agent_txt, db_ns: db_id}
-        new_agent.name = standard_name
-        logger.info('Disambiguated %s to: %s, %s:%s' %
-                    (agent_txt, standard_name, db_ns, db_id))
-        if db_ns == 'HGNC':
-            hgnc_sym = hgnc_client.get_hgnc_name(db_id)
-            GroundingMapper.standardize_agent_db_refs(new_agent,
-                                                      {'HGNC': hgnc_sym},
-                                                      do_rename=False)
-        annots['agents']['deft'][idx] = disamb_scores
-
-
-def _get_text_for_grounding(stmt, agent_text):
+    return annots
+
+
+def _apply_deft_result(annots, idx, new_agent, agent_txt, res):
+    ns_and_id, standard_name, disamb_scores = res
+    # If the highest score is ungrounded we don't do anything
+    # TODO: should we explicitly remove grounding if we conclude it
+    # doesn't match any of the choices?
+    if ns_and_id == 'ungrounded':
+        return
+    db_ns, db_id = ns_and_id.split(':')
+    new_agent.db_refs = {'TEXT': agent_txt, db_ns: db_id}
+    new_agent.name = standard_name
+    logger.info('Disambiguated %s to: %s, %s:%s' %
+                (agent_txt, standard_name, db_ns, db_id))
+    if db_ns == 'HGNC':
+        hgnc_sym = hgnc_client.get_hgnc_name(db_id)
+        GroundingMapper.standardize_agent_db_refs(new_agent,
+                                                  {'HGNC': hgnc_sym},
+                                                  do_rename=False)
+    annots['agents']['deft'][idx] = disamb_scores
+
+
+def _get_text_for_grounding(stmt, agent_text, text_cache=None):
     """Get text context for Deft disambiguation
 
     If the INDRA database is available, attempts to get the fulltext from
@@ -757,24 +932,37 @@ def _get_text_for_grounding(stmt, agent_text):
     agent_text : str
        Agent text that needs to be disambiguated
 
+    text_cache : Optional[dict]
+        A dict in which the content and abstracts fetched for each PMID are
+        cached, so that they are fetched only once when passed to
+        subsequent calls.
+
     Returns
     -------
     text : str
         Text for Feft disambiguation
     """
     text = None
+    if text_cache is None:
+        text_cache = {}
+    pmid = stmt.evidence[0].pmid
     # First we will try to get content from the DB
     try:
         from indra_db.util.content_scripts \
             import get_text_content_from_text_refs
         from indra.literature.deft_tools import universal_extract_text
-        refs = stmt.evidence[0].text_refs
-        # Prioritize the pmid attribute if given
-        if stmt.evidence[0].pmid:
-            refs['PMID'] = stmt.evidence[0].pmid
-        logger.info('Obtaining text for disambiguation with refs: %s' %
-                    refs)
-        content = get_text_content_from_text_refs(refs)
+        if pmid and ('content', pmid) in text_cache:
+            content = text_cache[('content', pmid)]
+        else:
+            refs = stmt.evidence[0].text_refs
+            # Prioritize the pmid attribute if given
+            if pmid:
+                refs['PMID'] = pmid
+            logger.info('Obtaining text for disambiguation with refs: %s' %
+                        refs)
+            content = get_text_content_from_text_refs(refs)
+            if pmid:
+                text_cache[('content', pmid)] = content
         text = universal_extract_text(content, contains=agent_text)
         if text:
             return text
@@ -783,11 +971,14 @@ def _get_text_for_grounding(stmt, agent_text):
     # If that doesn't work, we try PubMed next
     if text is None:
         from indra.literature import pubmed_client
-        pmid = stmt.evidence[0].pmid
         if pmid:
-            logger.info('Obtaining abstract for disambiguation for PMID%s' %
-                        pmid)
-            text = pubmed_client.get_abstract(pmid)
+            if ('abstract', pmid) in text_cache:
+                text = text_cache[('abstract', pmid)]
+            else:
+                logger.info('Obtaining abstract for disambiguation for '
+                            'PMID%s' % pmid)
+                text = pubmed_client.get_abstract(pmid)
+                text_cache[('abstract', pmid)] = text
             if text:
                 return text
     # Finally, falling back on the evidence sentence
@@ -1,12 +1,19 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 import os
+import bisect
+import numpy
 import rdflib
 import logging
+import collections
 try:
     from functools import lru_cache
 except ImportError:
     from functools32 import lru_cache
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 from indra.preassembler.make_entity_hierarchy import ns_map
 
@@ -35,10 +42,17 @@ class HierarchyManager(object):
     ----------
     graph : instance of `rdflib.Graph`
         The RDF graph containing the hierarchy.
+    compiled : CompiledHierarchy
+        The transitive closures of the hierarchy over integer node IDs. The
+        `isa_closure`, `partof_closure` and `isa_or_partof_closure`
+        attributes are read-only dict-like views of these closures.
     """
     prefixes = """
         PREFIX rn: <http://sorger.med.harvard.edu/indra/relations/>
         """
+    # Set at the class level so that hierarchies unpickled from versions
+    # that didn't have a ClosureBuilder have it as None
+    _closure_builder = None
 
     def __init__(self, rdf_file=None, build_closure=True, uri_as_name=True):
         """Initialize with the path to an RDF file"""
@@ -52,6 +66,8 @@ class HierarchyManager(object):
         self.components = {}
         self._children = {}
         self.component_counter = 0
+        self.compiled = None
+        self._closure_builder = None
         # If an RDF file was given, we build up the internal data structures.
         # Otherwise we defer initialization until later.
         if rdf_file:
@@ -97,21 +113,9 @@ class HierarchyManager(object):
     def initialize(self):
         if self.build_closure:
             self.build_transitive_closures()
-
-        # Build reverse lookup dict from the hierarchy
-        # First get all URIs that correspond to parents
-        all_parents = {parent for parents in self.isa_or_partof_closure.values()
-                       for parent in parents}
-        # We use the inverse relation here
-        rel_fun = lambda node, graph: self.isa_or_partof_objects(node,
-                                                                 inverse=True)
-        # Now for each parent we get the inverse transitive closure to
-        # get all its children nodes
-        self._children = {}
-        for parent in all_parents:
-            children = self.graph.transitiveClosure(rel_fun,
-                                                    rdflib.term.URIRef(parent))
-            self._children[parent] = list(set(c.toPython() for c in children))
+        else:
+            self._children = {}
+        self.compile_closures()
 
     def extend_with(self, rdf_file):
         """Extend the RDF graph of this HierarchyManager with another RDF file.
@@ -130,14 +134,134 @@ class HierarchyManager(object):
 
         This method constructs dictionaries which contain terms in the
         hierarchy as keys and either all the "isa+" or "partof+" related terms
-        as values.
+        as values. The closures are computed from the isa and partof edges
+        of the graph in a single pass by a :py:class:`ClosureBuilder`,
+        which is kept to update them when relations are added.
         """
+        self.components = {}
         self.component_counter = 0
-        for rel, tc_dict in ((self.isa_objects, self.isa_closure),
-                             (self.partof_objects, self.partof_closure),
-                             (self.isa_or_partof_objects,
-                                 self.isa_or_partof_closure)):
-            self.build_transitive_closure(rel, tc_dict)
+        self._closure_builder = ClosureBuilder.from_graph(
+            self.graph, self.relations_prefix)
+        for xs, parents in \
+                self._closure_builder.closures['isa_or_partof'].items():
+            for ys in parents:
+                self._add_component(xs, ys)
+        self._set_closures_from_builder()
+
+    def add_relation(self, subj, rel, obj):
+        """Add a relation between two entries of the hierarchy.
+
+        The relation is added to the graph, and the transitive closures are
+        updated incrementally rather than rebuilt.
+
+        Parameters
+        ----------
+        subj : str
+            The URI of the entry that is the subject of the relation.
+        rel : str
+            The relation, either 'isa' or 'partof'.
+        obj : str
+            The URI of the entry that is the object of the relation.
+        """
+        self.graph.add((rdflib.term.URIRef(subj),
+                        rdflib.term.URIRef(self.relations_prefix + rel),
+                        rdflib.term.URIRef(obj)))
+        self._update_closures([(subj, rel, obj)])
+
+    def _update_closures(self, edges):
+        if not self.build_closure:
+            return
+        if self._closure_builder is None:
+            # Hierarchies unpickled from older versions don't have a
+            # builder so we start from the graph
+            self.build_transitive_closures()
+            self.compile_closures()
+            return
+        new_pairs = []
+        for subj, rel, obj in edges:
+            new_pairs += self._closure_builder.add_edge(subj, rel, obj)
+        self._update_compiled(new_pairs)
+
+    def _update_compiled(self, new_pairs):
+        # Only the rows of the nodes that got new related nodes are
+        # replaced in the compiled closures, instead of compiling them
+        # all again
+        changed = collections.defaultdict(set)
+        changed_components = set()
+        for name, node, other in new_pairs:
+            changed[name].add(node)
+            if name == 'isa_or_partof':
+                changed['children'].add(other)
+                changed_components |= self._add_component(node, other)
+        rows = {}
+        for name, nodes in changed.items():
+            if name == 'children':
+                source = self._closure_builder.inverses['isa_or_partof']
+            else:
+                source = self._closure_builder.closures[name]
+            rows[name] = {node: source.get(node, []) for node in nodes}
+        components = {uri: self.components[uri]
+                      for uri in changed_components}
+        self.compiled.update(rows, components)
+
+    def _set_closures_from_builder(self):
+        self.isa_closure = self._closure_builder.get_closure('isa')
+        self.partof_closure = self._closure_builder.get_closure('partof')
+        self.isa_or_partof_closure = \
+            self._closure_builder.get_closure('isa_or_partof')
+        self._children = self._closure_builder.get_inverse('isa_or_partof')
+
+    def compile_closures(self):
+        """Compile the transitive closures into integer arrays.
+
+        The URIs in the closures are interned to integer IDs and each closure
+        is stored as sorted arrays of IDs in a :py:class:`CompiledHierarchy`.
+        The closure attributes are then replaced by read-only views of the
+        compiled closures, which answer lookups in constant time.
+        """
+        closures = {'isa': self.isa_closure,
+                    'partof': self.partof_closure,
+                    'isa_or_partof': self.isa_or_partof_closure,
+                    'children': self._children}
+        self.compiled = CompiledHierarchy.from_closure_dicts(closures,
+                                                             self.components)
+        self._set_closure_views()
+
+    def save_closures(self, fname):
+        """Save the compiled transitive closures of the hierarchy into a file.
+
+        Parameters
+        ----------
+        fname : str
+            The name of the file to save the closures into.
+        """
+        if self.compiled is None:
+            self.compile_closures()
+        self.compiled.save(fname)
+
+    def load_closures(self, fname):
+        """Load transitive closures saved with `save_closures`.
+
+        This can be used instead of building the transitive closures from
+        the RDF graph of the hierarchy.
+
+        Parameters
+        ----------
+        fname : str
+            The name of the file to load the closures from.
+        """
+        self.compiled = CompiledHierarchy.load(fname)
+        self.components = self.compiled.get_components()
+        if self.components:
+            self.component_counter = max(self.components.values()) + 1
+        self._set_closure_views()
+
+    def _set_closure_views(self):
+        self.isa_closure = ClosureView(self.compiled, 'isa')
+        self.partof_closure = ClosureView(self.compiled, 'partof')
+        self.isa_or_partof_closure = ClosureView(self.compiled,
+                                                 'isa_or_partof')
+        self._children = ClosureView(self.compiled, 'children')
 
     def build_transitive_closure(self, rel, tc_dict):
         """Build a transitive closure for a given relation in a given dict."""
@@ -158,6 +282,7 @@ class HierarchyManager(object):
                     self._add_component(xs, ys)
 
     def _add_component(self, xs, ys):
+        # Returns the set of URIs whose component was set or changed
         xcomp = self.components.get(xs)
         ycomp = self.components.get(ys)
         if xcomp is None:
@@ -168,26 +293,32 @@ class HierarchyManager(object):
                 self.components[xs] = self.component_counter
                 self.components[ys] = self.component_counter
                 self.component_counter += 1
+                return {xs, ys}
             else:
                 # Because y is already part of an existing component
                 # we assign its component to x
                 self.components[xs] = ycomp
+                return {xs}
         else:
             if ycomp is None:
                 # Because x is already part of an existing component
                 # we assign its component to y
                 self.components[ys] = xcomp
+                return {ys}
             else:
                 # This is a special case in which both x and y are
                 # parts of components
                 # If they are in the same component then there's
                 # nothing further to do
+                changed = set()
                 if xcomp != ycomp:
                     remove_component = max(xcomp, ycomp)
                     joint_component = min(xcomp, ycomp)
                     for k, v in self.components.items():
                         if v == remove_component:
                             self.components[k] = joint_component
+                            changed.add(k)
+                return changed
 
 
     @lru_cache(maxsize=100000)
@@ -278,6 +409,8 @@ class HierarchyManager(object):
         if closure_dict:
             term1 = self.get_uri(ns1, id1)
             term2 = self.get_uri(ns2, id2)
+            if isinstance(closure_dict, ClosureView):
+                return closure_dict.contains_pair(term1, term2)
             ec = closure_dict.get(term1)
             if ec is not None and term2 in ec:
                 return True
@@ -408,6 +541,26 @@ class HierarchyManager(object):
             return True
         return False
 
+    def get_opposites(self, uri):
+        """Return the entries that a given entry is in an "is_opposite"
+        relationship with.
+
+        Parameters
+        ----------
+        uri : str
+            The URI of the entry whose opposites are to be returned.
+
+        Returns
+        -------
+        list[str]
+            The URIs of the entries that the given entry is an opposite of.
+        """
+        if self.graph is None:
+            return []
+        t = rdflib.term.URIRef(uri)
+        rel = rdflib.term.URIRef(self.relations_prefix + 'is_opposite')
+        return [str(o) for o in self.graph.objects(t, rel)]
+
     def get_parents(self, uri, type='all'):
         """Return parents of a given entry.
 
@@ -542,7 +695,497 @@ class YamlHierarchyManager(HierarchyManager):
             root = new_root
 
         G = self.yaml_to_rdf(self.yaml_root)
-        self.load_from_rdf_graph(G)
+        self._update_from_rdf_graph(G)
+
+    def _update_from_rdf_graph(self, rdf_graph):
+        # If the new graph only adds relations to the current one, which is
+        # the case when entries are added, the closures are updated with
+        # the new relations, otherwise they are rebuilt.
+        if self._closure_builder is None or not self.build_closure:
+            self.load_from_rdf_graph(rdf_graph)
+            return
+        edges = ClosureBuilder.get_graph_edges(rdf_graph,
+                                               self.relations_prefix)
+        new_edges = [edge for edge in edges
+                     if not self._closure_builder.has_edge(*edge)]
+        self.graph = rdf_graph
+        if len(edges) - len(new_edges) != self._closure_builder.num_edges:
+            self.initialize()
+        else:
+            self._update_closures(new_edges)
+
+
+class ClosureBuilder(object):
+    """Build and update the transitive closures of a hierarchy.
+
+    The isa and partof edges of the hierarchy are stored as adjacency sets,
+    and the closure of each relation (as well as that of the union of the
+    two) is computed in a single topological pass from the top of the
+    hierarchy down, each node's closure being the union of its parents and
+    their closures. The inverse of each closure is kept as well so that
+    adding an edge only updates the closures of the nodes below it.
+
+    Attributes
+    ----------
+    closures : dict[str, dict[str, set[str]]]
+        The 'isa', 'partof' and 'isa_or_partof' closures, each mapping a
+        URI to the set of URIs it is transitively related to.
+    inverses : dict[str, dict[str, set[str]]]
+        The inverses of the closures, mapping a URI to the set of URIs that
+        are transitively related to it.
+    """
+    relations = ('isa', 'partof')
+    closure_names = ('isa', 'partof', 'isa_or_partof')
+
+    def __init__(self, edges=None):
+        self.edges = {rel: collections.defaultdict(set)
+                      for rel in self.relations}
+        self.num_edges = 0
+        self.closures = {name: {} for name in self.closure_names}
+        self.inverses = {name: {} for name in self.closure_names}
+        if edges:
+            for subj, rel, obj in edges:
+                if obj not in self.edges[rel][subj]:
+                    self.edges[rel][subj].add(obj)
+                    self.num_edges += 1
+            self.build()
+
+    @classmethod
+    def from_graph(cls, graph, relations_prefix):
+        """Return a ClosureBuilder for the isa and partof edges of a graph.
+
+        Parameters
+        ----------
+        graph : rdflib.Graph
+            The RDF graph of the hierarchy.
+        relations_prefix : str
+            The URI prefix of the isa and partof relations.
+
+        Returns
+        -------
+        ClosureBuilder
+            The ClosureBuilder with the closures of the graph built.
+        """
+        return cls(cls.get_graph_edges(graph, relations_prefix))
+
+    @classmethod
+    def get_graph_edges(cls, graph, relations_prefix):
+        """Return the (subject, relation, object) edges of a graph."""
+        edges = []
+        for rel in cls.relations:
+            predicate = rdflib.term.URIRef(relations_prefix + rel)
+            for subj, obj in graph.subject_objects(predicate):
+                edges.append((subj.toPython(), rel, obj.toPython()))
+        return edges
+
+    def has_edge(self, subj, rel, obj):
+        """Return True if the given edge is in the hierarchy."""
+        return subj in self.edges[rel] and obj in self.edges[rel][subj]
+
+    def build(self):
+        """Compute all the closures from the edges."""
+        for name in self.closure_names:
+            adjacency = self._get_adjacency(name)
+            closure = _get_transitive_closure(adjacency)
+            inverse = collections.defaultdict(set)
+            for node, related in closure.items():
+                for other in related:
+                    inverse[other].add(node)
+            self.closures[name] = closure
+            self.inverses[name] = dict(inverse)
+
+    def add_edge(self, subj, rel, obj):
+        """Add an edge and update the closures incrementally.
+
+        Parameters
+        ----------
+        subj : str
+            The URI of the subject of the edge.
+        rel : str
+            The relation of the edge, 'isa' or 'partof'.
+        obj : str
+            The URI of the object of the edge.
+
+        Returns
+        -------
+        list[tuple(str, str, str)]
+            The (closure name, URI, related URI) triples that were added to
+            the closures.
+        """
+        if self.has_edge(subj, rel, obj):
+            return []
+        self.edges[rel][subj].add(obj)
+        self.num_edges += 1
+        new_pairs = []
+        for name in (rel, 'isa_or_partof'):
+            closure = self.closures[name]
+            inverse = self.inverses[name]
+            # Every node at or below the subject is now related to every
+            # node at or above the object
+            below = {subj} | inverse.get(subj, set())
+            above = {obj} | closure.get(obj, set())
+            for node in below:
+                related = closure.setdefault(node, set())
+                for other in above - related:
+                    if other == node:
+                        continue
+                    related.add(other)
+                    inverse.setdefault(other, set()).add(node)
+                    new_pairs.append((name, node, other))
+                if not related:
+                    closure.pop(node)
+        return new_pairs
+
+    def get_closure(self, name):
+        """Return a closure as a dict of lists of URIs."""
+        return {node: list(related)
+                for node, related in self.closures[name].items()}
+
+    def get_inverse(self, name):
+        """Return the inverse of a closure as a dict of lists of URIs."""
+        return {node: list(related)
+                for node, related in self.inverses[name].items()}
+
+    def _get_adjacency(self, name):
+        if name != 'isa_or_partof':
+            return self.edges[name]
+        adjacency = collections.defaultdict(set)
+        for rel in self.relations:
+            for node, objs in self.edges[rel].items():
+                adjacency[node] |= objs
+        return adjacency
+
+
+def _get_transitive_closure(adjacency):
+    # Nodes are processed once all the nodes they point to have been
+    # processed, starting from the ones that point to no nodes, so that a
+    # node's closure is the union of its parents and their closures.
+    closure = {}
+    children = collections.defaultdict(set)
+    num_pending = {}
+    for node, parents in adjacency.items():
+        num_pending[node] = len(parents)
+        for parent in parents:
+            children[parent].add(node)
+    stack = [node for node in children if not adjacency.get(node)]
+    done = set(stack)
+    while stack:
+        node = stack.pop()
+        for child in children.get(node, ()):
+            num_pending[child] -= 1
+            if num_pending[child] == 0:
+                related = set()
+                for parent in adjacency[child]:
+                    related.add(parent)
+                    related |= closure.get(parent, set())
+                closure[child] = related
+                done.add(child)
+                stack.append(child)
+    # Nodes on or below a cycle are never processed above so their closures
+    # are found by traversing the graph from them
+    for node in adjacency:
+        if node in done or not adjacency[node]:
+            continue
+        related = set()
+        frontier = list(adjacency[node])
+        while frontier:
+            other = frontier.pop()
+            if other in related:
+                continue
+            related.add(other)
+            frontier += adjacency.get(other, ())
+        related.discard(node)
+        if related:
+            closure[node] = related
+    return closure
+
+
+class CompiledHierarchy(object):
+    """Transitive closures of a hierarchy over integer node IDs.
+
+    Each URI that appears in the closures is interned to an integer ID given
+    by its position in the list of URIs, which is sorted when the closures
+    are compiled and extended by :py:meth:`update`. Each closure is stored in
+    compressed sparse row form as two arrays: the IDs of the nodes related
+    to the node with ID i are indices[indptr[i]:indptr[i+1]], in increasing
+    order, so that checking whether two nodes are related is a binary search
+    in the row of the first node.
+
+    Parameters
+    ----------
+    uris : list[str]
+        The list of URIs whose positions are their IDs.
+    closures : dict[str, tuple(numpy.ndarray, numpy.ndarray)]
+        The (indptr, indices) arrays of each closure keyed by the name of
+        the closure.
+    components : Optional[numpy.ndarray]
+        The component of each node, -1 if the node isn't part of a
+        component.
+    """
+    def __init__(self, uris, closures, components=None):
+        self.uris = uris
+        self.closures = closures
+        if components is None:
+            components = numpy.full(len(uris), -1, dtype=numpy.int32)
+        self.components = components
+        self._init_lookups()
+
+    def _init_lookups(self):
+        self.uri_ids = {uri: idx for idx, uri in enumerate(self.uris)}
+        self._init_closure_views()
+
+    def _init_closure_views(self):
+        # Memoryviews of the arrays, which are faster to index into one
+        # element at a time than the arrays, without copying them
+        self._closure_views = {name: (memoryview(indptr), memoryview(indices))
+                               for name, (indptr, indices)
+                               in self.closures.items()}
+
+    @classmethod
+    def from_closure_dicts(cls, closures, components=None):
+        """Return a CompiledHierarchy built from closures given as dicts.
+
+        Parameters
+        ----------
+        closures : dict[str, dict]
+            Closures keyed by their names, each given as a dict which maps
+            URIs to lists of related URIs.
+        components : Optional[dict[str, int]]
+            The component of each URI.
+
+        Returns
+        -------
+        CompiledHierarchy
+            The compiled closures.
+        """
+        components = components if components else {}
+        uris = set(components)
+        for closure in closures.values():
+            for uri, related in closure.items():
+                uris.add(uri)
+                uris |= set(related)
+        uris = sorted(uris)
+        uri_ids = {uri: idx for idx, uri in enumerate(uris)}
+        arrays = {}
+        for name, closure in closures.items():
+            rows = [[] for _ in uris]
+            for uri, related in closure.items():
+                rows[uri_ids[uri]] = sorted({uri_ids[r] for r in related})
+            arrays[name] = _make_csr(rows)
+        comp_array = numpy.full(len(uris), -1, dtype=numpy.int32)
+        for uri, comp in components.items():
+            comp_array[uri_ids[uri]] = comp
+        return cls(uris, arrays, comp_array)
+
+    @classmethod
+    def load(cls, fname):
+        """Return a CompiledHierarchy loaded from a file.
+
+        Parameters
+        ----------
+        fname : str
+            The name of a file written by :py:meth:`save`.
+
+        Returns
+        -------
+        CompiledHierarchy
+            The compiled closures.
+        """
+        with numpy.load(fname) as arrays:
+            uri_bytes = arrays['uris'].tobytes()
+            uris = uri_bytes.decode('utf-8').split('\n') if uri_bytes else []
+            names = [key[:-len('_indptr')] for key in arrays.files
+                     if key.endswith('_indptr')]
+            closures = {name: (arrays[name + '_indptr'],
+                               arrays[name + '_indices'])
+                        for name in names}
+            components = arrays['components']
+        return cls(uris, closures, components)
+
+    def save(self, fname):
+        """Save the compiled closures into a compressed NumPy file.
+
+        Parameters
+        ----------
+        fname : str
+            The name of the file to save the closures into.
+        """
+        uri_bytes = '\n'.join(self.uris).encode('utf-8')
+        arrays = {'uris': numpy.frombuffer(uri_bytes, dtype=numpy.uint8),
+                  'components': self.components}
+        for name, (indptr, indices) in self.closures.items():
+            arrays[name + '_indptr'] = indptr
+            arrays[name + '_indices'] = indices
+        with open(fname, 'wb') as fh:
+            numpy.savez_compressed(fh, **arrays)
+
+    def update(self, rows, components=None):
+        """Replace the rows of some URIs in the closures.
+
+        Only the given rows are rebuilt, the rest of the closure arrays is
+        copied as is. URIs that aren't in the closures yet are given IDs
+        after the existing ones.
+
+        Parameters
+        ----------
+        rows : dict[str, dict[str, list[str]]]
+            The new lists of related URIs of the changed URIs, keyed by the
+            name of the closure.
+        components : Optional[dict[str, int]]
+            The new component of each URI whose component changed.
+        """
+        components = components if components else {}
+        new_uris = set(components)
+        for closure_rows in rows.values():
+            for uri, related in closure_rows.items():
+                new_uris.add(uri)
+                new_uris |= set(related)
+        new_uris = sorted(uri for uri in new_uris if uri not in self.uri_ids)
+        for uri in new_uris:
+            self.uri_ids[uri] = len(self.uris)
+            self.uris.append(uri)
+        for name, (indptr, indices) in self.closures.items():
+            changed_rows = {self.uri_ids[uri]:
+                            sorted(self.uri_ids[r] for r in related)
+                            for uri, related in rows.get(name, {}).items()}
+            self.closures[name] = _update_csr(indptr, indices, changed_rows,
+                                              len(self.uris))
+        if new_uris:
+            self.components = numpy.concatenate(
+                [self.components,
+                 numpy.full(len(new_uris), -1, dtype=numpy.int32)])
+        for uri, comp in components.items():
+            self.components[self.uri_ids[uri]] = comp
+        self._init_closure_views()
+
+    def get_related(self, name, uri):
+        """Return the URIs related to a given URI in a given closure.
+
+        Parameters
+        ----------
+        name : str
+            The name of the closure, e.g., 'isa' or 'partof'.
+        uri : str
+            The URI whose related URIs are to be returned.
+
+        Returns
+        -------
+        list[str]
+            The list of related URIs, empty if there are none.
+        """
+        idx = self.uri_ids.get(uri)
+        if idx is None:
+            return []
+        indptr, indices = self.closures[name]
+        return [self.uris[i] for i in
+                indices[indptr[idx]:indptr[idx + 1]].tolist()]
+
+    def num_related(self, name, uri):
+        """Return the number of URIs related to a given URI in a closure."""
+        idx = self.uri_ids.get(uri)
+        if idx is None:
+            return 0
+        indptr = self.closures[name][0]
+        return int(indptr[idx + 1] - indptr[idx])
+
+    def is_related(self, name, uri1, uri2):
+        """Return True if uri2 is related to uri1 in a given closure."""
+        id1 = self.uri_ids.get(uri1)
+        id2 = self.uri_ids.get(uri2)
+        if id1 is None or id2 is None:
+            return False
+        # Binary search for id2 in the sorted row of id1, done with bisect
+        # since numpy.searchsorted has a large overhead for short rows
+        indptr, indices = self._closure_views[name]
+        start, end = indptr[id1], indptr[id1 + 1]
+        pos = bisect.bisect_left(indices, id2, start, end)
+        return pos < end and indices[pos] == id2
+
+    def get_components(self):
+        """Return a dict of the component of each URI in a component."""
+        return {self.uris[idx]: comp for idx, comp in
+                enumerate(self.components.tolist()) if comp >= 0}
+
+    def __getstate__(self):
+        # The lookups can be rebuilt from the URIs and closures
+        return {'uris': self.uris, 'closures': self.closures,
+                'components': self.components}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_lookups()
+
+
+class ClosureView(Mapping):
+    """A read-only dict-like view of a closure in a CompiledHierarchy.
+
+    The view maps each URI that has related URIs in the closure to the list
+    of these URIs, like the dicts that the closures are built in.
+
+    Parameters
+    ----------
+    compiled : CompiledHierarchy
+        The compiled closures.
+    name : str
+        The name of the closure to view.
+    """
+    def __init__(self, compiled, name):
+        self.compiled = compiled
+        self.name = name
+
+    def __getitem__(self, uri):
+        related = self.compiled.get_related(self.name, uri)
+        if not related:
+            raise KeyError(uri)
+        return related
+
+    def get(self, uri, default=None):
+        related = self.compiled.get_related(self.name, uri)
+        return related if related else default
+
+    def __contains__(self, uri):
+        return self.compiled.num_related(self.name, uri) > 0
+
+    def __iter__(self):
+        indptr = self.compiled.closures[self.name][0]
+        for idx in numpy.flatnonzero(numpy.diff(indptr)).tolist():
+            yield self.compiled.uris[idx]
+
+    def __len__(self):
+        indptr = self.compiled.closures[self.name][0]
+        return int(numpy.count_nonzero(numpy.diff(indptr)))
+
+    def contains_pair(self, uri1, uri2):
+        """Return True if uri2 is in the list of URIs related to uri1."""
+        return self.compiled.is_related(self.name, uri1, uri2)
+
+
+def _make_csr(rows):
+    indptr = numpy.zeros(len(rows) + 1, dtype=numpy.int32)
+    indptr[1:] = numpy.cumsum([len(row) for row in rows])
+    indices = numpy.array([idx for row in rows for idx in row],
+                          dtype=numpy.int32)
+    return indptr, indices
+
+
+def _update_csr(indptr, indices, rows, num_rows):
+    # The stretches of indices between the changed rows are copied over
+    # as they are, and new rows past the existing ones start out empty
+    num_old_rows = len(indptr) - 1
+    lengths = numpy.zeros(num_rows, dtype=numpy.int32)
+    lengths[:num_old_rows] = numpy.diff(indptr)
+    pieces = []
+    start = 0
+    for idx in sorted(rows):
+        pieces.append(indices[start:indptr[min(idx, num_old_rows)]])
+        pieces.append(numpy.array(rows[idx], dtype=numpy.int32))
+        start = indptr[min(idx + 1, num_old_rows)]
+        lengths[idx] = len(rows[idx])
+    pieces.append(indices[start:])
+    new_indptr = numpy.zeros(num_rows + 1, dtype=numpy.int32)
+    new_indptr[1:] = numpy.cumsum(lengths)
+    new_indices = numpy.concatenate(pieces).astype(numpy.int32, copy=False)
+    return new_indptr, new_indices
 
 
 def get_bio_hierarchies(from_pickle=True):
@@ -552,6 +1195,11 @@ def get_bio_hierarchies(from_pickle=True):
             '/../resources/bio_hierarchies.pkl'
         with open(hierarchy_file, 'rb') as fh:
             hierarchies = pickle.load(fh)
+        # Hierarchies pickled before closures were compiled store them as
+        # dicts
+        for hierarchy in hierarchies.values():
+            if getattr(hierarchy, 'compiled', None) is None:
+                hierarchy.compile_closures()
         return hierarchies
 
     # Load the default entity and modification hierarchies
@@ -0,0 +1,213 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import logging
+import collections
+from indra.belief import BeliefEngine
+from indra.statements import cached_matches_keys
+from indra.statements import stmt_type as indra_stmt_type
+from indra.util import fast_deepcopy
+from . import _merge_duplicate_evidence
+from .refinement import RefinementIndex
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalPreassembler(object):
+    """Maintain the state of preassembly to add new Statements to it.
+
+    Running the Preassembler on a corpus extended with a few new Statements
+    repeats all the work done on the Statements that were already assembled.
+    Instead, this class keeps the unique Statements of an assembled corpus
+    indexed by their shallow hash, together with the refinement relations
+    between them. New Statements are merged into existing unique Statements
+    if they are duplicates, otherwise they are added as new unique Statements
+    and only compared with their refinement candidates. Finally, beliefs are
+    only recalculated for the Statements whose evidence, or whose more
+    specific Statements' evidence has changed.
+
+    The results are the same as those of running
+    :py:func:`indra.tools.assemble_corpus.run_preassembly` with
+    `return_toplevel=False` on all the Statements added so far.
+
+    Parameters
+    ----------
+    hierarchies : dict[:py:class:`indra.preassembler.hierarchy_manager`]
+        A dictionary of hierarchies with keys such as 'entity' (hierarchy of
+        entities, primarily specifying relationships between genes and their
+        families) and 'modification' pointing to HierarchyManagers
+    stmts : Optional[list[indra.statements.Statement]]
+        A list of Statements to initialize the assembled corpus with.
+    belief_scorer : Optional[indra.belief.BeliefScorer]
+        Instance of BeliefScorer class to use in calculating Statement
+        probabilities. If None is provided (default), then the default scorer
+        is used.
+
+    Attributes
+    ----------
+    unique_stmts : dict[int, indra.statements.Statement]
+        The unique Statements of the assembled corpus keyed by their shallow
+        hash.
+    refinements : set[tuple]
+        A set of (refinement hash, refined hash) tuples, one for each pair of
+        unique Statements in which the first refines the second.
+    """
+    def __init__(self, hierarchies, stmts=None, belief_scorer=None):
+        self.hierarchies = hierarchies
+        self.belief_engine = BeliefEngine(scorer=belief_scorer)
+        self.unique_stmts = collections.OrderedDict()
+        self.refinements = set()
+        # The keys of the Evidences of each unique Statement used to filter
+        # out redundant Evidence when merging duplicates
+        self._evidence_keys = {}
+        self._refinement_index = self._make_refinement_index()
+        if stmts:
+            self.add_statements(stmts)
+
+    def add_statements(self, stmts):
+        """Add new Statements to the assembled corpus.
+
+        The Statements are copied before being merged, the Statements
+        passed in are not modified.
+
+        Parameters
+        ----------
+        stmts : list[indra.statements.Statement]
+            A list of raw Statements to add.
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The list of unique Statements whose belief was updated, i.e.,
+            the new unique Statements and the ones that gained evidence
+            directly or through the Statements refining them.
+        """
+        stmts = fast_deepcopy(list(set(stmts)))
+        logger.info('Adding %d statements to %d assembled unique statements' %
+                    (len(stmts), len(self.unique_stmts)))
+        stmts_by_hash = collections.OrderedDict()
+        for stmt in stmts:
+            # The hash is refreshed since the Statements may have been
+            # modified, e.g., by grounding mapping, since it was cached
+            stmt_hash = stmt.get_hash(shallow=True, refresh=True)
+            stmts_by_hash.setdefault(stmt_hash, []).append(stmt)
+
+        new_hashes = []
+        updated_hashes = set()
+        for stmt_hash, duplicates in stmts_by_hash.items():
+            unique_stmt = self.unique_stmts.get(stmt_hash)
+            if unique_stmt is None:
+                unique_stmt = duplicates[0].make_generic_copy()
+                if len(duplicates) == 1:
+                    unique_stmt.uuid = duplicates[0].uuid
+                self.unique_stmts[stmt_hash] = unique_stmt
+                self._evidence_keys[stmt_hash] = set()
+                new_hashes.append(stmt_hash)
+            for stmt in duplicates:
+                _merge_duplicate_evidence(unique_stmt, stmt,
+                                          self._evidence_keys[stmt_hash])
+            updated_hashes.add(stmt_hash)
+        logger.info('Found %d new unique statements' % len(new_hashes))
+
+        new_refinements = self._find_refinements(new_hashes)
+        self._link_refinements(new_refinements)
+        self.refinements |= new_refinements
+        logger.info('Found %d new refinement relations' %
+                    len(new_refinements))
+
+        updated_stmts = self._update_beliefs(updated_hashes)
+        return updated_stmts
+
+    def get_statements(self, return_toplevel=False):
+        """Return the unique Statements of the assembled corpus.
+
+        Parameters
+        ----------
+        return_toplevel : Optional[bool]
+            If True, only the top-level Statements are returned, i.e., the
+            ones that don't support any other Statements. Otherwise, all
+            unique Statements are returned. Default: False
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The list of unique Statements.
+        """
+        if return_toplevel:
+            return [st for st in self.unique_stmts.values() if not st.supports]
+        return list(self.unique_stmts.values())
+
+    def _make_refinement_index(self):
+        if not RefinementIndex.can_index(self.hierarchies):
+            return None
+        ri = RefinementIndex(self.hierarchies)
+        for stmt_hash, stmt in self.unique_stmts.items():
+            ri.add_statement(stmt_hash, stmt)
+        return ri
+
+    def _find_refinements(self, new_hashes):
+        if self._refinement_index is not None:
+            for stmt_hash in new_hashes:
+                self._refinement_index.add_statement(
+                    stmt_hash, self.unique_stmts[stmt_hash])
+        else:
+            hashes_by_type = collections.defaultdict(set)
+            for stmt_hash, stmt in self.unique_stmts.items():
+                hashes_by_type[indra_stmt_type(stmt)].add(stmt_hash)
+
+        refinements = set()
+        checked = set()
+        with cached_matches_keys():
+            for stmt_hash in new_hashes:
+                stmt = self.unique_stmts[stmt_hash]
+                if self._refinement_index is not None:
+                    candidates = \
+                        self._refinement_index.get_less_specific(stmt) | \
+                        self._refinement_index.get_more_specific(stmt)
+                else:
+                    candidates = hashes_by_type[indra_stmt_type(stmt)]
+                for other_hash in candidates:
+                    pair = tuple(sorted((stmt_hash, other_hash)))
+                    if other_hash == stmt_hash or pair in checked:
+                        continue
+                    checked.add(pair)
+                    other = self.unique_stmts[other_hash]
+                    if stmt.refinement_of(other, self.hierarchies):
+                        refinements.add((stmt_hash, other_hash))
+                    elif other.refinement_of(stmt, self.hierarchies):
+                        refinements.add((other_hash, stmt_hash))
+        return refinements
+
+    def _link_refinements(self, refinements):
+        for refinement_hash, refined_hash in refinements:
+            refinement = self.unique_stmts[refinement_hash]
+            refined = self.unique_stmts[refined_hash]
+            refinement.supported_by.append(refined)
+            refined.supports.append(refinement)
+
+    def _update_beliefs(self, updated_hashes):
+        updated_stmts = [self.unique_stmts[h] for h in updated_hashes]
+        self.belief_engine.scorer.check_prior_probs(updated_stmts)
+        # The belief of a Statement depends on the evidence of all the
+        # Statements refining it, so the beliefs of all the Statements that
+        # are supported by an updated Statement need to be recalculated.
+        affected = {}
+        stack = updated_stmts
+        while stack:
+            stmt = stack.pop()
+            if id(stmt) in affected:
+                continue
+            affected[id(stmt)] = stmt
+            stack += stmt.supported_by
+        affected_stmts = list(affected.values())
+        self.belief_engine.set_hierarchy_probs(affected_stmts)
+        return affected_stmts
+
+    def __getstate__(self):
+        # The refinement index can be rebuilt from the unique Statements
+        state = self.__dict__.copy()
+        state.pop('_refinement_index')
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._refinement_index = self._make_refinement_index()
@@ -0,0 +1,308 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import logging
+import collections
+from indra.statements import Complex, Conversion
+from indra.statements import stmt_type as indra_stmt_type
+
+logger = logging.getLogger(__name__)
+
+
+class RefinementIndex(object):
+    """Index Statements to find candidate refinement pairs by lookup.
+
+    Each Statement is indexed by the entities of its Agents, and by the
+    ancestors of these entities in the entity hierarchy (as given by the
+    `isa_or_partof_closure` of the entity HierarchyManager). A Statement
+    can only be a refinement of another one if, at each Agent position, its
+    Agent either matches the other Agent's entity or is below it in the
+    hierarchy. Looking up these keys therefore returns a superset of the
+    Statements that a given Statement could refine (or be refined by),
+    without comparing it against every other Statement. The candidates
+    returned are meant to be confirmed with `refinement_of`. As in the
+    grouping of Statements by the Preassembler, Conversions without a
+    subject are only candidates for Conversions without a subject.
+
+    Parameters
+    ----------
+    hierarchies : dict[:py:class:`indra.preassembler.hierarchy_manager`]
+        A dictionary of hierarchies with an 'entity' key pointing to a
+        HierarchyManager whose transitive closures have been built.
+    """
+    def __init__(self, hierarchies):
+        if not self.can_index(hierarchies):
+            raise ValueError('The entity hierarchy needs to have its '
+                             'transitive closures built to be indexed.')
+        self.eh = hierarchies['entity']
+        # All of the indices below are separate for each Statement type
+        # since Statements of different types can't refine each other.
+        # (slot, entity key) -> set of Statement keys whose Agents in the
+        # slot have the given entity key
+        self._entity_index = \
+            collections.defaultdict(lambda: collections.defaultdict(set))
+        # (slot, entity key) -> set of Statement keys whose Agents in the
+        # slot are equal to or below the given entity key
+        self._ancestor_index = \
+            collections.defaultdict(lambda: collections.defaultdict(set))
+        # slot -> set of Statement keys which have no Agent in the slot
+        self._empty_slots = \
+            collections.defaultdict(lambda: collections.defaultdict(set))
+        self._all_keys = collections.defaultdict(set)
+        # URI -> keys of the entries that the URI is an opposite of
+        self._opposite_keys = {}
+
+    @staticmethod
+    def can_index(hierarchies):
+        """Return True if the given hierarchies can be used for indexing."""
+        if not hierarchies or 'entity' not in hierarchies:
+            return False
+        return bool(hierarchies['entity'].build_closure)
+
+    def add_statement(self, key, stmt):
+        """Add a Statement to the index under the given key.
+
+        Parameters
+        ----------
+        key : hashable
+            A key that identifies the Statement, for instance, its index in
+            a list of Statements. Candidates are returned in terms of these
+            keys.
+        stmt : :py:class:`indra.statements.Statement`
+            The Statement to be indexed.
+        """
+        st = indra_stmt_type(stmt)
+        self._all_keys[st].add(key)
+        for slot, agents in enumerate(_get_agent_slots(stmt)):
+            if not agents and _is_no_agent_key_slot(stmt, slot):
+                self._entity_index[st][(slot, _no_agent_key)].add(key)
+                self._ancestor_index[st][(slot, _no_agent_key)].add(key)
+                continue
+            elif not agents:
+                self._empty_slots[st][slot].add(key)
+                continue
+            for agent in agents:
+                entity_keys, ancestor_keys = self._get_agent_keys(agent)
+                for ek in entity_keys:
+                    self._entity_index[st][(slot, ek)].add(key)
+                for ak in ancestor_keys:
+                    self._ancestor_index[st][(slot, ak)].add(key)
+
+    def get_less_specific(self, stmt):
+        """Return keys of indexed Statements that `stmt` may be a refinement of.
+
+        Parameters
+        ----------
+        stmt : :py:class:`indra.statements.Statement`
+            The Statement whose candidate more general Statements are to be
+            found.
+
+        Returns
+        -------
+        set
+            The keys of indexed Statements which are candidates for being
+            refined by `stmt`.
+        """
+        return self._get_candidates(stmt, self._entity_index,
+                                    use_ancestors=True)
+
+    def get_more_specific(self, stmt):
+        """Return keys of indexed Statements that may be refinements of `stmt`.
+
+        Parameters
+        ----------
+        stmt : :py:class:`indra.statements.Statement`
+            The Statement whose candidate refinements are to be found.
+
+        Returns
+        -------
+        set
+            The keys of indexed Statements which are candidates for being
+            refinements of `stmt`.
+        """
+        return self._get_candidates(stmt, self._ancestor_index,
+                                    use_ancestors=False)
+
+    def get_related(self, stmt, stmt_type=None, opposites=False):
+        """Return keys of indexed Statements whose Agents relate to `stmt`'s.
+
+        An indexed Statement is related to `stmt` if, at each Agent
+        position, its Agent matches the entity of the Agent of `stmt` or is
+        above or below it in the hierarchy. This is used to find candidate
+        pairs of contradicting Statements, which are meant to be confirmed
+        with `contradicts`.
+
+        Parameters
+        ----------
+        stmt : :py:class:`indra.statements.Statement`
+            The Statement whose related Statements are to be found.
+        stmt_type : Optional[type]
+            The type of the indexed Statements to look up. This allows
+            finding Statements of the opposite type, e.g., Inhibitions
+            related to an Activation. By default, the type of `stmt` is used.
+        opposites : Optional[bool]
+            If True, Agents that `stmt`'s Agent is an opposite of according
+            to the hierarchy are also considered to be related to it.
+            Default: False
+
+        Returns
+        -------
+        set
+            The keys of indexed Statements which are related to `stmt`.
+        """
+        st = stmt_type if stmt_type is not None else indra_stmt_type(stmt)
+        entity_index = self._entity_index[st]
+        ancestor_index = self._ancestor_index[st]
+        empty_slots = self._empty_slots[st]
+        candidates = None
+        for slot, agents in enumerate(_get_agent_slots(stmt)):
+            if not agents and _is_no_agent_key_slot(stmt, slot):
+                slot_matches = set(entity_index.get((slot, _no_agent_key),
+                                                    set()))
+            elif not agents:
+                continue
+            else:
+                slot_matches = set(empty_slots.get(slot, set()))
+            for agent in agents:
+                entity_keys, ancestor_keys = self._get_agent_keys(agent)
+                if opposites:
+                    ancestor_keys = ancestor_keys | \
+                        self._get_opposite_keys(agent)
+                # The Agents that match or are above this Agent
+                for k in ancestor_keys:
+                    slot_matches |= entity_index.get((slot, k), set())
+                # The Agents that match or are below this Agent
+                for k in entity_keys:
+                    slot_matches |= ancestor_index.get((slot, k), set())
+            candidates = slot_matches if candidates is None else \
+                (candidates & slot_matches)
+            if not candidates:
+                return set()
+        if candidates is None:
+            return set(self._all_keys[st])
+        return candidates
+
+    def _get_opposite_keys(self, agent):
+        ns, id = agent.get_grounding()
+        if not (ns and id):
+            return set()
+        uri = self.eh.get_uri(ns, id)
+        if uri not in self._opposite_keys:
+            self._opposite_keys[uri] = \
+                {('uri', opp_uri) for opp_uri in self.eh.get_opposites(uri)}
+        return self._opposite_keys[uri]
+
+    def _get_candidates(self, stmt, index, use_ancestors):
+        st = indra_stmt_type(stmt)
+        type_index = index[st]
+        empty_slots = self._empty_slots[st]
+        candidates = None
+        for slot, agents in enumerate(_get_agent_slots(stmt)):
+            # If this Statement doesn't have an Agent in the slot, the slot
+            # doesn't constrain the candidates, unless not having an Agent
+            # in the slot is a key of its own
+            if not agents and _is_no_agent_key_slot(stmt, slot):
+                slot_matches = set(type_index.get((slot, _no_agent_key),
+                                                  set()))
+            elif not agents:
+                continue
+            else:
+                slot_matches = set(empty_slots.get(slot, set()))
+            for agent in agents:
+                entity_keys, ancestor_keys = self._get_agent_keys(agent)
+                for k in (ancestor_keys if use_ancestors else entity_keys):
+                    slot_matches |= type_index.get((slot, k), set())
+            candidates = slot_matches if candidates is None else \
+                (candidates & slot_matches)
+            if not candidates:
+                return set()
+        if candidates is None:
+            return set(self._all_keys[st])
+        return candidates
+
+    def _get_agent_keys(self, agent):
+        # The keys of the Agent itself are its entity_matches_key and, if it
+        # is grounded, the URI of its grounding in the entity hierarchy. The
+        # ancestor keys also include all the URIs that the grounding is
+        # an isa or partof of, which is what Agent.isa and Concept.isa
+        # rely on.
+        entity_keys = {('entity', agent.entity_matches_key())}
+        ancestor_keys = set(entity_keys)
+        ns, id = agent.get_grounding()
+        if ns and id:
+            uri = self.eh.get_uri(ns, id)
+            entity_keys.add(('uri', uri))
+            for parent_uri in self.eh.isa_or_partof_closure.get(uri, []):
+                ancestor_keys.add(('uri', parent_uri))
+        return entity_keys, ancestor_keys
+
+
+def get_candidate_pairs(stmt_tuples, hierarchies, split_idx=None):
+    """Return pairs of Statements that are candidates for refinement.
+
+    This is used in place of comparing all pairs of Statements in a group.
+    The pairs are returned in the same orientation (and with the same
+    split_idx semantics) as the exhaustive comparison would produce them.
+
+    Parameters
+    ----------
+    stmt_tuples : list of tuple(int, :py:class:`indra.statements.Statement`)
+        A list of (index, Statement) tuples.
+    hierarchies : dict[:py:class:`indra.preassembler.hierarchy_manager`]
+        A dictionary of hierarchies used for indexing.
+    split_idx : Optional[int]
+        If given, only pairs of Statements with one index at or below
+        split_idx and the other one above it are returned.
+
+    Returns
+    -------
+    list of tuple
+        A list of pairs of (index, Statement) tuples.
+    """
+    ri = RefinementIndex(hierarchies)
+    for pos, (_, stmt) in enumerate(stmt_tuples):
+        ri.add_statement(pos, stmt)
+    pos_pairs = set()
+    for pos, (_, stmt) in enumerate(stmt_tuples):
+        for other_pos in ri.get_less_specific(stmt):
+            if other_pos != pos:
+                pos_pairs.add((min(pos, other_pos), max(pos, other_pos)))
+    pairs = []
+    for pos1, pos2 in sorted(pos_pairs):
+        stmt_tuple1, stmt_tuple2 = stmt_tuples[pos1], stmt_tuples[pos2]
+        if split_idx is not None:
+            in_a1 = stmt_tuple1[0] <= split_idx
+            in_a2 = stmt_tuple2[0] <= split_idx
+            if in_a1 == in_a2:
+                continue
+            if in_a2:
+                stmt_tuple1, stmt_tuple2 = stmt_tuple2, stmt_tuple1
+        pairs.append((stmt_tuple1, stmt_tuple2))
+    return pairs
+
+
+def _get_agent_slots(stmt):
+    # Agents are grouped into slots which are compared with each other
+    # across Statements. For most Statements each Agent position is its own
+    # slot, whereas members of Complexes and the reactants and products of
+    # Conversions are unordered within their slot.
+    if isinstance(stmt, Complex):
+        return [_not_none(stmt.agent_list())]
+    elif isinstance(stmt, Conversion):
+        return [_not_none([stmt.subj]), _not_none(stmt.obj_from),
+                _not_none(stmt.obj_to)]
+    else:
+        return [_not_none([agent]) for agent in stmt.agent_list()]
+
+
+# The Preassembler only groups Conversions without a subject with each
+# other, so in the subject slot of Conversions, not having an Agent is
+# indexed as a key of its own that only matches itself
+_no_agent_key = ('no_agent', None)
+
+
+def _is_no_agent_key_slot(stmt, slot):
+    return isinstance(stmt, Conversion) and slot == 0
+
+
+def _not_none(agents):
+    return [agent for agent in agents if agent is not None]
@@ -0,0 +1,128 @@
+"""A persistent cache of the sites mapped by the SiteMapper.
+
+Mapping a site requires looking up the reference sequence of the protein and
+possibly PhosphoSitePlus data, which is slow when done for the millions of
+sites in a large corpus. This module stores the MappedSite found for each
+(UniProt ID, residue, position) triple, and the mapping options used, in an
+SQLite database. The database can be shared between processes and between
+runs, so sites mapped once don't need to be mapped again. The cache should be
+deleted when the site map or the protmapper resources change.
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import json
+import sqlite3
+import logging
+from protmapper import MappedSite
+
+logger = logging.getLogger(__name__)
+
+
+# The attributes of a MappedSite, as serialized by MappedSite.to_json
+_mapped_site_fields = ('up_id', 'error_code', 'valid', 'orig_res',
+                       'orig_pos', 'mapped_id', 'mapped_res', 'mapped_pos',
+                       'description', 'gene_name')
+
+
+class SiteMappingCache(object):
+    """An SQLite cache of MappedSites shared between processes.
+
+    Parameters
+    ----------
+    path : str
+        The path to the SQLite database file of the cache. The file is
+        created if it doesn't exist.
+    timeout : Optional[float]
+        The number of seconds to wait for another process writing to the
+        cache to finish. Default: 60
+    """
+    def __init__(self, path, timeout=60):
+        self.path = path
+        # The connection is kept open by a SiteMapper, which may be used
+        # from other threads than the one it was created in
+        self._conn = sqlite3.connect(path, timeout=timeout,
+                                     check_same_thread=False)
+        # Write-ahead logging lets processes read the cache while another
+        # one writes to it
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS mapped_sites '
+                               '(up_id TEXT, residue TEXT, position TEXT, '
+                               'options TEXT, mapped_site TEXT, '
+                               'PRIMARY KEY (up_id, residue, position, '
+                               'options))')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the connection to the database."""
+        self._conn.close()
+
+    def get_mapped_sites(self, sites, options):
+        """Return the cached MappedSites for a list of sites.
+
+        Parameters
+        ----------
+        sites : iterable of tuple
+            (UniProt ID, residue, position) tuples of the sites to look up.
+        options : tuple
+            The mapping options the sites were mapped with, e.g., the
+            values of do_methionine_offset, do_orthology_mapping and
+            do_isoform_mapping, and a digest of the site map.
+
+        Returns
+        -------
+        dict
+            A dict of the MappedSites (or None if no MappedSite was found
+            when mapping) keyed by site, for the sites found in the cache.
+        """
+        options_key = _get_options_key(options)
+        cached_sites = {}
+        for site in sites:
+            row = self._conn.execute('SELECT mapped_site FROM mapped_sites '
+                                     'WHERE up_id=? AND residue=? AND '
+                                     'position=? AND options=?',
+                                     tuple(site) + (options_key,)).fetchone()
+            if row is not None:
+                cached_sites[site] = _mapped_site_from_json(row[0])
+        return cached_sites
+
+    def put_mapped_sites(self, mapped_sites, options):
+        """Add MappedSites to the cache.
+
+        Parameters
+        ----------
+        mapped_sites : dict
+            A dict of the MappedSites (or None) keyed by (UniProt ID,
+            residue, position) tuples.
+        options : tuple
+            The mapping options the sites were mapped with.
+        """
+        options_key = _get_options_key(options)
+        rows = [tuple(site) + (options_key, _mapped_site_to_json(ms))
+                for site, ms in mapped_sites.items()]
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO mapped_sites '
+                                   'VALUES (?, ?, ?, ?, ?)', rows)
+        logger.debug('Cached %d mapped sites in %s' % (len(rows), self.path))
+
+
+def _get_options_key(options):
+    return json.dumps(list(options))
+
+
+def _mapped_site_to_json(mapped_site):
+    if mapped_site is None:
+        return None
+    return json.dumps({field: getattr(mapped_site, field)
+                       for field in _mapped_site_fields})
+
+
+def _mapped_site_from_json(mapped_site_json):
+    if mapped_site_json is None:
+        return None
+    return MappedSite(**json.loads(mapped_site_json))
@@ -1,14 +1,20 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 from future.utils import python_2_unicode_compatible
+import sys
+import json
+import hashlib
 import logging
 import textwrap
+import multiprocessing as mp
 import requests
 from copy import deepcopy
 from functools import lru_cache
+from collections import OrderedDict
 from protmapper.api import ProtMapper, default_site_map
 from indra.statements import *
 from indra.databases import hgnc_client
+from .site_cache import SiteMappingCache
 # Python 2
 try:
     basestring
@@ -95,6 +101,12 @@ class SiteMapper(ProtMapper):
         in other human isoforms of the protein (based on PhosphoSitePlus
         data). If a site is found that is linked to a site in the human
         reference sequence, a mapping is created. Default is True.
+    site_cache_path : Optional[str]
+        The path to an SQLite file in which the mapped sites are cached
+        persistently (see :py:class:`indra.preassembler.site_cache.\
+SiteMappingCache`). The cache can be shared by SiteMappers in different
+        processes. If None, mapped sites are only kept in memory for the
+        lifetime of the SiteMapper. Default: None
 
     Examples
     --------
@@ -128,15 +140,26 @@ class SiteMapper(ProtMapper):
     """
     def __init__(self, site_map=None, use_cache=False, cache_path=None,
                  do_methionine_offset=True, do_orthology_mapping=True,
-                 do_isoform_mapping=True):
+                 do_isoform_mapping=True, site_cache_path=None):
         super(SiteMapper, self).__init__(site_map, use_cache, cache_path)
         self.do_methionine_offset = do_methionine_offset
         self.do_orthology_mapping = do_orthology_mapping
         self.do_isoform_mapping = do_isoform_mapping
+        self.site_cache_path = site_cache_path
+        # The MappedSites of the Statements being mapped by map_sites, and
+        # the most recently used MappedSites of Statements mapped one by
+        # one, keyed by the site and the mapping options
+        self._batch_mapped_sites = {}
+        self._mapped_sites = OrderedDict()
+        # The connection to the persistent cache, opened when first needed
+        self._site_cache = None
+        # The digest of the site map, computed when first needed
+        self._site_map_digest = None
 
     def map_stmt_sites(self, stmt, ):
-        stmt_copy = deepcopy(stmt)
-        # For all statements, replace agents with invalid modifications
+        # For all statements, replace agents with invalid modifications. The
+        # agents are only copied if they have invalid sites, and the
+        # statement only if it has any.
         mapped_sites = []
         new_agent_list = []
 
@@ -150,21 +173,22 @@ class SiteMapper(ProtMapper):
             mapped_sites += agent_mapped_sites
 
             # Site map agents in the bound conditions
-            for ind in range(len(new_agent.bound_conditions)):
-                b = new_agent.bound_conditions[ind].agent
-                agent_mapped_sites, new_b = self._map_agent_sites(b)
+            for ind, bc in enumerate(agent.bound_conditions):
+                agent_mapped_sites, new_b = self._map_agent_sites(bc.agent)
                 mapped_sites += agent_mapped_sites
-                new_agent.bound_conditions[ind].agent = new_b
+                if new_b is not bc.agent:
+                    if new_agent is agent:
+                        new_agent = deepcopy(agent)
+                    new_agent.bound_conditions[ind].agent = new_b
 
             new_agent_list.append(new_agent)
 
-        # If we made any actual mappings, we set the new agent list which
-        # includes any mapped agents
-        if any([ms.has_mapping() for ms in mapped_sites]):
-            stmt_copy.set_agent_list(new_agent_list)
+        # Whether we made any actual mappings on the agents
+        agents_mapped = any([ms.has_mapping() for ms in mapped_sites])
 
         # --- Special handling for these statements ---
-        # For modifications, fix residue and position
+        # For modifications, check the residue and position
+        stmt_mapped_site = None
         if (isinstance(stmt, Modification) or
             isinstance(stmt, SelfModification)) and \
            stmt.residue is not None and stmt.position is not None:
@@ -173,34 +197,40 @@ class SiteMapper(ProtMapper):
                    isinstance(stmt.position, basestring)
             # Get the right agent depending on whether this is a
             # Modification or SelfModification statement
-            agent_to_check = (stmt_copy.sub
-                              if isinstance(stmt, Modification)
-                              else stmt_copy.enz)
+            agent_to_check = (stmt.sub if isinstance(stmt, Modification)
+                              else stmt.enz)
             # Check the modification on the appropriate agent
             old_mod = stmt._get_mod_condition()
             # Figure out if this site is invalid
             stmt_mapped_site = self._map_agent_mod(agent_to_check, old_mod)
+            # If there is a mapped site object at all (whether or not there
+            # is an actual successful mapping), we add that to the list of
+            # mapped sites
             if stmt_mapped_site is not None:
-                # If we got a mapping for the site, we apply that mapping to the
-                # copy of the statement
-                if stmt_mapped_site.has_mapping():
-                    stmt_copy.residue = stmt_mapped_site.mapped_res
-                    stmt_copy.position = stmt_mapped_site.mapped_pos
-                # Additionally, if there is a mapped site object at all
-                # (whether or not there is an actual successful mapping), we
-                # add that to the list of mapped sites
                 mapped_sites.append(stmt_mapped_site)
         # We only return a MappedStatement if it has at least one MappedSite
         # that is known to be invalid (whether of not it as successfully
         # mapped). Otherwise we return None.
-        if any([(ms is not None and not ms.not_invalid())
-                for ms in mapped_sites]):
-            mapped_stmt = MappedStatement(stmt, mapped_sites, stmt_copy)
-        else:
-            mapped_stmt = None
-        return mapped_stmt
-
-    def map_sites(self, stmts):
+        if not any([(ms is not None and not ms.not_invalid())
+                    for ms in mapped_sites]):
+            return None
+        stmt_copy = deepcopy(stmt)
+        # If we made any actual mappings, we set the new agent list which
+        # includes any mapped agents
+        if agents_mapped:
+            stmt_copy.set_agent_list(
+                [new_agent if new_agent is not agent else agent_copy
+                 for agent, new_agent, agent_copy in
+                 zip(stmt.agent_list(), new_agent_list,
+                     stmt_copy.agent_list())])
+        # If we got a mapping for the site of a modification, we apply that
+        # mapping to the copy of the statement
+        if stmt_mapped_site is not None and stmt_mapped_site.has_mapping():
+            stmt_copy.residue = stmt_mapped_site.mapped_res
+            stmt_copy.position = stmt_mapped_site.mapped_pos
+        return MappedStatement(stmt, mapped_sites, stmt_copy)
+
+    def map_sites(self, stmts, poolsize=None, chunk_size=10000):
         """Check a set of statements for invalid modification sites.
 
         Statements are checked against Uniprot reference sequences to determine
@@ -218,6 +248,14 @@ class SiteMapper(ProtMapper):
         ----------
         stmts : list of :py:class:`indra.statement.Statement`
             The statements to check for site errors.
+        poolsize : Optional[int]
+            The number of worker processes to map the statements in. Each
+            worker gets a SiteMapper with the same site map and options as
+            this one. If None, the statements are mapped in this process.
+            Default: None
+        chunk_size : Optional[int]
+            The number of statements sent to a worker process at a time.
+            Only relevant when poolsize is given. Default: 10000
 
         Returns
         -------
@@ -228,13 +266,15 @@ class SiteMapper(ProtMapper):
             contain any site errors. The second element of the tuple is a list
             of mapped statements (:py:class:`MappedStatement`) with information
             on the incorrect sites and corresponding statements with correctly
-            mapped sites.
+            mapped sites. Both lists are in the order of the statements
+            given.
         """
+        if poolsize is not None:
+            return self._map_sites_mp(stmts, poolsize, chunk_size)
         valid_statements = []
         mapped_statements = []
 
-        for stmt in stmts:
-            mapped_stmt = self.map_stmt_sites(stmt)
+        for stmt, mapped_stmt in zip(stmts, self._map_stmts_sites(stmts)):
             # If we got a MappedStatement as a return value, we add that to the
             # list of mapped statements, otherwise, the original Statement is
             # not invalid so we add it to the other list directly.
@@ -245,6 +285,53 @@ class SiteMapper(ProtMapper):
 
         return valid_statements, mapped_statements
 
+    def _map_stmts_sites(self, stmts):
+        """Return the MappedStatement (or None) of each of the Statements."""
+        # Each unique site in the statements is mapped only once, and the
+        # MappedSites are only kept while mapping this batch
+        self._batch_mapped_sites = self._map_unique_sites(stmts)
+        try:
+            return [self.map_stmt_sites(stmt) for stmt in stmts]
+        finally:
+            self._batch_mapped_sites = {}
+
+    def _map_sites_mp(self, stmts, poolsize, chunk_size):
+        # The statements are split into contiguous chunks so that the results
+        # can be put back together in the original order
+        chunks = [stmts[i:i + chunk_size]
+                  for i in range(0, len(stmts), chunk_size)]
+        logger.info('Mapping sites on %d statements in %d chunks using '
+                    'multiprocessing with poolsize %d' %
+                    (len(stmts), len(chunks), poolsize))
+        # Each worker makes its SiteMapper once, so the site map is sent to
+        # it only once and the sequences are loaded only once per worker
+        mapper_kwargs = {'site_map': self.site_map,
+                         'do_methionine_offset': self.do_methionine_offset,
+                         'do_orthology_mapping': self.do_orthology_mapping,
+                         'do_isoform_mapping': self.do_isoform_mapping,
+                         'site_cache_path': self.site_cache_path}
+        if sys.version_info[0] >= 3 and sys.version_info[1] >= 4:
+            ctx = mp.get_context('spawn')
+        else:
+            ctx = mp
+        pool = ctx.Pool(poolsize, initializer=_init_worker_site_mapper,
+                        initargs=(mapper_kwargs,))
+        try:
+            chunk_results = pool.map(_map_stmt_sites_chunk, chunks)
+        finally:
+            pool.close()
+            pool.join()
+        valid_statements = []
+        mapped_statements = []
+        for chunk, chunk_mapped_stmts in zip(chunks, chunk_results):
+            for stmt, mapped_stmt in zip(chunk, chunk_mapped_stmts):
+                if mapped_stmt is not None:
+                    mapped_stmt.original_stmt = stmt
+                    mapped_statements.append(mapped_stmt)
+                else:
+                    valid_statements.append(stmt)
+        return valid_statements, mapped_statements
+
     def _map_agent_sites(self, agent):
         """Check an agent for invalid sites and update if necessary.
 
@@ -261,10 +348,10 @@ class SiteMapper(ProtMapper):
             of it.
         """
         # If there are no modifications on this agent, then we can return the
-        # copy of the agent
+        # agent itself
         if agent is None or not agent.mods:
             return [], agent
-        new_agent = deepcopy(agent)
+        new_agent = agent
         mapped_sites = []
         # Now iterate over all the modifications and map each one
         for idx, mod_condition in enumerate(agent.mods):
@@ -282,6 +369,9 @@ class SiteMapper(ProtMapper):
                                   mapped_site.mapped_res,
                                   mapped_site.mapped_pos,
                                   mod_condition.is_modified)
+                # The agent is copied when its first site is mapped
+                if new_agent is agent:
+                    new_agent = deepcopy(agent)
                 new_agent.mods[idx] = mc
             # Finally, whether or not we have a mapping, we keep track of mapped
             # sites and make them available to the caller
@@ -314,19 +404,146 @@ class SiteMapper(ProtMapper):
         if mod_condition.position is None or mod_condition.residue is None:
             return None
         # Otherwise, try to map it and return the mapped site
-        mapped_site = \
-            self.map_to_human_ref(up_id, 'uniprot',
-                mod_condition.residue,
-                mod_condition.position,
-                do_methionine_offset=self.do_methionine_offset,
-                do_orthology_mapping=self.do_orthology_mapping,
-                do_isoform_mapping=self.do_isoform_mapping)
+        site = (up_id, mod_condition.residue, mod_condition.position)
+        key = (site, self._get_mapping_options())
+        if key in self._batch_mapped_sites:
+            return self._batch_mapped_sites[key]
+        if key in self._mapped_sites:
+            self._mapped_sites.move_to_end(key)
+            return self._mapped_sites[key]
+        mapped_site = self._map_sites_with_cache([site])[site]
+        self._mapped_sites[key] = mapped_site
+        if len(self._mapped_sites) > _max_mapped_sites:
+            self._mapped_sites.popitem(last=False)
         return mapped_site
 
+    def _get_mapping_options(self):
+        # The site map is part of the options so that SiteMappers with
+        # different site maps sharing a persistent cache don't get each
+        # other's MappedSites
+        if self._site_map_digest is None:
+            self._site_map_digest = _get_site_map_digest(self.site_map)
+        return (self.do_methionine_offset, self.do_orthology_mapping,
+                self.do_isoform_mapping, self._site_map_digest)
+
+    def _map_unique_sites(self, stmts):
+        """Return the MappedSites of the unique sites of the Statements."""
+        options = self._get_mapping_options()
+        mapped_sites = {}
+        sites = set()
+        for stmt in stmts:
+            for site in _get_stmt_sites(stmt):
+                key = (site, options)
+                if key in self._mapped_sites:
+                    mapped_sites[key] = self._mapped_sites[key]
+                else:
+                    sites.add(site)
+        if sites:
+            logger.info('Mapping %d unique sites' % len(sites))
+            for site, mapped_site in \
+                    self._map_sites_with_cache(sorted(sites)).items():
+                mapped_sites[(site, options)] = mapped_site
+        return mapped_sites
+
+    def _map_sites_with_cache(self, sites):
+        """Map sites, looking them up in the persistent cache first."""
+        options = self._get_mapping_options()
+        if self.site_cache_path:
+            site_cache = self._get_site_cache()
+            mapped_sites = site_cache.get_mapped_sites(sites, options)
+            new_mapped_sites = {site: self._map_site(site)
+                                for site in sites
+                                if site not in mapped_sites}
+            if new_mapped_sites:
+                site_cache.put_mapped_sites(new_mapped_sites, options)
+            logger.info('Found %d sites in the cache, mapped %d' %
+                        (len(mapped_sites), len(new_mapped_sites)))
+            mapped_sites.update(new_mapped_sites)
+        else:
+            mapped_sites = {site: self._map_site(site) for site in sites}
+        return mapped_sites
+
+    def _get_site_cache(self):
+        # The connection is kept open for the lifetime of the SiteMapper,
+        # and reopened if the path of the cache is changed
+        if self._site_cache is None or \
+                self._site_cache.path != self.site_cache_path:
+            if self._site_cache is not None:
+                self._site_cache.close()
+            self._site_cache = SiteMappingCache(self.site_cache_path)
+        return self._site_cache
+
+    def _map_site(self, site):
+        up_id, residue, position = site
+        return self.map_to_human_ref(
+            up_id, 'uniprot', residue, position,
+            do_methionine_offset=self.do_methionine_offset,
+            do_orthology_mapping=self.do_orthology_mapping,
+            do_isoform_mapping=self.do_isoform_mapping)
+
+
+# The maximum number of MappedSites kept by a SiteMapper between calls
+_max_mapped_sites = 10000
+
 
 default_mapper = SiteMapper(default_site_map)
 
 
+# The SiteMapper of a worker process of SiteMapper.map_sites
+_worker_site_mapper = None
+
+
+def _init_worker_site_mapper(mapper_kwargs):
+    global _worker_site_mapper
+    _worker_site_mapper = SiteMapper(**mapper_kwargs)
+
+
+def _map_stmt_sites_chunk(stmts):
+    mapped_stmts = _worker_site_mapper._map_stmts_sites(stmts)
+    for mapped_stmt in mapped_stmts:
+        # The original statement is put back by the parent process and
+        # doesn't need to be sent back
+        if mapped_stmt is not None:
+            mapped_stmt.original_stmt = None
+    return mapped_stmts
+
+
+def _get_site_map_digest(site_map):
+    """Return a SHA-256 digest of the contents of a site map."""
+    entries = sorted(json.dumps([key, value], default=str)
+                     for key, value in (site_map or {}).items())
+    return hashlib.sha256('\n'.join(entries).encode('utf-8')).hexdigest()
+
+
+def _get_stmt_sites(stmt):
+    """Return the (UniProt ID, residue, position) of the sites in a Statement.
+
+    These are the sites checked by :py:meth:`SiteMapper.map_stmt_sites`: the
+    modifications of the Agents and of the Agents in their bound conditions,
+    and the site of Modification and SelfModification Statements.
+    """
+    agent_mods = []
+    for agent in stmt.agent_list():
+        if agent is None:
+            continue
+        agent_mods += [(agent, mod) for mod in agent.mods]
+        for bc in agent.bound_conditions:
+            agent_mods += [(bc.agent, mod) for mod in bc.agent.mods]
+    if (isinstance(stmt, Modification) or
+        isinstance(stmt, SelfModification)) and \
+       stmt.residue is not None and stmt.position is not None:
+        agent = stmt.sub if isinstance(stmt, Modification) else stmt.enz
+        agent_mods.append((agent, stmt._get_mod_condition()))
+    sites = []
+    for agent, mod in agent_mods:
+        if mod.residue is None or mod.position is None:
+            continue
+        up_id = _get_uniprot_id(agent)
+        if up_id:
+            sites.append((up_id, mod.residue, mod.position))
+    return sites
+
+
 # TODO: determine if this should be done in the protmapper or if this is the
 # preferred place
 @lru_cache(maxsize=10000)
@@ -1,12 +1,16 @@
 import os
 import json
 import rdflib
+import hashlib
 import logging
 from rdflib.plugins.parsers.ntriples import ParseError
 
+from indra.config import get_config
 from indra.databases import ndex_client
 from .rdf_processor import BelRdfProcessor
 from .processor import PybelProcessor
+from .corpus_cache import PybelCorpusCache, load_corpus_cache, \
+    get_corpus_signature
 import pybel
 
 from functools import lru_cache
@@ -72,7 +76,8 @@ def process_ndex_neighborhood(gene_names, network_id=None,
 
 
 def process_pybel_neighborhood(gene_names, network_file=None,
-                               network_type='belscript', **kwargs):
+                               network_type='belscript', use_cache=False,
+                               cache_path=None, **kwargs):
     """Return PybelProcessor around neighborhood of given genes in a network.
 
     This function processes the given network file and filters the returned
@@ -87,6 +92,18 @@ def process_pybel_neighborhood(gene_names, network_file=None,
         This function allows processing both BEL Script files and JSON files.
         This argument controls which type is assumed to be processed, and the
         value can be either 'belscript' or 'json'. Default: bel_script
+    use_cache : Optional[bool]
+        If True, the Statements processed from the network file are cached
+        on disk along with an index of the Statements by Agent name, and
+        only the Statements in the neighborhood of the genes are loaded
+        from the cache. The cache is rebuilt if the network file changes.
+        The returned PybelProcessor then has no graph. Default: False
+    cache_path : Optional[str]
+        The path to the cache file. By default, the cache file is in the
+        directory set by the BEL_CORPUS_CACHE_DIR configuration entry or
+        environment variable, or in ~/.indra/bel_corpus_cache if it isn't
+        set. If the cache can't be written, the network file is processed
+        without caching.
 
     Returns
     -------
@@ -99,10 +116,32 @@ def process_pybel_neighborhood(gene_names, network_file=None,
         network_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
                                     os.path.pardir, os.path.pardir,
                                     os.path.pardir, 'data', 'large_corpus.bel')
-    if network_type == 'belscript':
-        bp = process_belscript(network_file, **kwargs)
-    elif network_type == 'json':
-        bp = process_json_file(network_file)
+    bp = None
+    if use_cache:
+        if cache_path is None:
+            cache_path = _get_default_cache_path(network_file)
+        signature = get_corpus_signature(network_file, network_type, **kwargs)
+        try:
+            cache = load_corpus_cache(cache_path, signature)
+            if cache is None:
+                logger.info('Building the cache of %s in %s' %
+                            (network_file, cache_path))
+                bp = _process_network_file(network_file, network_type,
+                                           **kwargs)
+                cache_dir = os.path.dirname(cache_path)
+                if cache_dir and not os.path.exists(cache_dir):
+                    os.makedirs(cache_dir)
+                cache = PybelCorpusCache.build(bp.statements, cache_path,
+                                               signature)
+            cache_bp = PybelProcessor(None)
+            cache_bp.statements = cache.get_statements_by_name(gene_names)
+            return cache_bp
+        except (OSError, ValueError) as e:
+            logger.warning('Could not use the cache in %s, processing %s '
+                           'without it: %s' % (cache_path, network_file, e))
+
+    if bp is None:
+        bp = _process_network_file(network_file, network_type, **kwargs)
 
     filtered_stmts = []
     for stmt in bp.statements:
@@ -119,6 +158,26 @@ def process_pybel_neighborhood(gene_names, network_file=None,
     return bp
 
 
+def _get_default_cache_path(network_file):
+    cache_dir = get_config('BEL_CORPUS_CACHE_DIR')
+    if not cache_dir:
+        cache_dir = os.path.join(os.path.expanduser('~'), '.indra',
+                                 'bel_corpus_cache')
+    # The path of the network file is hashed into the name of the cache file
+    # so that network files with the same name don't share a cache
+    network_path = os.path.abspath(network_file)
+    path_hash = hashlib.md5(network_path.encode('utf-8')).hexdigest()[:8]
+    name = os.path.splitext(os.path.basename(network_file))[0]
+    return os.path.join(cache_dir, '%s_%s.stmts' % (name, path_hash))
+
+
+def _process_network_file(network_file, network_type, **kwargs):
+    if network_type == 'belscript':
+        return process_belscript(network_file, **kwargs)
+    elif network_type == 'json':
+        return process_json_file(network_file)
+
+
 def process_belrdf(rdf_str, print_output=True):
     """Return a BelRdfProcessor for a BEL/RDF string.
 
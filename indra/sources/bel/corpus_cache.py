@@ -0,0 +1,247 @@
+"""An on-disk cache of the Statements processed from a BEL corpus.
+
+Processing a large BEL corpus like the BEL Large Corpus with PyBEL takes
+minutes. This module stores the Statements extracted from a corpus in a
+:py:class:`indra.statements.store.StatementStore` file, together with an
+index from the names and groundings of Agents to the positions of the
+Statements they appear in. Neighborhood queries then only load the matching
+Statements from the store. The cache records the SHA-256 hash of the corpus
+file it was built from and is rebuilt when the file changes.
+
+The store and the index are each written to a temporary file and moved into
+place, and both record the signature of the corpus and an ID of the build,
+so that a store and an index written by different builds are never used
+together.
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import os
+import json
+import uuid
+import hashlib
+import logging
+import tempfile
+from functools import lru_cache
+from indra.statements.store import StatementStore, dump_statement_store
+
+logger = logging.getLogger(__name__)
+
+
+class PybelCorpusCache(object):
+    """Look up Statements processed from a BEL corpus in an on-disk cache.
+
+    Parameters
+    ----------
+    cache_path : str
+        The path to the statement store file of the cache. The index is
+        stored next to it, in a file with the .index.json suffix added.
+
+    Attributes
+    ----------
+    index : dict
+        The index of the cache, containing the signature of the corpus file
+        the cache was built from and the positions of the Statements by
+        Agent name and by Agent grounding.
+    """
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        index_path = _get_index_path(cache_path)
+        self.index = _load_index(index_path, os.path.getmtime(index_path))
+
+    @classmethod
+    def build(cls, stmts, cache_path, signature):
+        """Write Statements and their index into a new cache.
+
+        Parameters
+        ----------
+        stmts : list[indra.statements.Statement]
+            The Statements processed from the corpus.
+        cache_path : str
+            The path to the statement store file of the cache.
+        signature : dict
+            The signature of the corpus file and of the processing
+            arguments, as returned by :py:func:`get_corpus_signature`.
+
+        Returns
+        -------
+        PybelCorpusCache
+            The cache built from the Statements.
+        """
+        names = {}
+        groundings = {}
+        for idx, stmt in enumerate(stmts):
+            for agent in stmt.agent_list():
+                if agent is None:
+                    continue
+                names.setdefault(agent.name, set()).add(idx)
+                for db_ns, db_id in agent.db_refs.items():
+                    key = '%s:%s' % (db_ns, db_id)
+                    groundings.setdefault(key, set()).add(idx)
+        build_id = uuid.uuid4().hex
+        index = {'signature': signature,
+                 'build_id': build_id,
+                 'names': {k: sorted(v) for k, v in names.items()},
+                 'groundings': {k: sorted(v) for k, v in groundings.items()}}
+        # The files are written under unique temporary names and then moved
+        # into place so that a partially written cache is never read, even
+        # if several processes build the cache at the same time
+        index_path = _get_index_path(cache_path)
+        store_tmp_path = _get_temp_path(cache_path)
+        index_tmp_path = _get_temp_path(index_path)
+        try:
+            dump_statement_store(stmts, store_tmp_path,
+                                 metadata={'signature': signature,
+                                           'build_id': build_id})
+            with open(index_tmp_path, 'w') as fh:
+                json.dump(index, fh)
+            os.replace(store_tmp_path, cache_path)
+            os.replace(index_tmp_path, index_path)
+        finally:
+            for tmp_path in (store_tmp_path, index_tmp_path):
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        logger.info('Cached %d statements in %s' % (len(stmts), cache_path))
+        return cls(cache_path)
+
+    def is_valid(self, signature):
+        """Return True if the cache was built for the given signature.
+
+        The cache is also invalid if its store and its index were written
+        by different builds.
+
+        Parameters
+        ----------
+        signature : dict
+            The signature of the corpus file and of the processing
+            arguments, as returned by :py:func:`get_corpus_signature`.
+        """
+        if self.index['signature'] != signature:
+            return False
+        with StatementStore(self.cache_path) as store:
+            return self._matches_store(store)
+
+    def _matches_store(self, store):
+        metadata = store.get_metadata() or {}
+        return metadata.get('signature') == self.index['signature'] and \
+            metadata.get('build_id') == self.index.get('build_id')
+
+    def get_statements_by_name(self, names):
+        """Return the Statements with an Agent with one of the given names.
+
+        Parameters
+        ----------
+        names : list[str]
+            A list of Agent names, e.g., HGNC gene symbols.
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The Statements, in the order they were processed from the corpus.
+        """
+        return self._get_statements(self.index['names'], names)
+
+    def get_statements_by_grounding(self, groundings):
+        """Return the Statements with an Agent with one of the groundings.
+
+        Parameters
+        ----------
+        groundings : list[tuple(str, str)]
+            A list of (namespace, ID) tuples, e.g., [('HGNC', '1097')].
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The Statements, in the order they were processed from the corpus.
+        """
+        return self._get_statements(self.index['groundings'],
+                                    ['%s:%s' % g for g in groundings])
+
+    def _get_statements(self, index, keys):
+        indices = set()
+        for key in keys:
+            indices |= set(index.get(key, []))
+        with StatementStore(self.cache_path) as store:
+            if not self._matches_store(store):
+                raise ValueError('The cache in %s was rebuilt while it was '
+                                 'being read.' % self.cache_path)
+            return store.get_statements(sorted(indices))
+
+
+def load_corpus_cache(cache_path, signature):
+    """Return a cache if it exists and was built for the given signature.
+
+    Parameters
+    ----------
+    cache_path : str
+        The path to the statement store file of the cache.
+    signature : dict
+        The signature of the corpus file and of the processing arguments,
+        as returned by :py:func:`get_corpus_signature`.
+
+    Returns
+    -------
+    PybelCorpusCache or None
+        The cache, or None if it doesn't exist or is out of date.
+    """
+    if not (os.path.exists(cache_path) and
+            os.path.exists(_get_index_path(cache_path))):
+        return None
+    cache = PybelCorpusCache(cache_path)
+    if not cache.is_valid(signature):
+        logger.info('The cache in %s is out of date.' % cache_path)
+        return None
+    return cache
+
+
+def get_corpus_signature(network_file, network_type, **kwargs):
+    """Return a signature identifying a corpus file and how it is processed.
+
+    Parameters
+    ----------
+    network_file : str
+        The path to the corpus file.
+    network_type : str
+        The type of the corpus file, either 'belscript' or 'json'.
+    **kwargs
+        The keyword arguments the corpus file is processed with.
+
+    Returns
+    -------
+    dict
+        The signature, containing the SHA-256 hash of the file.
+    """
+    stat = os.stat(network_file)
+    return {'sha256': _get_file_hash(network_file, stat.st_size,
+                                     stat.st_mtime),
+            'network_type': network_type,
+            'kwargs': json.loads(json.dumps(kwargs, sort_keys=True,
+                                            default=str))}
+
+
+# The hash is memoized on the size and modification time of the file so
+# that an unchanged corpus isn't rehashed on every query
+@lru_cache(maxsize=10)
+def _get_file_hash(fname, size, mtime):
+    sha = hashlib.sha256()
+    with open(fname, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+@lru_cache(maxsize=10)
+def _load_index(index_path, mtime):
+    with open(index_path, 'r') as fh:
+        return json.load(fh)
+
+
+def _get_index_path(cache_path):
+    return cache_path + '.index.json'
+
+
+def _get_temp_path(path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    os.close(fd)
+    return tmp_path
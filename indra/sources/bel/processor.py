@@ -57,7 +57,8 @@ class PybelProcessor(object):
     Parameters
     ----------
     graph : pybel.BELGraph
-        PyBEL graph containing the BEL content.
+        PyBEL graph containing the BEL content. It is None if the
+        Statements were loaded from a cache instead of a graph.
 
     Attributes
     ----------
@@ -68,7 +69,8 @@ class PybelProcessor(object):
         self.graph = graph
         self.statements = []
         self.unhandled = []
-        self.annot_manager = AnnotationManager(self.graph.annotation_url)
+        self.annot_manager = AnnotationManager(self.graph.annotation_url) \
+            if self.graph is not None else None
 
     # FIXME: Handle reactions
     def get_statements(self):
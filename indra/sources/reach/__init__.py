@@ -4,4 +4,6 @@ from .api import (process_pmc,
                   process_nxml_str,
                   process_nxml_file,
                   process_json_str,
-                  process_json_file)
+                  process_json_file,
+                  process_json_files,
+                  iter_json_files)
@@ -5,14 +5,17 @@ Many file formats are supported. Many will run reach.
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str, bytes
 
+import os
+import sys
 import json
 import logging
-import os
 import requests
+import multiprocessing as mp
 
 from indra.literature import id_lookup
 import indra.literature.pmc_client as pmc_client
 import indra.literature.pubmed_client as pubmed_client
+from indra.statements.store import dump_statement_store
 from .processor import ReachProcessor
 
 try:  # Python 2
@@ -322,6 +325,113 @@ def process_json_file(file_name, citation=None):
         logger.error('Could not read file %s.' % file_name)
 
 
+def process_json_files(file_names, citations=None, n_proc=1,
+                       chunk_size=100, output_fname=None):
+    """Return the Statements processed from a list of REACH json files.
+
+    This is useful to process the REACH output for a large number of papers.
+    The files are processed in chunks by a pool of worker processes. Where
+    the platform supports it, the workers are forked from the current
+    process so that they share the resources loaded by the REACH processor,
+    like the FamPlex map, instead of loading them again.
+
+    Parameters
+    ----------
+    file_names : list[str]
+        The names of the json files to be processed.
+    citations : Optional[list[str]]
+        The PubMed IDs to be used in the evidence for the Statements
+        extracted from each file, in the same order as file_names.
+        Default: None
+    n_proc : Optional[int]
+        The number of processes to use. If 1, the files are processed in the
+        current process. Default: 1
+    chunk_size : Optional[int]
+        The number of files sent to a worker process at a time.
+        Default: 100
+    output_fname : Optional[str]
+        If given, the Statements are written into a statement store file
+        with this name, keyed by file name, as they are processed instead of
+        being returned (see :py:mod:`indra.statements.store`).
+        Default: None
+
+    Returns
+    -------
+    stmts_by_file : dict[str, list[indra.statements.Statement]] or None
+        The Statements extracted from each file, keyed by file name, or
+        None if output_fname is given.
+    """
+    results = iter_json_files(file_names, citations, n_proc, chunk_size)
+    if output_fname is not None:
+        dump_statement_store(results, output_fname, keyed=True)
+        return None
+    return dict(results)
+
+
+def iter_json_files(file_names, citations=None, n_proc=1, chunk_size=100):
+    """Iterate over the Statements processed from a list of REACH json files.
+
+    The results are yielded in the order of the files as each chunk of
+    files is processed. See :py:func:`process_json_files` for a description
+    of the parameters.
+
+    Yields
+    ------
+    file_name : str
+        The name of a json file.
+    stmts : list[indra.statements.Statement]
+        The Statements extracted from the file, or an empty list if the
+        file could not be processed.
+    """
+    if citations is None:
+        citations = [None] * len(file_names)
+    file_citations = list(zip(file_names, citations))
+    chunks = [file_citations[i:i + chunk_size]
+              for i in range(0, len(file_citations), chunk_size)]
+    if n_proc > 1 and \
+            not (sys.version_info[0] >= 3 and sys.version_info[1] >= 4):
+        logger.info('iter_json_files: Python < 3.4 detected, not using '
+                    'multiprocessing.')
+        n_proc = 1
+    if n_proc == 1:
+        for chunk in chunks:
+            for res in _process_json_file_chunk(chunk):
+                yield res
+        return
+    logger.info('Processing %d REACH json files in %d chunks using '
+                'multiprocessing with n_proc %d' %
+                (len(file_citations), len(chunks), n_proc))
+    # Forked workers inherit the resources loaded by the REACH processor
+    # module from this process
+    if 'fork' in mp.get_all_start_methods():
+        ctx = mp.get_context('fork')
+    else:
+        ctx = mp.get_context('spawn')
+    pool = ctx.Pool(n_proc)
+    try:
+        for chunk_results in pool.imap(_process_json_file_chunk, chunks):
+            for res in chunk_results:
+                yield res
+        pool.close()
+    finally:
+        # This stops the workers if the iteration is abandoned
+        pool.terminate()
+        pool.join()
+
+
+def _process_json_file_chunk(file_citations):
+    results = []
+    for file_name, citation in file_citations:
+        try:
+            rp = process_json_file(file_name, citation)
+        except Exception as e:
+            logger.error('Could not process %s.' % file_name)
+            logger.exception(e)
+            rp = None
+        results.append((file_name, rp.statements if rp is not None else []))
+    return results
+
+
 def process_json_str(json_str, citation=None):
     """Return a ReachProcessor by processing the given REACH json string.
 
@@ -27,6 +27,12 @@ class ReachProcessor(object):
     pmid : Optional[str]
         The PubMed ID associated with the extractions. This can be passed
         in case the PMID cannot be determined from the extractions alone.`
+    use_index : Optional[bool]
+        If True, the event, entity and sentence frames are indexed by type
+        and frame ID in a single pass over the JSON when the processor is
+        constructed, and all lookups are done against this index. If False,
+        each lookup is an objectpath query over all the frames, which is
+        much slower on large full-text outputs. Default: True
 
     Attributes
     ----------
@@ -39,8 +45,11 @@ class ReachProcessor(object):
     all_events : dict[str, str]
         The frame IDs of all events by type in the REACH extraction.
     """
-    def __init__(self, json_dict, pmid=None):
+    def __init__(self, json_dict, pmid=None, use_index=True):
         self.tree = objectpath.Tree(json_dict)
+        self.use_index = use_index
+        if use_index:
+            self._index_frames(json_dict)
         self.statements = []
         self.citation = pmid
         if pmid is None:
@@ -49,6 +58,72 @@ class ReachProcessor(object):
                     self.tree.execute("$.events.object_meta.doc_id")
         self.get_all_events()
 
+    def _index_frames(self, json_dict):
+        """Index the frames of the extractions in a single pass."""
+        self._events_by_type = {}
+        self._regulations_by_arg = {}
+        self._entities_by_id = {}
+        self._sentences_by_id = {}
+        for frame in _get_frames(json_dict, 'events'):
+            event_type = frame.get('type')
+            self._events_by_type.setdefault(event_type, []).append(frame)
+            # Regulations are looked up by the event they regulate, which
+            # is their first argument
+            if event_type == 'regulation':
+                args = frame.get('arguments')
+                if args:
+                    self._regulations_by_arg.setdefault(
+                        args[0].get('arg'), []).append(frame)
+        # Only the first frame with a given ID is kept, as with objectpath
+        for frame in _get_frames(json_dict, 'entities'):
+            self._entities_by_id.setdefault(frame.get('frame_id'), frame)
+        for frame in _get_frames(json_dict, 'sentences'):
+            self._sentences_by_id.setdefault(frame.get('frame_id'), frame)
+
+    def _get_event_frames(self, event_type):
+        """Return the event frames of a given type."""
+        if self.use_index:
+            return self._events_by_type.get(event_type, [])
+        qstr = "$.events.frames[(@.type is '%s')]" % event_type
+        res = self.tree.execute(qstr)
+        if res is None:
+            return []
+        return list(res)
+
+    def _get_regulation_frames(self, frame_id):
+        """Return the regulation event frames of a given event."""
+        if self.use_index:
+            return self._regulations_by_arg.get(frame_id, [])
+        qstr = "$.events.frames[(@.type is 'regulation') and " + \
+               "(@.arguments[0].arg is '%s')]" % frame_id
+        res = self.tree.execute(qstr)
+        if res is None:
+            return []
+        return list(res)
+
+    def _get_entity_frame(self, frame_id):
+        """Return the entity frame with a given ID or None."""
+        if self.use_index:
+            return self._entities_by_id.get(frame_id)
+        qstr = "$.entities.frames[(@.frame_id is \'%s\')]" % frame_id
+        return self._get_first(self.tree.execute(qstr))
+
+    def _get_sentence_frame(self, frame_id):
+        """Return the sentence frame with a given ID or None."""
+        if self.use_index:
+            return self._sentences_by_id.get(frame_id)
+        qstr = "$.sentences.frames[(@.frame_id is \'%s\')]" % frame_id
+        return self._get_first(self.tree.execute(qstr))
+
+    @staticmethod
+    def _get_first(res):
+        if res is None:
+            return None
+        try:
+            return next(res)
+        except StopIteration:
+            return None
+
     def print_event_statistics(self):
         """Print the number of events in the REACH output by type."""
         logger.info('All events by type')
@@ -75,10 +150,7 @@ class ReachProcessor(object):
                 self.all_events[event_type] = [frame_id]
 
     def print_regulations(self):
-        qstr = "$.events.frames[(@.type is 'regulation')]"
-        res = self.tree.execute(qstr)
-        if res is None:
-            return
+        res = self._get_event_frames('regulation')
         for r in res:
             print(r['subtype'])
             for a in r['arguments']:
@@ -87,10 +159,7 @@ class ReachProcessor(object):
     def get_modifications(self):
         """Extract Modification INDRA Statements."""
         # Find all event frames that are a type of protein modification
-        qstr = "$.events.frames[(@.type is 'protein-modification')]"
-        res = self.tree.execute(qstr)
-        if res is None:
-            return
+        res = self._get_event_frames('protein-modification')
         # Extract each of the results when possible
         for r in res:
             # The subtype of the modification
@@ -126,10 +195,7 @@ class ReachProcessor(object):
 
                 # Now we need to look for all regulation event to get to the
                 # enzymes (the "controller" here)
-                qstr = "$.events.frames[(@.type is 'regulation') and " + \
-                       "(@.arguments[0].arg is '%s')]" % frame_id
-                reg_res = self.tree.execute(qstr)
-                reg_res = list(reg_res)
+                reg_res = self._get_regulation_frames(frame_id)
                 for reg in reg_res:
                     controller_agent, controller_coords = None, None
                     for a in reg['arguments']:
@@ -174,15 +240,8 @@ class ReachProcessor(object):
 
     def get_regulate_amounts(self):
         """Extract RegulateAmount INDRA Statements."""
-        qstr = "$.events.frames[(@.type is 'transcription')]"
-        res = self.tree.execute(qstr)
-        all_res = []
-        if res is not None:
-            all_res += list(res)
-        qstr = "$.events.frames[(@.type is 'amount')]"
-        res = self.tree.execute(qstr)
-        if res is not None:
-            all_res += list(res)
+        all_res = self._get_event_frames('transcription') + \
+            self._get_event_frames('amount')
 
         for r in all_res:
             subtype = r.get('subtype')
@@ -200,9 +259,7 @@ class ReachProcessor(object):
             if theme is None:
                 continue
             theme_agent, theme_coords = self._get_agent_from_entity(theme)
-            qstr = "$.events.frames[(@.type is 'regulation') and " + \
-                   "(@.arguments[0].arg is '%s')]" % frame_id
-            reg_res = self.tree.execute(qstr)
+            reg_res = self._get_regulation_frames(frame_id)
             for reg in reg_res:
                 controller_agent, controller_coords = None, None
                 for a in reg['arguments']:
@@ -225,10 +282,7 @@ class ReachProcessor(object):
 
     def get_complexes(self):
         """Extract INDRA Complex Statements."""
-        qstr = "$.events.frames[@.type is 'complex-assembly']"
-        res = self.tree.execute(qstr)
-        if res is None:
-            return
+        res = self._get_event_frames('complex-assembly')
 
         for r in res:
             epistemics = self._get_epistemics(r)
@@ -259,10 +313,7 @@ class ReachProcessor(object):
 
     def get_activation(self):
         """Extract INDRA Activation Statements."""
-        qstr = "$.events.frames[@.type is 'activation']"
-        res = self.tree.execute(qstr)
-        if res is None:
-            return
+        res = self._get_event_frames('activation')
         for r in res:
             epistemics = self._get_epistemics(r)
             if epistemics.get('negated'):
@@ -293,10 +344,7 @@ class ReachProcessor(object):
 
     def get_translocation(self):
         """Extract INDRA Translocation Statements."""
-        qstr = "$.events.frames[@.type is 'translocation']"
-        res = self.tree.execute(qstr)
-        if res is None:
-            return
+        res = self._get_event_frames('translocation')
         for r in res:
             epistemics = self._get_epistemics(r)
             if epistemics.get('negated'):
@@ -324,13 +372,8 @@ class ReachProcessor(object):
             self.statements.append(st)
 
     def _get_location_by_id(self, loc_id):
-        qstr = "$.entities.frames[(@.frame_id is \'%s\')]" % loc_id
-        res = self.tree.execute(qstr)
-        if res is None:
-            return None
-        try:
-            entity_term = next(res)
-        except StopIteration:
+        entity_term = self._get_entity_frame(loc_id)
+        if entity_term is None:
             logger.debug(' %s is not an entity' % loc_id)
             return None
         name = entity_term.get('text')
@@ -355,13 +398,8 @@ class ReachProcessor(object):
         return None
 
     def _get_agent_from_entity(self, entity_id):
-        qstr = "$.entities.frames[(@.frame_id is \'%s\')]" % entity_id
-        res = self.tree.execute(qstr)
-        if res is None:
-            return None, None
-        try:
-            entity_term = next(res)
-        except StopIteration:
+        entity_term = self._get_entity_frame(entity_id)
+        if entity_term is None:
             logger.debug(' %s is not an entity' % entity_id)
             return None, None
 
@@ -500,13 +538,8 @@ class ReachProcessor(object):
         sent_id = entity_term.get('sentence')
         if sent_id is None:
             return None
-        qstr = "$.sentences.frames[(@.frame_id is \'%s')]" % sent_id
-        res = self.tree.execute(qstr)
-        if res is None:
-            return None
-        try:
-            sentence = next(res)
-        except StopIteration:
+        sentence = self._get_sentence_frame(sent_id)
+        if sentence is None:
             return None
         sent_start = sentence.get('start-pos')
         if sent_start is None:
@@ -546,11 +579,9 @@ class ReachProcessor(object):
             tissue = None
             organ = None
         else:
-            qstr = "$.entities.frames[(@.frame_id is \'%s\')]" % context_id[0]
-            res = self.tree.execute(qstr)
-            if res is None:
+            context_frame = self._get_entity_frame(context_id[0])
+            if context_frame is None:
                 return annotations, None
-            context_frame = next(res)
             facets = context_frame['facets']
             cell_line = facets.get('cell-line')
             cell_type = facets.get('cell-type')
@@ -612,17 +643,12 @@ class ReachProcessor(object):
         sentence_id = event.get('sentence')
         section = None
         if sentence_id:
-            qstr = "$.sentences.frames[(@.frame_id is \'%s\')]" % sentence_id
-            res = self.tree.execute(qstr)
-            if res:
-                sentence_frame = list(res)[0]
+            sentence_frame = self._get_sentence_frame(sentence_id)
+            if sentence_frame:
                 passage_id = sentence_frame.get('passage')
                 if passage_id:
-                    qstr = "$.sentences.frames[(@.frame_id is \'%s\')]" % \
-                            passage_id
-                    res = self.tree.execute(qstr)
-                    if res:
-                        passage_frame = list(res)[0]
+                    passage_frame = self._get_sentence_frame(passage_id)
+                    if passage_frame:
                         section = passage_frame.get('section-id')
         # If the section is in the standard list, return as is
         if section in self._section_list:
@@ -753,6 +779,14 @@ class ReachProcessor(object):
         return Site(None, None)
 
 
+def _get_frames(json_dict, key):
+    """Return the list of frames under a given key of the extractions."""
+    frames = json_dict.get(key)
+    if not isinstance(frames, dict):
+        return []
+    return frames.get('frames') or []
+
+
 _site_pattern1 = '([' + ''.join(list(amino_acids.keys())) + '])[-]?([0-9]+)$'
 _site_pattern2 = '(' + '|'.join([v['short_name'].upper() for
                                  v in amino_acids.values()]) + \
@@ -12,6 +12,7 @@ from collections import OrderedDict as _o
 from indra.util import unicode_strs
 from indra.statements.statements import modtype_conditions, modtype_to_modclass
 from .concept import Concept
+from .util import memoize_matches_key
 from .resources import get_valid_residue, get_valid_location, activity_types, \
     amino_acids
 
@@ -74,12 +75,14 @@ class Agent(Concept):
         self.activity = activity
         self.location = get_valid_location(location)
 
+    @memoize_matches_key
     def matches_key(self):
         """Return a key to identify the identity and state of the Agent."""
         key = (self.entity_matches_key(),
                self.state_matches_key())
         return str(key)
 
+    @memoize_matches_key
     def entity_matches_key(self):
         """Return a key to identify the identity of the Agent not its state."""
         db_refs_key = 'FPLX:%s;UP:%s;HGNC:%s' % (self.db_refs.get('FPLX'),
@@ -87,6 +90,7 @@ class Agent(Concept):
                                                  self.db_refs.get('HGNC'))
         return str((self.name, db_refs_key))
 
+    @memoize_matches_key
     def state_matches_key(self):
         """Return a key to identify the state of the Agent."""
         # NOTE: Making a set of the mod matches_keys might break if
@@ -3,6 +3,7 @@ from builtins import dict, str
 from future.utils import python_2_unicode_compatible
 import logging
 from collections import OrderedDict as _o
+from .util import memoize_matches_key
 
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ class Concept(object):
     def matches(self, other):
         return self.matches_key() == other.matches_key()
 
+    @memoize_matches_key
     def matches_key(self):
         key = self.entity_matches_key()
         return str(key)
@@ -33,6 +35,7 @@ class Concept(object):
     def entity_matches(self, other):
         return self.entity_matches_key() == other.entity_matches_key()
 
+    @memoize_matches_key
     def entity_matches_key(self):
         # Get the grounding first
         db_ns, db_id = self.get_grounding()
@@ -2,9 +2,11 @@ from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 
 __all__ = ['stmts_from_json', 'stmts_from_json_file', 'stmts_to_json',
-           'stmts_to_json_file', 'draw_stmt_graph',
+           'stmts_to_json_file', 'iter_stmts_from_json_file',
+           'promote_supports', 'draw_stmt_graph',
            'UnresolvedUuidError', 'InputError']
 
+import re
 import json
 import logging
 from indra.statements.statements import Statement, Unresolved
@@ -13,6 +15,9 @@ from indra.statements.statements import Statement, Unresolved
 logger = logging.getLogger(__name__)
 
 
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
 def stmts_from_json(json_in, on_missing_support='handle'):
     """Get a list of Statements from Statement jsons.
 
@@ -49,7 +54,6 @@ def stmts_from_json(json_in, on_missing_support='handle'):
     """
 
     stmts = []
-    uuid_dict = {}
     for json_stmt in json_in:
         try:
             st = Statement._from_json(json_stmt)
@@ -57,42 +61,169 @@ def stmts_from_json(json_in, on_missing_support='handle'):
             logger.warning("Error creating statement: %s" % e)
             continue
         stmts.append(st)
-        uuid_dict[st.uuid] = st
-    for st in stmts:
-        _promote_support(st.supports, uuid_dict, on_missing_support)
-        _promote_support(st.supported_by, uuid_dict, on_missing_support)
+    promote_supports(stmts, on_missing_support)
     return stmts
 
 
-def stmts_from_json_file(fname):
+def stmts_from_json_file(fname, format='json'):
     """Return a list of statements loaded from a JSON file.
 
     Parameters
     ----------
     fname : str
         Path to the JSON file to load statements from.
+    format : Optional[str]
+        The format of the file, either 'json' for a JSON list of Statements,
+        or 'jsonl' for one Statement JSON per line. Default: 'json'
 
     Returns
     -------
     list[indra.statements.Statement]
         The list of INDRA Statements loaded from the JSOn file.
     """
+    stmts = list(iter_stmts_from_json_file(fname, format=format))
+    promote_supports(stmts)
+    return stmts
+
+
+def iter_stmts_from_json_file(fname, format='json'):
+    """Iterate over the statements in a JSON file without loading it at once.
+
+    The Statements are deserialized one at a time as the file is read. The
+    `supports` and `supported_by` lists of the Statements yielded contain the
+    uuids of the Statements they refer to, since these may appear later in
+    the file. They can be resolved after iteration with `promote_supports`.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the JSON file to load statements from.
+    format : Optional[str]
+        The format of the file, either 'json' for a JSON list of Statements,
+        or 'jsonl' for one Statement JSON per line. Default: 'json'
+
+    Returns
+    -------
+    generator[indra.statements.Statement]
+        A generator of INDRA Statements.
+    """
+    if format not in ('json', 'jsonl'):
+        raise InputError('Invalid format: \'%s\'' % format)
     with open(fname, 'r') as fh:
-        return stmts_from_json(json.load(fh))
+        json_iter = _iter_json_array(fh) if format == 'json' else \
+            (json.loads(line) for line in fh if line.strip())
+        for json_stmt in json_iter:
+            try:
+                yield Statement._from_json(json_stmt)
+            except Exception as e:
+                logger.warning("Error creating statement: %s" % e)
+
+
+def promote_supports(stmts, on_missing_support='handle'):
+    """Replace support uuids with Statement objects among a list of statements.
+
+    This is the second pass of loading Statements with
+    `iter_stmts_from_json_file`, it can be done on all the Statements that
+    were loaded, or on any subset that was kept.
+
+    Parameters
+    ----------
+    stmts : list[:py:class:`Statement`]
+        A list of Statements whose `supports` and `supported_by` lists
+        contain uuids.
+    on_missing_support : Optional[str]
+        Handles the behavior when a uuid cannot be resolved among the given
+        Statements, see `stmts_from_json` for the options. Default: 'handle'
+    """
+    uuid_dict = {st.uuid: st for st in stmts}
+    for st in stmts:
+        _promote_support(st.supports, uuid_dict, on_missing_support)
+        _promote_support(st.supported_by, uuid_dict, on_missing_support)
 
 
-def stmts_to_json_file(stmts, fname):
+def stmts_to_json_file(stmts, fname, format='json'):
     """Serialize a list of INDRA Statements into a JSON file.
 
+    The Statements are serialized and written one at a time, so the JSON of
+    all the Statements is never in memory at once.
+
     Parameters
     ----------
-    stmts : list[indra.statement.Statements]
-        The list of INDRA Statements to serialize into the JSON file.
+    stmts : iterable[indra.statement.Statements]
+        The list of INDRA Statements to serialize into the JSON file. Any
+        iterable of Statements, such as a generator, can be used.
     fname : str
         Path to the JSON file to serialize Statements into.
+    format : Optional[str]
+        The format of the file, either 'json' for a JSON list of Statements,
+        or 'jsonl' for one Statement JSON per line. Default: 'json'
     """
+    if format not in ('json', 'jsonl'):
+        raise InputError('Invalid format: \'%s\'' % format)
     with open(fname, 'w') as fh:
-        json.dump(stmts_to_json(stmts), fh, indent=1)
+        if format == 'jsonl':
+            for stmt in stmts:
+                fh.write(json.dumps(stmt.to_json()) + '\n')
+            return
+        # This writes the same output as json.dump(..., indent=1) on the
+        # list of Statement JSONs. Newlines can only appear between tokens
+        # in the JSON so the nested indentation can be added by replacing
+        # them.
+        fh.write('[')
+        first = True
+        for stmt in stmts:
+            stmt_str = json.dumps(stmt.to_json(), indent=1)
+            fh.write(('\n ' if first else ',\n ') +
+                     stmt_str.replace('\n', '\n '))
+            first = False
+        fh.write(']' if first else '\n]')
+
+
+def _iter_json_array(fh, chunk_size=65536):
+    """Iterate over the elements of a JSON list read from a file handle."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    # What is expected next: the opening bracket, the first element (or the
+    # closing bracket), a subsequent element, or a separator (or the closing
+    # bracket)
+    expected = '['
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError('Unexpected end of JSON list.')
+            chunk = fh.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+            continue
+        char = buf[pos]
+        if expected == '[':
+            if char != '[':
+                raise ValueError('Expected a JSON list.')
+            pos += 1
+            expected = 'first'
+        elif char == ']' and expected in ('first', 'separator'):
+            return
+        elif expected == 'separator':
+            if char != ',':
+                raise ValueError('Expected a separator in JSON list.')
+            pos += 1
+            expected = 'element'
+        else:
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except ValueError as e:
+                obj, end, err = None, None, e
+            # The element may continue in the next chunk, this is also
+            # checked for elements ending with the buffer, e.g. numbers
+            if (end is None or end == len(buf)) and not eof:
+                chunk = fh.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            if end is None:
+                raise err
+            pos = end
+            expected = 'separator'
+            yield obj
 
 
 def stmts_to_json(stmts_in, use_sbo=False):
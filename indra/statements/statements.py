@@ -190,12 +190,14 @@ __all__ = [
     # Functions and values
     'stmts_from_json', 'get_unresolved_support_uuids', 'stmts_to_json',
     'stmts_from_json_file', 'stmts_to_json_file',
+    'iter_stmts_from_json_file', 'promote_supports',
     'get_valid_residue', 'get_valid_location', 'get_valid_location',
     'draw_stmt_graph', 'get_all_descendants','make_statement_camel',
     'amino_acids', 'amino_acids_reverse', 'activity_types',
     'cellular_components', 'cellular_components_reverse', 'modtype_to_modclass',
     'modclass_to_modtype', 'modtype_conditions', 'modtype_to_inverse',
-    'modclass_to_inverse', 'get_statement_by_name', 'make_hash', 'stmt_type'
+    'modclass_to_inverse', 'get_statement_by_name', 'make_hash', 'stmt_type',
+    'cached_matches_keys', 'invalidate_matches_keys'
     ]
 
 import abc
@@ -585,6 +587,7 @@ class Modification(Statement):
         else:
             self.position = position
 
+    @memoize_matches_key
     def matches_key(self):
         if self.enz is None:
             enz_key = None
@@ -754,6 +757,7 @@ class SelfModification(Statement):
              (type(self).__name__, self.enz, res_str, pos_str))
         return s
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.enz.matches_key(),
                str(self.residue), str(self.position))
@@ -983,6 +987,7 @@ class RegulateActivity(Statement):
         state.pop('subj_activity', None)
         self.__dict__.update(state)
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.subj.matches_key(),
                self.obj.matches_key(), str(self.obj_activity),
@@ -1209,6 +1214,7 @@ class ActiveForm(Statement):
         self.activity = activity
         self.is_active = is_active
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.agent.matches_key(),
                str(self.activity), str(self.is_active))
@@ -1344,6 +1350,7 @@ class HasActivity(Statement):
         self.activity = activity
         self.has_activity = has_activity
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.agent.matches_key(),
                str(self.activity), str(self.has_activity))
@@ -1413,6 +1420,7 @@ class Gef(Statement):
         self.gef = gef
         self.ras = ras
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.gef.matches_key(),
                self.ras.matches_key())
@@ -1501,6 +1509,7 @@ class Gap(Statement):
         self.gap = gap
         self.ras = ras
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.gap.matches_key(),
                self.ras.matches_key())
@@ -1583,6 +1592,7 @@ class Complex(Statement):
         super(Complex, self).__init__(evidence)
         self.members = members
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), tuple(m.matches_key()
                                             for m in self.sorted_members()))
@@ -1704,6 +1714,7 @@ class Translocation(Statement):
         matches = matches and (self.to_location == other.to_location)
         return matches
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True), self.agent.matches_key(),
                str(self.from_location), str(self.to_location))
@@ -1747,6 +1758,7 @@ class RegulateAmount(Statement):
                              type(self).__name__)
         self.obj = obj
 
+    @memoize_matches_key
     def matches_key(self):
         if self.subj is None:
             subj_key = None
@@ -1929,6 +1941,7 @@ class Influence(Statement):
             self.subj.equals(other.subj) and self.obj.equals(other.obj)
         return equals
 
+    @memoize_matches_key
     def matches_key(self):
         # With polarities, here, the goal is to match overall polarity
         # if both polarities are given, i.e. +/+ matches -/-. Also, if only
@@ -2041,6 +2054,7 @@ class Association(Complex):
                              '%d were given.' % len(members))
         super().__init__(members, evidence)
 
+    @memoize_matches_key
     def matches_key(self):
         key = (stmt_type(self, True),
                tuple(m.matches_key() for m in self.sorted_members()),
@@ -2184,6 +2198,7 @@ class Conversion(Statement):
         if isinstance(obj_to, Agent):
             self.obj_to = [obj_to]
 
+    @memoize_matches_key
     def matches_key(self):
         keys = [stmt_type(self, True)]
         keys += [self.subj.matches_key() if self.subj else None]
@@ -2304,6 +2319,7 @@ class Event(Statement):
         self.delta = delta if delta else {'polarity': None, 'adjectives': []}
         self.context = context
 
+    @memoize_matches_key
     def matches_key(self):
         mk = (self.concept.matches_key(),)
         return str(mk)
@@ -0,0 +1,376 @@
+"""A compact binary file format to store INDRA Statements on disk.
+
+Statements are stored in columns: the first segment of the file contains the
+JSON of each Statement without its evidence (its type, Agents, belief and
+support), the second segment contains the JSON of the evidence of each
+Statement. Each record is length-prefixed and optionally compressed with
+zlib. The segments are optionally preceded by a metadata record, and are
+followed by a table of record offsets and an index of the shallow hashes of
+the Statements sorted by hash.
+
+The file is memory-mapped when opened with :py:class:`StatementStore`, and
+Statements are only deserialized when they are accessed by position or by
+shallow hash. Accessing Statements without their evidence only touches the
+first segment of the file.
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+
+__all__ = ['StatementStore', 'dump_statement_store', 'is_statement_store']
+
+import json
+import mmap
+import itertools
+import zlib
+import struct
+import shutil
+import logging
+import tempfile
+import collections
+from .statements import Statement
+from .io import promote_supports
+
+logger = logging.getLogger(__name__)
+
+
+_MAGIC = b'INDRASTM'
+_VERSION = 1
+_COMPRESSED = 1
+_HAS_METADATA = 2
+# magic, version, flags, reserved, number of Statements, offset of the
+# evidence segment, offset of the offset table, offset of the hash index,
+# offset of the group keys and the number of Statements in each group (0
+# if the Statements are not grouped)
+_HEADER = struct.Struct('<8sHHIQQQQQ')
+_RECORD_LEN = struct.Struct('<I')
+# offset of the Statement record, offset of its evidence record
+_TABLE_ENTRY = struct.Struct('<QQ')
+# shallow hash, position of the Statement
+_INDEX_ENTRY = struct.Struct('<qQ')
+
+
+def dump_statement_store(stmts, fname, compress=True, metadata=None,
+                         keyed=None):
+    """Write a list or dict of Statements into a statement store file.
+
+    Parameters
+    ----------
+    stmts : list[indra.statements.Statement] or dict or iterable
+        A list of Statements or a dict whose values are lists of Statements,
+        for instance, Statements keyed by PMID. The keys of a dict, including
+        the ones with no Statements, are stored in the file so that they can
+        be restored with :py:meth:`StatementStore.get_statement_dict`. Any
+        other iterable of Statements, or of (key, list of Statements)
+        tuples, which is treated like a dict, can be given as well. It is
+        consumed as the file is written so that the Statements don't all
+        have to be in memory at the same time.
+    fname : str
+        The name of the file to write the Statements into.
+    compress : Optional[bool]
+        If True, each record is compressed with zlib. Default: True
+    metadata : Optional[dict]
+        A JSON-serializable dict stored in the file, which can be read
+        back with :py:meth:`StatementStore.get_metadata`. Default: None
+    keyed : Optional[bool]
+        If True, stmts is a dict or an iterable of (key, list of Statements)
+        tuples, if False, it is an iterable of Statements. If None, this is
+        decided by whether stmts is a dict or, otherwise, by whether its
+        first element is a Statement. Default: None
+    """
+    if isinstance(stmts, dict):
+        stmts = stmts.items()
+        keyed = True if keyed is None else keyed
+    stmts = iter(stmts)
+    if keyed is None:
+        first = next(stmts, None)
+        keyed = first is not None and not isinstance(first, Statement)
+        if first is not None:
+            stmts = itertools.chain([first], stmts)
+    if keyed:
+        keys = {'keys': [], 'counts': []}
+        stmt_iter = _iter_keyed_stmts(stmts, keys)
+    else:
+        keys = None
+        stmt_iter = stmts
+    flags = _COMPRESSED if compress else 0
+    if metadata is not None:
+        flags |= _HAS_METADATA
+    logger.info('Dumping statements into %s...' % fname)
+
+    table = []
+    hashes = []
+    with open(fname, 'wb') as fh, tempfile.TemporaryFile() as ev_fh:
+        fh.write(b'\x00' * _HEADER.size)
+        if metadata is not None:
+            _write_record(fh, metadata, flags)
+        ev_offset = 0
+        for stmt in stmt_iter:
+            stmt_json = stmt.to_json()
+            ev_json = stmt_json.pop('evidence', [])
+            table.append((fh.tell(), ev_offset))
+            _write_record(fh, stmt_json, flags)
+            ev_offset += _write_record(ev_fh, ev_json, flags)
+            hashes.append(stmt.get_hash(shallow=True, refresh=True))
+        # The evidence segment is copied after the Statement segment
+        ev_start = fh.tell()
+        ev_fh.seek(0)
+        shutil.copyfileobj(ev_fh, fh)
+        table_start = fh.tell()
+        for stmt_offset, stmt_ev_offset in table:
+            fh.write(_TABLE_ENTRY.pack(stmt_offset,
+                                       ev_start + stmt_ev_offset))
+        index_start = fh.tell()
+        for stmt_hash, idx in sorted(zip(hashes, range(len(hashes)))):
+            fh.write(_INDEX_ENTRY.pack(stmt_hash, idx))
+        keys_start = 0
+        if keys is not None:
+            keys_start = fh.tell()
+            _write_record(fh, keys, flags)
+        fh.seek(0)
+        fh.write(_HEADER.pack(_MAGIC, _VERSION, flags, 0, len(table),
+                              ev_start, table_start, index_start, keys_start))
+    logger.info('Dumped %d statements into %s' % (len(table), fname))
+
+
+def _iter_keyed_stmts(key_stmts_iter, keys):
+    # Each key and the number of its Statements are appended to keys as
+    # the Statements are yielded
+    for key, key_stmts in key_stmts_iter:
+        keys['keys'].append(key)
+        keys['counts'].append(0)
+        for stmt in key_stmts:
+            keys['counts'][-1] += 1
+            yield stmt
+
+
+def is_statement_store(fname):
+    """Return True if the given file is a statement store file."""
+    try:
+        with open(fname, 'rb') as fh:
+            return fh.read(len(_MAGIC)) == _MAGIC
+    except IOError:
+        return False
+
+
+class StatementStore(object):
+    """Read Statements lazily from a memory-mapped statement store file.
+
+    Parameters
+    ----------
+    fname : str
+        The name of a file written by :py:func:`dump_statement_store`.
+
+    Examples
+    --------
+    >>> with StatementStore('stmts.stmts') as store: # doctest: +SKIP
+    ...     phos = [i for i in range(len(store))
+    ...             if isinstance(store.get_statement(i, evidence=False),
+    ...                           Phosphorylation)]
+    ...     stmts = store.get_statements(phos)
+    """
+    def __init__(self, fname):
+        self.fname = fname
+        self._fh = open(fname, 'rb')
+        try:
+            self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._fh.close()
+            raise ValueError('%s is not a statement store file.' % fname)
+        magic, version, self._flags, _, self._n_stmts, self._ev_start, \
+            self._table_start, self._index_start, self._keys_start = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError('%s is not a statement store file.' % fname)
+        if version != _VERSION:
+            self.close()
+            raise ValueError('Unsupported statement store version %d.' %
+                             version)
+
+    def __len__(self):
+        return self._n_stmts
+
+    def __iter__(self):
+        for idx in range(self._n_stmts):
+            yield self.get_statement(idx)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the memory map and the underlying file."""
+        self._mm.close()
+        self._fh.close()
+
+    def get_statement(self, idx, evidence=True):
+        """Return the Statement at a given position.
+
+        The `supports` and `supported_by` lists of the Statement contain
+        :py:class:`indra.statements.Unresolved` Statements, use
+        :py:meth:`get_statements` to get Statements with their support
+        resolved among each other.
+
+        Parameters
+        ----------
+        idx : int
+            The position of the Statement in the store.
+        evidence : Optional[bool]
+            If False, the evidence of the Statement isn't loaded, which
+            avoids reading the evidence segment of the file. Default: True
+
+        Returns
+        -------
+        indra.statements.Statement
+            The Statement at the given position.
+        """
+        stmt = self._get_statement(idx, evidence)
+        promote_supports([stmt])
+        return stmt
+
+    def get_statements(self, indices=None, evidence=True):
+        """Return the Statements at the given positions.
+
+        Parameters
+        ----------
+        indices : Optional[iterable[int]]
+            The positions of the Statements to return. If None, all the
+            Statements in the store are returned. Default: None
+        evidence : Optional[bool]
+            If False, the evidence of the Statements isn't loaded.
+            Default: True
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The list of Statements, with their support resolved among the
+            returned Statements.
+        """
+        if indices is None:
+            indices = range(self._n_stmts)
+        stmts = [self._get_statement(idx, evidence) for idx in indices]
+        promote_supports(stmts)
+        return stmts
+
+    def get_metadata(self):
+        """Return the metadata the store was created with.
+
+        Returns
+        -------
+        dict or None
+            The metadata dict given to :py:func:`dump_statement_store`, or
+            None if no metadata was given.
+        """
+        if not self._flags & _HAS_METADATA:
+            return None
+        return self._read_record(_HEADER.size)
+
+    def get_statement_dict(self, evidence=True):
+        """Return the Statements grouped by the keys they were stored with.
+
+        Parameters
+        ----------
+        evidence : Optional[bool]
+            If False, the evidence of the Statements isn't loaded.
+            Default: True
+
+        Returns
+        -------
+        collections.OrderedDict
+            A dict of lists of Statements keyed by the keys of the dict the
+            store was created from, including the keys with no Statements,
+            in the order they were written in, or None if the Statements
+            weren't keyed.
+        """
+        if not self._keys_start:
+            return None
+        keys = self._read_record(self._keys_start)
+        stmts = iter(self.get_statements(evidence=evidence))
+        stmt_dict = collections.OrderedDict()
+        for key, count in zip(keys['keys'], keys['counts']):
+            stmt_dict.setdefault(key, []).extend(itertools.islice(stmts,
+                                                                  count))
+        return stmt_dict
+
+    def get_indices_by_hash(self, stmt_hash):
+        """Return the positions of the Statements with a given shallow hash.
+
+        Parameters
+        ----------
+        stmt_hash : int
+            The shallow hash of the Statements to look up.
+
+        Returns
+        -------
+        list[int]
+            The positions of the Statements with the given hash.
+        """
+        # Binary search for the first entry with the given hash
+        lo, hi = 0, self._n_stmts
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._get_index_entry(mid)[0] < stmt_hash:
+                lo = mid + 1
+            else:
+                hi = mid
+        indices = []
+        while lo < self._n_stmts:
+            entry_hash, idx = self._get_index_entry(lo)
+            if entry_hash != stmt_hash:
+                break
+            indices.append(idx)
+            lo += 1
+        return indices
+
+    def get_statements_by_hash(self, stmt_hash, evidence=True):
+        """Return the Statements with a given shallow hash.
+
+        Parameters
+        ----------
+        stmt_hash : int
+            The shallow hash of the Statements to return.
+        evidence : Optional[bool]
+            If False, the evidence of the Statements isn't loaded.
+            Default: True
+
+        Returns
+        -------
+        list[indra.statements.Statement]
+            The list of Statements with the given hash.
+        """
+        return self.get_statements(self.get_indices_by_hash(stmt_hash),
+                                   evidence)
+
+    def _get_statement(self, idx, evidence):
+        if not 0 <= idx < self._n_stmts:
+            raise IndexError('Statement index out of range.')
+        stmt_offset, ev_offset = \
+            _TABLE_ENTRY.unpack_from(self._mm, self._table_start +
+                                     idx * _TABLE_ENTRY.size)
+        stmt_json = self._read_record(stmt_offset)
+        if evidence:
+            stmt_json['evidence'] = self._read_record(ev_offset)
+        return Statement._from_json(stmt_json)
+
+    def _get_index_entry(self, pos):
+        return _INDEX_ENTRY.unpack_from(self._mm, self._index_start +
+                                        pos * _INDEX_ENTRY.size)
+
+    def _read_record(self, offset):
+        length, = _RECORD_LEN.unpack_from(self._mm, offset)
+        start = offset + _RECORD_LEN.size
+        data = self._mm[start:start + length]
+        if self._flags & _COMPRESSED:
+            data = zlib.decompress(data)
+        return json.loads(data.decode('utf-8'))
+
+
+def _write_record(fh, obj, flags):
+    data = json.dumps(obj).encode('utf-8')
+    if flags & _COMPRESSED:
+        data = zlib.compress(data)
+    fh.write(_RECORD_LEN.pack(len(data)))
+    fh.write(data)
+    return _RECORD_LEN.size + len(data)
@@ -3,14 +3,90 @@ from builtins import dict, str
 from future.utils import python_2_unicode_compatible
 
 
-__all__ = ['make_hash']
+__all__ = ['make_hash', 'cached_matches_keys', 'invalidate_matches_keys',
+           'memoize_matches_key']
 
 
+import functools
+import threading
 from hashlib import md5
+from contextlib import contextmanager
 
 
 def make_hash(s, n_bytes):
     """Make the hash from a matches key."""
     raw_h = int(md5(s.encode('utf-8')).hexdigest()[:n_bytes], 16)
     # Make it a signed int.
-    return 16**n_bytes//2 - raw_h
\ No newline at end of file
+    return 16**n_bytes//2 - raw_h
+
+
+# The cache of matches keys, which is only set within cached_matches_keys
+# blocks. It maps (id(obj), method) tuples to (obj, key) tuples, the object
+# being kept so that its id can't be reused by another object while the
+# cache is active. The cache and the nesting depth of the blocks are kept
+# per thread, so that other threads, which may be modifying the same
+# objects, don't see memoized keys.
+_matches_key_state = threading.local()
+
+
+def _get_matches_key_cache():
+    return getattr(_matches_key_state, 'cache', None)
+
+
+@contextmanager
+def cached_matches_keys():
+    """Memoize the matches keys of Agents and Statements within a block.
+
+    Computing matches keys involves building and stringifying nested tuples
+    every time, which is a bottleneck in loops comparing or grouping many
+    Statements. Within this block, the key of each Agent, Concept and
+    Statement is only computed once. The Agents and Statements must not be
+    modified within the block in a way that changes their keys, unless
+    :py:func:`invalidate_matches_keys` is called after modifying them.
+    Blocks can be nested, the cache is cleared when exiting the outermost
+    one. The cache only applies to the thread the block is entered in.
+
+    Examples
+    --------
+    >>> from indra.statements import Agent, Phosphorylation
+    >>> stmts = [Phosphorylation(Agent('MAP2K1'), Agent('MAPK1')),
+    ...          Phosphorylation(Agent('MAP2K1'), Agent('MAPK1'))]
+    >>> with cached_matches_keys():
+    ...     keys = {st.matches_key() for st in stmts}
+    >>> len(keys)
+    1
+    """
+    state = _matches_key_state
+    depth = getattr(state, 'depth', 0)
+    if depth == 0:
+        state.cache = {}
+    state.depth = depth + 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if state.depth == 0:
+            state.cache = None
+
+
+def invalidate_matches_keys():
+    """Clear the matches keys memoized by the current cached_matches_keys."""
+    cache = _get_matches_key_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def memoize_matches_key(func):
+    """Decorate a key method to memoize it within cached_matches_keys."""
+    @functools.wraps(func)
+    def wrapper(self):
+        cache = _get_matches_key_cache()
+        if cache is None:
+            return func(self)
+        cache_key = (id(self), func)
+        entry = cache.get(cache_key)
+        if entry is None:
+            entry = (self, func(self))
+            cache[cache_key] = entry
+        return entry[1]
+    return wrapper
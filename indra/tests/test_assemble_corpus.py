@@ -1,6 +1,8 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
+import os
 import pickle
+import tempfile
 from indra.tools import assemble_corpus as ac
 from indra.statements import *
 from copy import deepcopy
@@ -53,21 +55,51 @@ st2.belief = 0.8
 st3.belief = 0.7
 
 
+def _get_temp_fname(suffix):
+    fd, fname = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    return fname
+
+
 def test_load_stmts():
-    with open('_test.pkl', 'wb') as fh:
-        pickle.dump([st1], fh)
-    st_loaded = ac.load_statements('_test.pkl')
+    fname = _get_temp_fname('.pkl')
+    try:
+        with open(fname, 'wb') as fh:
+            pickle.dump([st1], fh)
+        st_loaded = ac.load_statements(fname)
+    finally:
+        os.remove(fname)
     assert len(st_loaded) == 1
     assert st_loaded[0].equals(st1)
 
 
 def test_dump_stmts():
-    ac.dump_statements([st1], '_test.pkl')
-    st_loaded = ac.load_statements('_test.pkl')
+    fname = _get_temp_fname('.pkl')
+    try:
+        ac.dump_statements([st1], fname)
+        st_loaded = ac.load_statements(fname)
+    finally:
+        os.remove(fname)
     assert len(st_loaded) == 1
     assert st_loaded[0].equals(st1)
 
 
+def test_dump_stmts_store():
+    fname = _get_temp_fname('.stmts')
+    try:
+        ac.dump_statements([st1, st2], fname)
+        st_loaded = ac.load_statements(fname)
+        assert len(st_loaded) == 2
+        assert st_loaded[0].equals(st1)
+        assert st_loaded[1].equals(st2)
+        ac.dump_statements({'12345': [st1], '23456': [st2]}, fname)
+        st_loaded = ac.load_statements(fname, as_dict=True)
+    finally:
+        os.remove(fname)
+    assert set(st_loaded.keys()) == {'12345', '23456'}
+    assert st_loaded['23456'][0].equals(st2)
+
+
 def test_filter_grounded_only():
     # st18 has and i, which has an ungrounded bound condition
     st_out = ac.filter_grounded_only([st1, st4])
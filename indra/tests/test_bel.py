@@ -1,10 +1,15 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 import os
+import shutil
+import tempfile
 from indra.util import unicode_strs
 from indra.sources import bel
 from indra.sources.bel.rdf_processor import BelRdfProcessor
-from indra.statements import RegulateAmount, BioContext, RefContext
+from indra.sources.bel.corpus_cache import PybelCorpusCache, \
+    load_corpus_cache, get_corpus_signature
+from indra.statements import RegulateAmount, BioContext, RefContext, \
+    Agent, Activation, Phosphorylation, Evidence
 from nose.plugins.attrib import attr
 from indra.tests.util import skip_if, IS_PY3
 
@@ -60,6 +65,81 @@ def test_pybel_neighborhood_query():
         'Homo sapiens'
 
 
+def test_pybel_corpus_cache():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        corpus = os.path.join(tmp_dir, 'corpus.bel')
+        with open(corpus, 'w') as fh:
+            fh.write('SET Citation = {"PubMed", "1"}\n')
+        cache_path = os.path.join(tmp_dir, 'corpus.stmts')
+        braf = Agent('BRAF', db_refs={'HGNC': '1097'})
+        map2k1 = Agent('MAP2K1', db_refs={'HGNC': '6840'})
+        mapk1 = Agent('MAPK1', db_refs={'HGNC': '6871'})
+        stmts = [Phosphorylation(braf, map2k1, evidence=[Evidence(pmid='1')]),
+                 Phosphorylation(map2k1, mapk1, evidence=[Evidence(pmid='2')]),
+                 Activation(braf, mapk1, evidence=[Evidence(pmid='3')])]
+        signature = get_corpus_signature(corpus, 'belscript')
+        assert load_corpus_cache(cache_path, signature) is None
+        PybelCorpusCache.build(stmts, cache_path, signature)
+        cache = load_corpus_cache(cache_path, signature)
+        neighborhood = cache.get_statements_by_name(['BRAF'])
+        assert [s.get_hash() for s in neighborhood] == \
+            [stmts[0].get_hash(), stmts[2].get_hash()]
+        assert neighborhood[0].evidence[0].pmid == '1'
+        neighborhood = cache.get_statements_by_grounding([('HGNC', '6871')])
+        assert [s.uuid for s in neighborhood] == [stmts[1].uuid, stmts[2].uuid]
+        assert not cache.get_statements_by_name(['KRAS'])
+        # The cache is out of date when the corpus changes
+        with open(corpus, 'a') as fh:
+            fh.write('UNSET Citation\n')
+        signature = get_corpus_signature(corpus, 'belscript')
+        assert load_corpus_cache(cache_path, signature) is None
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_pybel_corpus_cache_mismatch():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        corpus = os.path.join(tmp_dir, 'corpus.bel')
+        with open(corpus, 'w') as fh:
+            fh.write('SET Citation = {"PubMed", "1"}\n')
+        cache_path = os.path.join(tmp_dir, 'corpus.stmts')
+        signature = get_corpus_signature(corpus, 'belscript')
+        stmts = [Phosphorylation(Agent('BRAF'), Agent('MAP2K1'))]
+        PybelCorpusCache.build(stmts, cache_path, signature)
+        with open(cache_path + '.index.json', 'r') as fh:
+            old_index = fh.read()
+        PybelCorpusCache.build(stmts, cache_path, signature)
+        # Only the cache files are left in the directory
+        assert sorted(os.listdir(tmp_dir)) == \
+            ['corpus.bel', 'corpus.stmts', 'corpus.stmts.index.json']
+        assert load_corpus_cache(cache_path, signature) is not None
+        # A store and an index from different builds are not used together
+        with open(cache_path + '.index.json', 'w') as fh:
+            fh.write(old_index)
+        assert load_corpus_cache(cache_path, signature) is None
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_process_pybel_neighborhood_cache_error():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        corpus = os.path.join(tmp_dir, 'corpus.bel')
+        with open(corpus, 'w') as fh:
+            fh.write('SET DOCUMENT Name = "Test"\n')
+        # The cache can't be written under a file, so the corpus is processed
+        # without it
+        cache_path = os.path.join(corpus, 'cache', 'corpus.stmts')
+        bp = bel.process_pybel_neighborhood(['BRAF'], network_file=corpus,
+                                            use_cache=True,
+                                            cache_path=cache_path)
+        assert bp.statements == []
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
 def test_process_belrdf():
     with open(test_rdf_nfkb, 'rb') as fh:
         rdf_str_nfkb = fh.read().decode('utf-8')
@@ -374,6 +374,43 @@ def test_bayesian_scorer():
     assert scorer.subtype_probs['eidos']['rule2'] == 0.75
 
 
+def test_batch_scoring():
+    scorers = [SimpleScorer(subtype_probs={'reach': {'phosphorylation':
+                                                     0.2}}),
+               BayesianScorer({'reach': [3, 1], 'trips': [5, 5]},
+                              {'biopax': {'pid': [8, 2]}})]
+    evs = [Evidence(source_api='reach',
+                    annotations={'found_by': 'Phosphorylation_syntax_1a'}),
+           Evidence(source_api='reach'),
+           Evidence(source_api='reach', epistemics={'negated': True}),
+           Evidence(source_api='trips'),
+           Evidence(source_api='biopax',
+                    annotations={'source_sub_id': 'pid'})]
+
+    def get_stmts():
+        st1 = Phosphorylation(None, Agent('a'), evidence=[evs[0], evs[1]])
+        st2 = Phosphorylation(None, Agent('b'),
+                              evidence=[evs[1], evs[2], evs[3]])
+        st3 = Phosphorylation(None, Agent('c'), evidence=[evs[4]])
+        st4 = Phosphorylation(None, Agent('d'), evidence=[evs[2], evs[4]])
+        st5 = Phosphorylation(None, Agent('e'), evidence=[])
+        st4.supports = [st1, st2, st3]
+        st3.supports = [st1]
+        st2.supports = [st1]
+        st1.supported_by = [st2, st3, st4]
+        st2.supported_by = [st4]
+        st3.supported_by = [st4]
+        return [st1, st2, st3, st4, st5]
+    for scorer in scorers:
+        for method in ('set_prior_probs', 'set_hierarchy_probs'):
+            stmts = get_stmts()
+            getattr(BeliefEngine(scorer), method)(stmts)
+            stmts_batch = get_stmts()
+            getattr(BeliefEngine(scorer, batch=True), method)(stmts_batch)
+            for st, st_batch in zip(stmts, stmts_batch):
+                assert_close_enough(st.belief, st_batch.belief)
+
+
 @raises(AssertionError)
 def test_cycle():
     st1 = Phosphorylation(Agent('B'), Agent('A1'))
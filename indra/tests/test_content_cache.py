@@ -0,0 +1,55 @@
+from __future__ import absolute_import, print_function, unicode_literals
+from builtins import dict, str
+import os
+import shutil
+import tempfile
+from indra.literature.content_cache import ContentCache
+
+
+def test_put_get_content():
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        with ContentCache(os.path.join(tmp_dir, 'content.sqlite')) as cache:
+            assert cache.get_content('123') == (None, None)
+            cache.put_content('123', 'Some abstract α', 'abstract')
+            assert cache.get_content('PMID123') == \
+                ('Some abstract α', 'abstract')
+            # The most desirable type of content is returned by default
+            cache.put_content('PMID123', '<article/>', 'pmc_oa_xml')
+            assert cache.get_content('123') == ('<article/>', 'pmc_oa_xml')
+            assert cache.get_content('123', 'abstract') == \
+                ('Some abstract α', 'abstract')
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_get_contents_upstream():
+    calls = []
+
+    def upstream(pmid):
+        calls.append(pmid)
+        if pmid == '3':
+            return (None, None)
+        elif pmid == '4':
+            raise ValueError('Request failed')
+        return ('Abstract %s' % pmid, 'abstract')
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        cache_path = os.path.join(tmp_dir, 'content.sqlite')
+        with ContentCache(cache_path, upstream=upstream) as cache:
+            cache.put_content('1', 'Full text 1', 'txt')
+            contents = cache.get_contents(['1', '2', '3', '4'], poolsize=2)
+        assert contents == {'1': ('Full text 1', 'txt'),
+                            '2': ('Abstract 2', 'abstract'),
+                            '3': (None, None),
+                            '4': (None, None)}
+        assert sorted(calls) == ['2', '3', '4']
+        # Content fetched from upstream is found in the cache the next time
+        calls = []
+        with ContentCache(cache_path, upstream=upstream) as cache:
+            contents = cache.get_contents(['1', '2'])
+        assert contents['2'] == ('Abstract 2', 'abstract')
+        assert not calls
+    finally:
+        shutil.rmtree(tmp_dir)
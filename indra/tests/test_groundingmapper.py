@@ -292,6 +292,88 @@ def test_map_agent():
     assert mapped_ag.db_refs.get('FPLX') == 'ERK'
 
 
+def test_copy_on_write():
+    akt = Agent('pkbA', db_refs={'TEXT': 'Akt', 'UP': 'XXXXXX'})
+    erk = Agent('ERK1', db_refs={'TEXT': 'ERK1'})
+    akt.bound_conditions = [BoundCondition(erk)]
+    stmt1 = Phosphorylation(None, akt, evidence=[Evidence(text='x')])
+    xyz = Agent('XYZ', db_refs={'TEXT': 'xyz123'})
+    stmt2 = Phosphorylation(None, xyz, evidence=[Evidence(text='y')])
+    gm = GroundingMapper(default_grounding_map, use_deft=False)
+    mapped_stmts = gm.map_agents([stmt1, stmt2], copy_on_write=True)
+    assert len(mapped_stmts) == 2
+    # The first Statement's Agents are copied and mapped
+    mapped_akt = mapped_stmts[0].sub
+    assert mapped_stmts[0] is not stmt1
+    assert mapped_stmts[0].evidence is stmt1.evidence
+    assert mapped_akt.db_refs['FPLX'] == 'AKT'
+    assert mapped_akt.bound_conditions[0].agent.db_refs['HGNC'] == '6877'
+    assert akt.db_refs == {'TEXT': 'Akt', 'UP': 'XXXXXX'}
+    assert erk.db_refs == {'TEXT': 'ERK1'}
+    # The second Statement needs no mapping so it is passed through
+    assert mapped_stmts[1] is stmt2
+
+
+class _MockDisambiguator(object):
+    def __init__(self):
+        self.calls = []
+
+    def disambiguate(self, texts):
+        self.calls.append(texts)
+        return [('GO:0005783', 'Endoplasmic Reticulum', {'GO:0005783': 1.0})
+                if 'reticulum' in text else ('ungrounded', None, {})
+                for text in texts]
+
+
+def test_deft_batching():
+    disambiguator = _MockDisambiguator()
+    deft_disambiguators['XYZER'] = disambiguator
+    try:
+        stmts = [Phosphorylation(None, Agent('XYZER',
+                                             db_refs={'TEXT': 'XYZER'}),
+                                 evidence=[Evidence(text=text)])
+                 for text in ['in the reticulum', 'in the nucleus']]
+        gm = GroundingMapper(default_grounding_map)
+        mapped_stmts = gm.map_agents(stmts, copy_on_write=True)
+    finally:
+        deft_disambiguators.pop('XYZER')
+    assert disambiguator.calls == [['in the reticulum', 'in the nucleus']]
+    assert mapped_stmts[0].sub.db_refs == {'TEXT': 'XYZER', 'GO': '0005783'}
+    assert mapped_stmts[1].sub.db_refs == {'TEXT': 'XYZER'}
+    annots = mapped_stmts[0].evidence[0].annotations
+    assert annots['agents']['deft'][1] == {'GO:0005783': 1.0}
+    # The input Statements are left unchanged
+    assert stmts[0].sub.db_refs == {'TEXT': 'XYZER'}
+    assert 'agents' not in stmts[0].evidence[0].annotations
+
+
+def test_map_agents_subclass():
+    # map_agents maps with the given mapper, including its overrides,
+    # while Deft is still run in a batch
+    class _TextNameMapper(GroundingMapper):
+        def map_agent(self, agent, do_rename):
+            agent, maps_to_none = \
+                super(_TextNameMapper, self).map_agent(agent, do_rename)
+            agent.name = agent.db_refs['TEXT']
+            return agent, maps_to_none
+
+    disambiguator = _MockDisambiguator()
+    deft_disambiguators['XYZER'] = disambiguator
+    try:
+        stmts = [Phosphorylation(Agent('X', db_refs={'TEXT': 'ERK1'}),
+                                 Agent('XYZER', db_refs={'TEXT': 'XYZER'}),
+                                 evidence=[Evidence(text=text)])
+                 for text in ['in the reticulum', 'in the nucleus']]
+        gm = _TextNameMapper(default_grounding_map)
+        mapped_stmts = gm.map_agents(stmts)
+    finally:
+        deft_disambiguators.pop('XYZER')
+    assert disambiguator.calls == [['in the reticulum', 'in the nucleus']]
+    assert mapped_stmts[0].enz.name == 'ERK1'
+    assert mapped_stmts[0].enz.db_refs['HGNC'] == '6877'
+    assert mapped_stmts[0].sub.db_refs == {'TEXT': 'XYZER', 'GO': '0005783'}
+
+
 def test_deft_mapping():
     er1 = Agent('ER', db_refs={'TEXT': 'ER'})
     pmid1 = '30775882'
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 import os
+import tempfile
 from copy import deepcopy
 from indra.util import unicode_strs
 from indra.preassembler.hierarchy_manager import hierarchies, \
@@ -281,3 +282,89 @@ def test_yaml_hm():
     hm.add_entry(entry)
     assert hm.isa('UN', entry, 'UN', '/'.join(entry.split('/')[:-1]))
     assert hm.isa('UN', entry, 'UN', '/'.join(entry.split('/')[:-2]))
+
+
+def test_compiled_closures():
+    eidos_ont = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '../sources/eidos/eidos_ontology.rdf')
+    hm = HierarchyManager(eidos_ont, True, True)
+    # Build the closures as dicts to compare with the compiled ones
+    hm_dict = HierarchyManager(None, False, True)
+    hm_dict.graph = hm.graph
+    hm_dict.build_transitive_closure(hm.isa_objects, hm_dict.isa_closure)
+    assert len(hm.isa_closure) == len(hm_dict.isa_closure)
+    for uri, parents in hm_dict.isa_closure.items():
+        assert uri in hm.isa_closure
+        assert set(hm.isa_closure[uri]) == set(parents)
+        for parent in parents:
+            assert hm.isa_closure.contains_pair(uri, parent)
+            assert not hm.isa_closure.contains_pair(parent, uri)
+    assert hm.isa_closure.get('xxx') is None
+    assert not hm.isa_closure.contains_pair('xxx', 'yyy')
+
+
+def test_save_load_closures():
+    fname = os.path.join(tempfile.mkdtemp(), 'entity_closures.npz')
+    ent_hierarchy.save_closures(fname)
+    hm = HierarchyManager(None, True, True)
+    hm.graph = ent_hierarchy.graph
+    hm.load_closures(fname)
+    assert dict(hm.isa_closure.items()) == \
+        dict(ent_hierarchy.isa_closure.items())
+    assert hm.components == ent_hierarchy.components
+    assert hm.isa('HGNC', 'MAPK1', 'FPLX', 'MAPK')
+    assert hm.partof('HGNC', 'RPTOR', 'FPLX', 'mTORC1')
+    assert not hm.partof('HGNC', 'RPTOR', 'FPLX', 'mTORC2')
+    mapk = 'http://identifiers.org/fplx/MAPK'
+    assert set(hm.get_children(mapk)) == \
+        set(ent_hierarchy.get_children(mapk))
+
+
+def test_add_relation():
+    eidos_ont = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '../sources/eidos/eidos_ontology.rdf')
+    hm = HierarchyManager(eidos_ont, True, True)
+    eidos_ns = 'https://github.com/clulab/eidos/wiki/JSON-LD/Grounding#'
+    hm.add_relation(eidos_ns + 'UN/events/human/x', 'isa',
+                    eidos_ns + 'UN/events/human')
+    hm.add_relation(eidos_ns + 'UN/events/human/x/y', 'isa',
+                    eidos_ns + 'UN/events/human/x')
+    assert hm.isa('UN', 'UN/events/human/x/y', 'UN', 'UN/events')
+    assert eidos_ns + 'UN/events/human/x/y' in \
+        hm.get_children(eidos_ns + 'UN/events')
+    # The incrementally updated closures are the same as the ones built
+    # from scratch
+    hm_full = HierarchyManager(None, True, True)
+    hm_full.load_from_rdf_graph(hm.graph)
+    for attr in ('isa_closure', 'isa_or_partof_closure', '_children'):
+        closure = {k: set(v) for k, v in getattr(hm, attr).items()}
+        closure_full = {k: set(v) for k, v in getattr(hm_full, attr).items()}
+        assert closure == closure_full
+    # The new URIs are in the same component as the ones they are related to
+    assert hm.compiled.get_components() == hm.components
+    assert hm.components[eidos_ns + 'UN/events/human/x/y'] == \
+        hm.components[eidos_ns + 'UN/events']
+
+
+def test_add_relation_unpickled():
+    # The pickled hierarchies don't have a ClosureBuilder, which is made
+    # when the first relation is added
+    hm = get_bio_hierarchies()['entity']
+    hm.add_relation('http://identifiers.org/fplx/NEWFAM', 'isa',
+                    'http://identifiers.org/fplx/MAPK')
+    assert hm.isa('FPLX', 'NEWFAM', 'FPLX', 'MAPK')
+    assert hm.isa('HGNC', 'MAPK1', 'FPLX', 'MAPK')
+    assert not hm.isa('FPLX', 'MAPK', 'FPLX', 'NEWFAM')
+    assert hm.components['http://identifiers.org/fplx/NEWFAM'] == \
+        hm.components['http://identifiers.org/fplx/MAPK']
+
+
+def test_yaml_hm_local():
+    yml = [{'UN': [{'events': [{'OntologyNode': None, 'name': 'flood'}]}]}]
+    hm = YamlHierarchyManager(yml, rdf_graph_from_yaml)
+    assert hm.isa('UN', 'UN/events/flood', 'UN', 'UN/events')
+    hm.add_entry('UN/events/galactic/alien_invasion')
+    assert hm.isa('UN', 'UN/events/galactic/alien_invasion',
+                  'UN', 'UN/events/galactic')
+    assert hm.isa('UN', 'UN/events/galactic/alien_invasion', 'UN', 'UN')
+    assert not hm.isa('UN', 'UN/events/flood', 'UN', 'UN/events/galactic')
@@ -104,3 +104,18 @@ def test_human_only():
     im.add_statements('12346', [stmt4])
     im.preassemble(filters=['human_only'])
     assert (len(im.assembled_stmts) == 3)
+
+def test_preassemble_incremental():
+    im = IncrementalModel()
+    im.add_statements('12345', [stmt3])
+    im.preassemble(incremental=True)
+    assert len(im.assembled_stmts) == 1
+    im.add_statements('12346', [stmt4, stmt5])
+    im.preassemble(incremental=True)
+    assert len(im.assembled_stmts) == 3
+    assert len(im.preassembler.refinements) == 2
+    im.preassemble()
+    assert len(im.assembled_stmts) == 3
+    # Changing the filters starts preassembly over
+    im.preassemble(filters=['grounding'], incremental=True)
+    assert len(im.assembled_stmts) == 2
@@ -127,6 +127,22 @@ def test_sofia_incorrect():
     assert close_enough(beliefs, expected), (beliefs, expected)
 
 
+def test_hume_incorrect_delta():
+    curator = LiveCurator(corpora={'1': _make_corpus()})
+    beliefs = curator.update_beliefs(corpus_id='1', return_delta=True)
+    assert set(beliefs) == {'1', '2', '3', '4'}, beliefs
+    beliefs = curator.update_beliefs(corpus_id='1', return_delta=True)
+    assert not beliefs, beliefs
+
+    curator.submit_curation(corpus_id='1', curations={'3': 0})
+    expected = {'2': 0.88772,
+                '3': 0,
+                '4': 0.61904}
+    beliefs = curator.update_beliefs(corpus_id='1', return_delta=True)
+    assert set(beliefs) == set(expected), (beliefs, expected)
+    assert close_enough(beliefs, expected), (beliefs, expected)
+
+
 class LiveCurationTestCase(unittest.TestCase):
     def setUp(self):
         _make_corpus()
@@ -4,6 +4,7 @@ import os
 import pickle
 import random
 import numpy as np
+import networkx as nx
 import pygraphviz as pgv
 from indra.statements import *
 from collections import Counter
@@ -14,7 +15,10 @@ from indra.databases import hgnc_client
 from indra.explanation.model_checker import ModelChecker, _mp_embeds_into, \
                                       _cp_embeds_into, _match_lhs, \
                                       stmt_from_rule, PathResult, \
-                                      remove_im_params
+                                      remove_im_params, RuleLhsIndex, \
+                                      UpstreamSources, _find_sources, \
+                                      _find_sources_with_paths, \
+                                      get_signed_predecessor_map
 from indra.assemblers.pysb.assembler import PysbAssembler, \
                                             set_base_initial_condition
 from pysb.tools import species_graph
@@ -84,6 +88,79 @@ def test__match_lhs():
     assert len(matching_rules) == 0
 
 
+@with_model
+def test_rule_lhs_index():
+    Monomer('A', ['other'], {'other': ['u', 'p']})
+    Monomer('B', ['T185'], {'T185': ['u', 'p']})
+    Parameter('k', 1)
+    Rule('A_phos_B', A() + B(T185='u') >> A() + B(T185='p'), k)
+    Rule('Ap_phos_B', A(other='p') + B(T185='u') >> A(other='p') + B(T185='p'),
+         k)
+    Rule('B_dephos_A', B(T185='p') + A(other='p') >> B(T185='p') + A(other='u'),
+         k)
+    index = RuleLhsIndex(model.rules)
+    assert index.is_current(model.rules)
+    for mp in [A(), A(other='u'), A(other='p'), B(), B(T185='u'),
+               B(T185='p')]:
+        assert index.match(mp) == _match_lhs(mp, model.rules)
+    assert [r.name for r in index.match(A(other='p'))] == \
+        ['Ap_phos_B', 'B_dephos_A']
+    Rule('A_dephos', A(other='p') >> A(other='u'), k)
+    assert not index.is_current(model.rules)
+
+
+def test_upstream_sources():
+    im = nx.MultiDiGraph()
+    im.add_edge('R1', 'R2', sign=1)
+    im.add_edge('R1', 'R3', sign=-1)
+    im.add_edge('R2', 'R4', sign=-1)
+    im.add_edge('R3', 'R4', sign=-1)
+    im.add_edge('R4', 'R2', sign=1)
+    im.add_edge('R4', 'obs', sign=1)
+    im.add_edge('R2', 'obs', sign=-1)
+    upstream = UpstreamSources(im, 'obs')
+    for sources in [None, {'R1'}, {'R2', 'R3'}, {'R4'}]:
+        for polarity in [1, -1]:
+            assert upstream.find_sources(sources, polarity) == \
+                list(_find_sources(im, 'obs', sources, polarity))
+            first_path = next(_find_sources_with_paths(im, 'obs', sources,
+                                                       polarity), None)
+            assert upstream.find_shortest_path(sources, polarity) == \
+                first_path
+    assert upstream.find_sources({'R1'}, 1) == [('R1', 1, 3), ('R1', 1, 4)]
+    assert upstream.find_shortest_path({'R1'}, -1) == \
+        (('obs', 1), ('R2', -1), ('R1', -1))
+
+
+def test_upstream_sources_random_graphs():
+    # The single search upstream of the observable finds the same sources
+    # and first path as enumerating the paths, on graphs with cycles and
+    # edges of both polarities
+    rng = random.Random(1)
+    nodes = ['R%d' % i for i in range(8)]
+    for _ in range(50):
+        im = nx.MultiDiGraph()
+        for _ in range(16):
+            im.add_edge(rng.choice(nodes), rng.choice(nodes),
+                        sign=rng.choice([1, -1]))
+        for node in rng.sample(nodes, 2):
+            im.add_edge(node, 'obs', sign=rng.choice([1, -1]))
+        signed_preds = get_signed_predecessor_map(im)
+        for upstream in (UpstreamSources(im, 'obs'),
+                         UpstreamSources(im, 'obs', signed_preds)):
+            for sources in [None, set(rng.sample(nodes, 1)),
+                            set(rng.sample(nodes, 3))]:
+                for polarity in [1, -1]:
+                    ref_sources = list(_find_sources(im, 'obs', sources,
+                                                     polarity))
+                    assert upstream.find_sources(sources, polarity) == \
+                        ref_sources
+                    first_path = next(_find_sources_with_paths(
+                        im, 'obs', sources, polarity), None)
+                    assert upstream.find_shortest_path(sources, polarity) == \
+                        first_path
+
+
 """
 @with_model
 def test_match_rhs():
@@ -1225,6 +1302,33 @@ def test_prune_influence_map_subj_obj():
     assert pr_after.result_code == 'NO_PATHS_FOUND', pr_after
 
 
+def test_check_statement_after_im_change():
+    # The paths are found in the influence map as it is after in-place
+    # changes like pruning
+    st = Phosphorylation(Agent('A', db_refs={'HGNC': '1'}),
+                         Agent('B', db_refs={'HGNC': '2'}))
+    pa = PysbAssembler([st])
+    model = pa.make_model(policies='one_step')
+    mc = ModelChecker(model, [st])
+
+    def generate_im(model):
+        im = nx.MultiDiGraph()
+        for rule in model.rules:
+            im.add_node(rule.name, node_type='rule')
+        for obs in model.observables:
+            im.add_node(obs.name, node_type='variable')
+            for rule in model.rules:
+                im.add_edge(rule.name, obs.name, sign=1)
+        return im
+    mc.generate_im = generate_im
+    assert mc.check_statement(st).result_code == 'PATHS_FOUND'
+    im = mc.get_im()
+    im.remove_edges_from(list(im.edges()))
+    assert mc.check_statement(st).result_code == 'NO_PATHS_FOUND'
+    results = mc.check_model()
+    assert results[0][1].result_code == 'NO_PATHS_FOUND'
+
+
 def test_prune_influence_map_degrade_bind():
     deg = DecreaseAmount(None, Agent('X'))
     bind = Complex([Agent('X'), Agent('Y')])
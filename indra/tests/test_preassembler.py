@@ -2,6 +2,7 @@ from __future__ import absolute_import, print_function, unicode_literals
 
 from builtins import dict, str
 import os
+import itertools
 from collections import OrderedDict
 
 from indra.preassembler import Preassembler, render_stmt_graph, \
@@ -543,6 +544,33 @@ def test_flatten_evidence_multilevel():
     assert anns.count('supported_by') == 2
 
 
+def test_flatten_evidence_all_levels():
+    braf = Agent('BRAF')
+    mek = Agent('MAP2K1')
+    st1 = Phosphorylation(braf, mek, evidence=[Evidence(text='foo')])
+    st2 = Phosphorylation(braf, mek, 'S',
+                          evidence=[Evidence(text='bar')])
+    st3 = Phosphorylation(braf, mek, 'S', '218',
+                          evidence=[Evidence(text='baz')])
+    pa = Preassembler(hierarchies, stmts=[st1, st2, st3])
+    pa_stmts = pa.combine_related(return_toplevel=False)
+    assert len(pa_stmts) == 3
+    flattened = flatten_evidence(pa_stmts)
+    texts = {stmt.matches_key(): sorted(ev.text for ev in stmt.evidence)
+             for stmt in flattened}
+    assert texts == {st1.matches_key(): ['foo'],
+                     st2.matches_key(): ['bar', 'foo'],
+                     st3.matches_key(): ['bar', 'baz', 'foo']}
+    # The flattened statements refer to each other, and the original
+    # statements are left unchanged
+    for stmt in flattened:
+        for supp_stmt in stmt.supported_by:
+            assert any(supp_stmt is st for st in flattened)
+    for stmt in pa_stmts:
+        assert len(stmt.evidence) == 1
+        assert 'support_type' not in stmt.evidence[0].annotations
+
+
 def test_flatten_evidence_hierarchy_supports():
     braf = Agent('BRAF')
     mek = Agent('MAP2K1')
@@ -749,6 +777,31 @@ def test_find_contradicts_refinement():
                                       {st1.uuid, st3.uuid})
 
 
+def test_find_contradicts_influence():
+    sec = 'UN/entities/human/food/food_security'
+    insec = 'UN/entities/human/food/food_insecurity'
+    tran = 'UN/entities/human/infrastructure/transportation'
+    truck = 'UN/entities/human/infrastructure/transportation/' + \
+        'transportation_methods'
+    agr = 'UN/entities/human/livelihood'
+
+    def _event(name, grounding, polarity):
+        return Event(Concept(name, db_refs={'UN': [(grounding, 1.0)]}),
+                     delta={'polarity': polarity, 'adjectives': []})
+    st1 = Influence(_event('security', sec, 1), _event('agr', agr, 1))
+    st2 = Influence(_event('insecurity', insec, 1), _event('agr', agr, 1))
+    st3 = Influence(_event('transportation', tran, 1), _event('agr', agr, 1))
+    st4 = Influence(_event('trucking', truck, 1), _event('agr', agr, -1))
+    eidos_ont = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '../sources/eidos/eidos_ontology.rdf')
+    hm = HierarchyManager(eidos_ont, True, True)
+    pa = Preassembler({'entity': hm}, [st1, st2, st3, st4])
+    for poolsize in (None, 2):
+        contradicts = pa.find_contradicts(poolsize=poolsize)
+        assert {(s1.uuid, s2.uuid) for s1, s2 in contradicts} == \
+            {(st1.uuid, st2.uuid), (st3.uuid, st4.uuid)}, contradicts
+
+
 def test_preassemble_related_complex():
     ras = Agent('RAS', db_refs={'FPLX': 'RAS'})
     kras = Agent('KRAS', db_refs={'HGNC': '6407'})
@@ -889,3 +942,156 @@ def test_association_refinement():
             in {'food', 'health'})
     assert (eh_efs_stmt.supported_by[0].members[1].concept.name
             in {'food', 'health'})
+
+
+def test_refinement_index_candidates():
+    from indra.preassembler.refinement import RefinementIndex
+    erk = Agent('ERK', db_refs={'FPLX': 'ERK'})
+    mapk1 = Agent('MAPK1', db_refs={'HGNC': '6871'})
+    mek = Agent('MEK', db_refs={'FPLX': 'MEK'})
+    map2k1 = Agent('MAP2K1', db_refs={'HGNC': '6840'})
+    akt = Agent('AKT', db_refs={'FPLX': 'AKT'})
+    st1 = Phosphorylation(mek, erk)
+    st2 = Phosphorylation(map2k1, mapk1, 'T', '185')
+    st3 = Phosphorylation(None, mapk1)
+    st4 = Phosphorylation(mek, akt)
+    st5 = Phosphorylation(map2k1, erk)
+    ri = RefinementIndex(hierarchies)
+    for idx, stmt in enumerate([st1, st2, st3, st4, st5]):
+        ri.add_statement(idx, stmt)
+    assert ri.get_less_specific(st2) == {0, 1, 2, 4}
+    # Missing Agents are not used to rule out candidates
+    assert ri.get_more_specific(st1) == {0, 1, 2, 4}
+    assert ri.get_more_specific(st3) == {1, 2}
+    assert ri.get_less_specific(st4) == {3}
+
+
+def test_indexed_refinement_matches_all_pairs():
+    from indra.preassembler import _set_supports_stmt_pairs
+    from indra.preassembler.refinement import RefinementIndex
+    erk = Agent('ERK', db_refs={'FPLX': 'ERK'})
+    mapk1 = Agent('MAPK1', db_refs={'HGNC': '6871'})
+    mapk3 = Agent('MAPK3', db_refs={'HGNC': '6877'})
+    mek = Agent('MEK', db_refs={'FPLX': 'MEK'})
+    map2k1 = Agent('MAP2K1', db_refs={'HGNC': '6840'})
+    stmts = [Phosphorylation(mek, erk), Phosphorylation(map2k1, mapk1),
+             Phosphorylation(map2k1, mapk3, 'T'), Phosphorylation(None, erk),
+             Phosphorylation(mek, mapk1, 'T', '185'),
+             Phosphorylation(map2k1, erk, 'T', '185')]
+    stmt_tuples = list(enumerate(stmts))
+    # Compare all pairs to get the reference result
+    expected = set()
+    for (ix1, st1), (ix2, st2) in itertools.combinations(stmt_tuples, 2):
+        if st1.refinement_of(st2, hierarchies):
+            expected.add((ix1, ix2))
+        elif st2.refinement_of(st1, hierarchies):
+            expected.add((ix2, ix1))
+    assert RefinementIndex.can_index(hierarchies)
+    ix_map = _set_supports_stmt_pairs(stmt_tuples, hierarchies=hierarchies)
+    assert set(ix_map) == expected, (ix_map, expected)
+    ix_map = _set_supports_stmt_pairs(stmt_tuples, split_idx=2,
+                                      hierarchies=hierarchies)
+    assert set(ix_map) == {(i, j) for i, j in expected
+                           if (i <= 2) != (j <= 2)}
+
+
+def test_incremental_preassembly_matches_full():
+    from indra.belief import BeliefEngine
+    from indra.preassembler.incremental import IncrementalPreassembler
+    erk = Agent('ERK', db_refs={'FPLX': 'ERK'})
+    mapk1 = Agent('MAPK1', db_refs={'HGNC': '6871'})
+    mek = Agent('MEK', db_refs={'FPLX': 'MEK'})
+    map2k1 = Agent('MAP2K1', db_refs={'HGNC': '6840'})
+
+    def ev(source_api, text):
+        return [Evidence(source_api=source_api, text=text)]
+    stmts1 = [Phosphorylation(mek, erk, evidence=ev('reach', 'a')),
+              Phosphorylation(map2k1, mapk1, evidence=ev('sparser', 'b')),
+              Phosphorylation(None, erk, evidence=ev('reach', 'c'))]
+    stmts2 = [Phosphorylation(mek, erk, evidence=ev('trips', 'd')),
+              Phosphorylation(map2k1, mapk1, 'T', '185',
+                              evidence=ev('reach', 'e')),
+              Phosphorylation(mek, mapk1, evidence=ev('reach', 'f'))]
+
+    pa = Preassembler(hierarchies, stmts1 + stmts2)
+    full_stmts = pa.combine_related(return_toplevel=False)
+    BeliefEngine().set_hierarchy_probs(full_stmts)
+    full_by_hash = {st.get_hash(shallow=True): st for st in full_stmts}
+
+    ip = IncrementalPreassembler(hierarchies, stmts1)
+    assert len(ip.get_statements()) == 3
+    updated = ip.add_statements(stmts2)
+    assert len(updated) == 5, updated
+    inc_stmts = ip.get_statements()
+    assert len(inc_stmts) == len(full_stmts)
+    assert len(ip.get_statements(return_toplevel=True)) == \
+        len([st for st in full_stmts if not st.supports])
+    for st in inc_stmts:
+        full_st = full_by_hash[st.get_hash(shallow=True)]
+        assert len(st.evidence) == len(full_st.evidence)
+        assert st.belief == full_st.belief, (st, st.belief, full_st.belief)
+        assert {s.get_hash(shallow=True) for s in st.supports} == \
+            {s.get_hash(shallow=True) for s in full_st.supports}
+        assert {s.get_hash(shallow=True) for s in st.supported_by} == \
+            {s.get_hash(shallow=True) for s in full_st.supported_by}
+    # The raw Statements are not modified
+    assert not stmts2[0].evidence[0].annotations
+
+
+def test_incremental_preassembly_matches_run_preassembly():
+    from indra.tools.assemble_corpus import run_preassembly
+    from indra.preassembler.incremental import IncrementalPreassembler
+    erk = Agent('ERK', db_refs={'FPLX': 'ERK'})
+    mapk1 = Agent('MAPK1', db_refs={'HGNC': '6871'})
+    mek = Agent('MEK', db_refs={'FPLX': 'MEK'})
+    map2k1 = Agent('MAP2K1', db_refs={'HGNC': '6840'})
+    gtp = Agent('GTP', db_refs={'CHEBI': 'CHEBI:15996'})
+    gdp = Agent('GDP', db_refs={'CHEBI': 'CHEBI:17552'})
+    stmts = [Phosphorylation(mek, erk), Phosphorylation(map2k1, mapk1),
+             Phosphorylation(None, erk), Phosphorylation(None, mapk1, 'T'),
+             Activation(mek, erk), Activation(map2k1, mapk1),
+             Complex([mek, erk]), Complex([map2k1, mapk1]),
+             Conversion(None, [gtp], [gdp]), Conversion(erk, [gtp], [gdp]),
+             Conversion(mapk1, [gtp], [gdp]),
+             Conversion(None, [erk, gtp], [gdp]),
+             Conversion(mapk1, [mapk1, gtp], [gdp])]
+    for idx, stmt in enumerate(stmts):
+        stmt.evidence = [Evidence(source_api='reach', text=str(idx))]
+    full_stmts = run_preassembly(stmts, return_toplevel=False)
+    ip = IncrementalPreassembler(hierarchies, stmts[:6])
+    ip.add_statements(stmts[6:])
+    inc_stmts = ip.get_statements()
+    assert len(inc_stmts) == len(full_stmts)
+    full_by_hash = {st.get_hash(shallow=True): st for st in full_stmts}
+    for st in inc_stmts:
+        full_st = full_by_hash[st.get_hash(shallow=True)]
+        assert {s.get_hash(shallow=True) for s in st.supports} == \
+            {s.get_hash(shallow=True) for s in full_st.supports}, st
+        assert {s.get_hash(shallow=True) for s in st.supported_by} == \
+            {s.get_hash(shallow=True) for s in full_st.supported_by}, st
+    # Conversions with and without a subject don't refine each other
+    conv = [st for st in inc_stmts if isinstance(st, Conversion) and
+            st.subj is None and len(st.obj_from) == 1][0]
+    assert not conv.supported_by
+
+
+def test_combine_duplicates_multiprocessing():
+    mek = Agent('MEK', db_refs={'FPLX': 'MEK'})
+    erk = Agent('ERK', db_refs={'FPLX': 'ERK'})
+    stmts = [Phosphorylation(mek, erk, evidence=[Evidence(text='a')]),
+             Phosphorylation(mek, erk, evidence=[Evidence(text='b')]),
+             Phosphorylation(mek, erk, 'T', evidence=[Evidence(text='c')]),
+             Dephosphorylation(mek, erk, evidence=[Evidence(text='d')]),
+             Complex([mek, erk], evidence=[Evidence(text='e')]),
+             Complex([erk, mek], evidence=[Evidence(text='f')])]
+    serial = Preassembler.combine_duplicate_stmts(stmts)
+    parallel = Preassembler.combine_duplicate_stmts(stmts, poolsize=2)
+    assert len(serial) == len(parallel) == 4
+    serial_by_hash = {st.get_hash(shallow=True): st for st in serial}
+    for stmt in parallel:
+        serial_stmt = serial_by_hash[stmt.get_hash(shallow=True)]
+        assert sorted(ev.text for ev in stmt.evidence) == \
+            sorted(ev.text for ev in serial_stmt.evidence)
+        assert all(ev.annotations['prior_uuids'] and
+                   'raw_text' in ev.annotations['agents']
+                   for ev in stmt.evidence)
@@ -1,6 +1,7 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
 import time
+import xml.etree.ElementTree as ET
 from indra.literature import pubmed_client
 from indra.util import unicode_strs
 from nose.plugins.attrib import attr
@@ -162,3 +163,44 @@ def test_get_annotations():
     assert len(me_ans) == 9, len(me_ans)
     assert all(d['mesh'].startswith('D') for d in me_ans)
     assert any(d['major_topic'] for d in me_ans)
+
+
+def _make_pubmed_xml(pmids):
+    article_xml = ('<PubmedArticle><MedlineCitation><PMID>%s</PMID>'
+                   '<Article><Journal><Title>Journal</Title>'
+                   '<ISOAbbreviation>J</ISOAbbreviation></Journal>'
+                   '<ArticleTitle>Title %s</ArticleTitle>'
+                   '<Abstract><AbstractText>Abstract %s</AbstractText>'
+                   '</Abstract></Article></MedlineCitation><PubmedData>'
+                   '<ArticleIdList><ArticleId IdType="doi">10.1/%s'
+                   '</ArticleId></ArticleIdList></PubmedData>'
+                   '</PubmedArticle>')
+    return ('<PubmedArticleSet>%s</PubmedArticleSet>' %
+            ''.join(article_xml % ((pmid,) * 4) for pmid in pmids))
+
+
+def test_iter_metadata_for_ids():
+    requested_ids = []
+
+    def transport(url, params):
+        assert url == pubmed_client.pubmed_fetch
+        pmids = params['id'].split(',')
+        requested_ids.append(pmids)
+        if '13' in pmids:
+            return None
+        return _make_pubmed_xml(pmids).encode('utf-8')
+
+    pmids = [str(i) for i in range(25)]
+    results = list(pubmed_client.iter_metadata_for_ids(
+        pmids, get_abstracts=True, chunk_size=4, poolsize=2, max_rate=1000,
+        transport=transport))
+    assert sorted(len(ids) for ids in requested_ids) == [1, 4, 4, 4, 4, 4, 4]
+    # The chunk with a failed request is skipped
+    assert sorted(res['pmid'] for res in results) == \
+        sorted(set(pmids) - {'12', '13', '14', '15'})
+    tree = ET.XML(_make_pubmed_xml(['3']))
+    expected = pubmed_client.get_metadata_from_xml_tree(tree,
+                                                        get_abstracts=True)
+    assert [res for res in results if res['pmid'] == '3'] == \
+        [expected['3']]
+    assert expected['3']['abstract'] == 'Abstract 3'
@@ -6,7 +6,7 @@ import indra.assemblers.pysb.assembler as pa
 from indra.assemblers.pysb.assembler import Policy, Param
 from indra.assemblers.pysb.preassembler import PysbPreassembler
 from indra.statements import *
-from pysb import bng, WILD, Monomer, Annotation
+from pysb import bng, WILD, Monomer, Annotation, Parameter
 from pysb.testing import with_model
 from nose.tools import raises
 
@@ -824,6 +824,28 @@ def test_get_mp_with_grounding():
     assert mps[0].monomer == B_monomer
 
 
+@with_model
+def test_get_mp_with_grounding_added_monomer():
+    a = Agent('A', db_refs={'HGNC': '6840', 'UP': 'Q02750'})
+    Monomer('A_monomer')
+    Annotation(A_monomer, 'http://identifiers.org/uniprot/Q02750')
+    mps = list(pa.grounded_monomer_patterns(model, a))
+    assert len(mps) == 1
+    assert mps[0].monomer == A_monomer
+    # Monomers added after a lookup are found, and the monomer annotated
+    # first is still the one returned
+    Monomer('B_monomer')
+    Annotation(B_monomer, 'http://identifiers.org/hgnc/HGNC:6840')
+    Monomer('C_monomer')
+    Annotation(C_monomer, 'http://identifiers.org/hgnc/HGNC:6871')
+    mps = list(pa.grounded_monomer_patterns(model, a))
+    assert mps[0].monomer == A_monomer
+    c = Agent('C', db_refs={'HGNC': '6871'})
+    mps = list(pa.grounded_monomer_patterns(model, c))
+    assert len(mps) == 1
+    assert mps[0].monomer == C_monomer
+
+
 @with_model
 def test_get_mp_with_grounding_2():
     a1 = Agent('A', mods=[ModCondition('phosphorylation', None, None)],
@@ -1247,3 +1269,20 @@ def test_kappa_cm_export():
     graph = pa.export_model('kappa_cm', '/dev/null')
     assert len(graph.nodes()) == 2
     assert len(graph.edges()) == 1
+
+
+def test_unique_parameter_names():
+    st1 = Phosphorylation(Agent('BRAF'), Agent('MAP2K1'))
+    st2 = Phosphorylation(Agent('BRAF'), Agent('MAP2K1'), 'S', '222')
+    st3 = Phosphorylation(Agent('BRAF'), Agent('MAP2K1'), 'S', '218')
+    pysb_asmb = PysbAssembler([st1, st2, st3])
+    model = pysb_asmb.make_model(policies='one_step')
+    param_names = set(p.name for p in model.parameters)
+    assert {'kf_bm_phosphorylation_1', 'kf_bm_phosphorylation_2',
+            'kf_bm_phosphorylation_3'} <= param_names, param_names
+    assert len(model.initials) == 2, model.initials
+    # Numbers already used by other parameters are skipped
+    model.add_component(Parameter('kf_bm_phosphorylation_4', 1.0))
+    param = pa.get_create_parameter(
+        model, Param('kf_bm_phosphorylation', 1.0, True))
+    assert param.name == 'kf_bm_phosphorylation_5', param.name
@@ -1,10 +1,14 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
+import os
+import shutil
+import tempfile
 import unittest
 from nose.plugins.attrib import attr
 from indra.sources import reach
 from indra.sources.reach.processor import ReachProcessor
 from indra.util import unicode_strs
+from indra.statements.store import StatementStore
 from indra.statements import IncreaseAmount, DecreaseAmount, \
     Dephosphorylation, Complex, Phosphorylation, Translocation
 
@@ -428,3 +432,49 @@ def test_get_agent_coordinates_phosphorylation_missing_controller():
         annotations = stmt.evidence[0].annotations
         coords = [None, (57, 60)]
         assert annotations['agents']['coords'] == coords
+
+
+def test_frame_index():
+    fname = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'reach_coordinates.json')
+    rp = reach.process_json_file(fname)
+    assert len(rp.statements) == 2, rp.statements
+    # Processing the same extractions with objectpath queries instead of
+    # the frame index has to give the same Statements
+    rp_tree = ReachProcessor(rp.tree.data, use_index=False)
+    rp_tree.get_modifications()
+    rp_tree.get_complexes()
+    rp_tree.get_activation()
+    rp_tree.get_translocation()
+    rp_tree.get_regulate_amounts()
+    assert len(rp_tree.statements) == 2, rp_tree.statements
+    for st1, st2 in zip(rp.statements, rp_tree.statements):
+        assert st1.matches(st2)
+        assert st1.evidence[0].annotations == st2.evidence[0].annotations
+        assert st1.evidence[0].epistemics == st2.evidence[0].epistemics
+
+
+def test_process_json_files():
+    fname = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         'reach_coordinates.json')
+    missing_fname = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'reach_missing.json')
+    fnames = [fname, missing_fname]
+    stmts_by_file = reach.process_json_files(fnames, citations=['1', '2'])
+    assert set(stmts_by_file) == set(fnames), stmts_by_file
+    assert len(stmts_by_file[fname]) == 2, stmts_by_file
+    assert stmts_by_file[fname][0].evidence[0].pmid == '1'
+    assert stmts_by_file[missing_fname] == []
+
+    tmp_dir = tempfile.mkdtemp()
+    output_fname = os.path.join(tmp_dir, 'test_reach.stmts')
+    try:
+        reach.process_json_files(fnames, output_fname=output_fname)
+        with StatementStore(output_fname) as store:
+            stmt_dict = store.get_statement_dict()
+    finally:
+        shutil.rmtree(tmp_dir)
+    # Files with no Statements are kept in the statement store as well
+    assert list(stmt_dict) == fnames, stmt_dict
+    assert len(stmt_dict[fname]) == 2, stmt_dict
+    assert stmt_dict[missing_fname] == []
@@ -1,9 +1,15 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
-from protmapper import MappedSite
+import os
+import shutil
+import tempfile
+from protmapper import MappedSite, default_site_map
 from indra.statements import *
 from indra.util import unicode_strs
-from indra.preassembler.sitemapper import default_mapper as sm, MappedStatement
+from indra.preassembler.sitemapper import default_mapper as sm, \
+    MappedStatement, SiteMapper
+from indra.preassembler.site_cache import SiteMappingCache
+from indra.preassembler import sitemapper
 
 
 def test_check_agent_mod():
@@ -211,6 +217,95 @@ def test_site_map_within_bound_condition():
 
     # Verify that the agent in the object's bound condition got site-mapped
     validate_mapk1(mapped_s.obj.bound_conditions[0].agent)
+    # The original statement is left unchanged
+    mapk1_orig = st1.obj.bound_conditions[0].agent
+    assert mapk1_orig.mods[0].matches(ModCondition('phosphorylation', 'T',
+                                                   '183'))
+
+
+def test_site_map_cache():
+    (mapk1_invalid, mapk3_invalid) = get_invalid_mapks()
+    st1 = Phosphorylation(mapk1_invalid, mapk3_invalid, 'T', '201')
+    st2 = Activation(Agent('MAPK1', db_refs={'UP': 'P28482'}),
+                     Agent('MAPK3', db_refs={'UP': 'P27361'}))
+    tmp_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(tmp_dir, 'sites.sqlite')
+    try:
+        sm1 = SiteMapper(default_site_map, site_cache_path=cache_path)
+        valid1, mapped1 = sm1.map_sites([st1, st2])
+        # Valid statements are not copied
+        assert len(valid1) == 1 and valid1[0] is st2
+        with SiteMappingCache(cache_path) as site_cache:
+            cached_sites = site_cache.get_mapped_sites(
+                [('P28482', 'T', '183'), ('P27361', 'T', '201')],
+                sm1._get_mapping_options())
+        assert len(cached_sites) == 2
+        assert cached_sites[('P28482', 'T', '183')].mapped_pos == '185'
+        # A new SiteMapper finds the sites in the cache
+        sm2 = SiteMapper(default_site_map, site_cache_path=cache_path)
+        valid2, mapped2 = sm2.map_sites([st1, st2])
+        # The connection to the cache is reused
+        site_cache = sm2._site_cache
+        sm2.map_stmt_sites(Phosphorylation(None, mapk1_invalid, 'S', '1'))
+        assert sm2._site_cache is site_cache
+        assert valid2 == valid1
+        assert mapped2[0].mapped_mods == mapped1[0].mapped_mods
+        assert mapped2[0].mapped_stmt.matches(mapped1[0].mapped_stmt)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_site_map_cache_site_maps():
+    st = Phosphorylation(None, Agent('MAPK1', db_refs={'UP': 'P28482'}),
+                         'T', '183')
+    tmp_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(tmp_dir, 'sites.sqlite')
+    try:
+        sm1 = SiteMapper(default_site_map, site_cache_path=cache_path)
+        ms1 = sm1.map_stmt_sites(st)
+        # A SiteMapper with a different site map doesn't use the sites mapped
+        # with the default one
+        custom_site_map = {('P28482', 'T', '183'): ('T', '999', 'custom')}
+        sm2 = SiteMapper(custom_site_map, site_cache_path=cache_path)
+        ms2 = sm2.map_stmt_sites(st)
+        assert ms2.mapped_stmt.position == '999'
+        assert ms1.mapped_stmt.position != '999'
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_mapped_sites_bounded():
+    (mapk1_invalid, mapk3_invalid) = get_invalid_mapks()
+    sm = SiteMapper(default_site_map)
+    sm.map_sites([Phosphorylation(mapk1_invalid, mapk3_invalid, 'T', '201')])
+    # The sites mapped in a batch aren't kept after it
+    assert not sm._batch_mapped_sites
+    assert not sm._mapped_sites
+    # Only the most recently used sites of single Statements are kept
+    max_mapped_sites = sitemapper._max_mapped_sites
+    sitemapper._max_mapped_sites = 2
+    try:
+        for pos in ('183', '185', '201'):
+            sm.map_stmt_sites(Phosphorylation(None, mapk3_invalid, 'T', pos))
+    finally:
+        sitemapper._max_mapped_sites = max_mapped_sites
+    assert [key[0][2] for key in sm._mapped_sites] == ['203', '201']
+
+
+def test_map_sites_poolsize():
+    (mapk1_invalid, mapk3_invalid) = get_invalid_mapks()
+    stmts = [Phosphorylation(mapk1_invalid, mapk3_invalid, 'T', '201'),
+             Activation(Agent('MAPK1', db_refs={'UP': 'P28482'}),
+                        Agent('MAPK3', db_refs={'UP': 'P27361'})),
+             Phosphorylation(None, mapk1_invalid, 'Y', '185')]
+    sm = SiteMapper(default_site_map)
+    valid, mapped = sm.map_sites(stmts)
+    valid_mp, mapped_mp = sm.map_sites(stmts, poolsize=2, chunk_size=1)
+    assert len(valid_mp) == 1 and valid_mp[0] is stmts[1]
+    assert [ms.original_stmt for ms in mapped_mp] == [stmts[0], stmts[2]]
+    for ms, ms_mp in zip(mapped, mapped_mp):
+        assert ms_mp.mapped_mods == ms.mapped_mods
+        assert ms_mp.mapped_stmt.matches(ms.mapped_stmt)
 
 
 def get_invalid_mapks():
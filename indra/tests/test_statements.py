@@ -3,6 +3,7 @@ from builtins import dict, str
 import os
 import json
 import unittest
+import threading
 from copy import deepcopy
 from nose.tools import raises
 from indra.preassembler.hierarchy_manager import HierarchyManager
@@ -2009,3 +2010,45 @@ def test_ev_str():
 def test_draw_statements():
     stmt = Phosphorylation(None, Agent('x'))
     draw_stmt_graph([stmt])
+
+
+def test_cached_matches_keys():
+    a = Agent('A', db_refs={'HGNC': '1'})
+    st = Phosphorylation(None, a)
+    key = st.matches_key()
+    with cached_matches_keys():
+        assert st.matches_key() == key
+        a.name = 'B'
+        # The keys are memoized within the block until invalidated
+        assert st.matches_key() == key
+        with cached_matches_keys():
+            assert a.matches_key() != Agent('B', db_refs={'HGNC': '1'}).\
+                matches_key()
+        invalidate_matches_keys()
+        assert st.matches_key() != key
+        assert st.matches_key() == \
+            Phosphorylation(None, Agent('B', db_refs={'HGNC': '1'})).\
+            matches_key()
+    a.name = 'A'
+    assert st.matches_key() == key
+
+
+def test_cached_matches_keys_thread():
+    a = Agent('A', db_refs={'HGNC': '1'})
+    st = Phosphorylation(None, a)
+    key = st.matches_key()
+    other_thread_keys = []
+
+    def change_agent():
+        a.name = 'B'
+        other_thread_keys.append(st.matches_key())
+
+    with cached_matches_keys():
+        assert st.matches_key() == key
+        # Another thread doesn't see the keys memoized in this one
+        thread = threading.Thread(target=change_agent)
+        thread.start()
+        thread.join()
+        assert st.matches_key() == key
+    assert other_thread_keys[0] != key
+    assert other_thread_keys[0] == st.matches_key()
@@ -1,6 +1,9 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
+import os
 import json
+import shutil
+import tempfile
 import datetime
 import jsonschema
 from indra.statements import *
@@ -317,3 +320,94 @@ def test_file_serialization():
     stmts_to_json_file([stmt], 'test_indra_stmts.json')
     stmts = stmts_from_json_file('test_indra_stmts.json')
     assert stmts[0].matches(stmt)
+
+
+def test_statement_store():
+    from indra.statements.store import StatementStore, dump_statement_store
+    st1 = Phosphorylation(Agent('a'), Agent('b'), 'S', evidence=[ev])
+    st2 = Phosphorylation(Agent('a'), Agent('b'), 'S', '123', evidence=[ev])
+    st3 = Complex([Agent('a'), Agent('c')])
+    st1.supports = [st2]
+    st2.supported_by = [st1]
+    stmts = [st1, st2, st3, Phosphorylation(Agent('a'), Agent('b'), 'S')]
+    tmp_dir = tempfile.mkdtemp()
+    fname = os.path.join(tmp_dir, 'test_indra_stmts.stmts')
+    try:
+        for compress in (True, False):
+            dump_statement_store(stmts, fname, compress=compress)
+            with StatementStore(fname) as store:
+                assert len(store) == 4
+                assert store.get_statement(2).equals(st3)
+                stmt = store.get_statement(0, evidence=False)
+                assert stmt.matches(st1)
+                assert not stmt.evidence
+                assert isinstance(stmt.supports[0], Unresolved)
+                loaded = store.get_statements()
+                assert [st.to_json() for st in loaded] == \
+                    [st.to_json() for st in stmts]
+                assert loaded[0].supports[0] is loaded[1]
+                by_hash = store.get_statements_by_hash(st1.get_hash())
+                assert len(by_hash) == 2
+                assert all(st.matches(st1) for st in by_hash)
+                assert store.get_indices_by_hash(st3.get_hash()) == [2]
+                assert store.get_indices_by_hash(12345) == []
+                assert store.get_statement_dict() is None
+                assert store.get_metadata() is None
+        dump_statement_store(stmts, fname, metadata={'source': 'test'})
+        with StatementStore(fname) as store:
+            assert store.get_metadata() == {'source': 'test'}
+            assert [st.to_json() for st in store.get_statements()] == \
+                [st.to_json() for st in stmts]
+        # Statements that aren't in a list are not taken to be keyed
+        dump_statement_store((st for st in stmts), fname)
+        with StatementStore(fname) as store:
+            assert len(store) == 4
+            assert store.get_statement_dict() is None
+        dump_statement_store({st1, st3}, fname)
+        with StatementStore(fname) as store:
+            assert len(store) == 2
+            assert store.get_statement_dict() is None
+        # Keys with no Statements are kept
+        dump_statement_store(iter([('a', [st1, st2]), ('b', []),
+                                   ('c', [st3])]), fname)
+        with StatementStore(fname) as store:
+            stmt_dict = store.get_statement_dict()
+        assert list(stmt_dict) == ['a', 'b', 'c']
+        assert stmt_dict['b'] == []
+        assert stmt_dict['c'][0].equals(st3)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def test_file_serialization_streaming():
+    from indra.statements.io import _iter_json_array
+    st1 = IncreaseAmount(Agent('a'), Agent('b'), evidence=[ev])
+    st2 = IncreaseAmount(Agent('a', db_refs={'HGNC': '1'}), Agent('b'),
+                         evidence=[ev])
+    st1.supports = [st2]
+    st2.supported_by = [st1]
+    stmts = [st1, st2]
+    tmp_dir = tempfile.mkdtemp()
+    fname = os.path.join(tmp_dir, 'test_indra_stmts.json')
+    jsonl_fname = os.path.join(tmp_dir, 'test_indra_stmts.jsonl')
+    try:
+        stmts_to_json_file(iter(stmts), fname)
+        # The streamed output is the same as dumping the full list
+        with open(fname, 'r') as fh:
+            assert fh.read() == json.dumps(stmts_to_json(stmts), indent=1)
+        loaded = list(iter_stmts_from_json_file(fname))
+        assert loaded[0].supports == [st2.uuid]
+        promote_supports(loaded)
+        assert loaded[0].supports[0] is loaded[1]
+        assert loaded[1].supported_by[0] is loaded[0]
+        # Read the file with chunks smaller than a single Statement
+        with open(fname, 'r') as fh:
+            jsons = list(_iter_json_array(fh, chunk_size=7))
+        assert jsons == stmts_to_json(stmts)
+        stmts_to_json_file(stmts, jsonl_fname, format='jsonl')
+        loaded = stmts_from_json_file(jsonl_fname, format='jsonl')
+        assert [st.to_json() for st in loaded] == stmts_to_json(stmts)
+        stmts_to_json_file([], fname)
+        assert stmts_from_json_file(fname) == []
+    finally:
+        shutil.rmtree(tmp_dir)
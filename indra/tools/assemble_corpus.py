@@ -11,6 +11,8 @@ except ImportError:
 import logging
 from copy import deepcopy, copy
 from indra.statements import *
+from indra.statements.store import StatementStore, dump_statement_store, \
+    is_statement_store
 from indra.belief import BeliefEngine
 from indra.util import read_unicode_csv
 from indra.mechlinker import MechLinker
@@ -19,6 +21,8 @@ from indra.preassembler import Preassembler, flatten_evidence
 
 logger = logging.getLogger(__name__)
 
+STORE_EXTENSION = '.stmts'
+
 
 def _filter(kwargs, arg_list):
     return dict(filter(lambda x: x[0] in arg_list, kwargs.items()))
@@ -27,6 +31,11 @@ def _filter(kwargs, arg_list):
 def dump_statements(stmts, fname, protocol=4):
     """Dump a list of statements into a pickle file.
 
+    If the file name ends with `.stmts`, the statements are written into a
+    compressed, memory-mappable statement store instead (see
+    :py:mod:`indra.statements.store`), which is faster to load and can be
+    read lazily.
+
     Parameters
     ----------
     fname : str
@@ -36,12 +45,15 @@ def dump_statements(stmts, fname, protocol=4):
         Default: 4
     """
     logger.info('Dumping %d statements into %s...' % (len(stmts), fname))
+    if fname.endswith(STORE_EXTENSION):
+        dump_statement_store(stmts, fname)
+        return
     with open(fname, 'wb') as fh:
         pickle.dump(stmts, fh, protocol=protocol)
 
 
 def load_statements(fname, as_dict=False):
-    """Load statements from a pickle file.
+    """Load statements from a pickle file or a statement store file.
 
     Parameters
     ----------
@@ -58,14 +70,20 @@ def load_statements(fname, as_dict=False):
         A list or dict of statements that were loaded.
     """
     logger.info('Loading %s...' % fname)
-    with open(fname, 'rb') as fh:
-        # Encoding argument not available in pickle for Python 2
-        if sys.version_info[0] < 3:
-            stmts = pickle.load(fh)
-        # Encoding argument specified here to enable compatibility with
-        # pickle files created with Python 2
-        else:
-            stmts = pickle.load(fh, encoding='latin1')
+    if is_statement_store(fname):
+        with StatementStore(fname) as store:
+            stmts = store.get_statement_dict() if as_dict else None
+            if stmts is None:
+                stmts = store.get_statements()
+    else:
+        with open(fname, 'rb') as fh:
+            # Encoding argument not available in pickle for Python 2
+            if sys.version_info[0] < 3:
+                stmts = pickle.load(fh)
+            # Encoding argument specified here to enable compatibility with
+            # pickle files created with Python 2
+            else:
+                stmts = pickle.load(fh, encoding='latin1')
 
     if isinstance(stmts, dict):
         if as_dict:
@@ -94,6 +112,14 @@ def map_grounding(stmts_in, **kwargs):
     use_deft : Optional[bool]
         If True, Deft will be attempted to be used for acronym disambiguation.
         Default: True
+    copy_on_write : Optional[bool]
+        If True, only the Agents of statements that need mapping are copied
+        and the other statements are returned as they are. The mapped
+        statements then share their evidence with the input statements.
+        Default: False
+    poolsize : Optional[int]
+        The number of worker processes to map grounding with. If None
+        (default), no parallelization is performed.
     save : Optional[str]
         The name of a pickle file to save the results (stmts_out) into.
 
@@ -112,7 +138,9 @@ def map_grounding(stmts_in, **kwargs):
     if do_rename is None:
         do_rename = True
     gm = GroundingMapper(gm, agent_map, use_deft=kwargs.get('use_deft', True))
-    stmts_out = gm.map_agents(stmts_in, do_rename=do_rename)
+    stmts_out = gm.map_agents(stmts_in, do_rename=do_rename,
+                              copy_on_write=kwargs.get('copy_on_write', False),
+                              poolsize=kwargs.get('poolsize'))
     dump_pkl = kwargs.get('save')
     if dump_pkl:
         dump_statements(stmts_out, dump_pkl)
@@ -301,6 +329,14 @@ def map_sequence(stmts_in, **kwargs):
         SITEMAPPER_CACHE_PATH, defined in your INDRA config or the environment.
         If False, no cache is used. For more details on the cache, see the
         SiteMapper class definition.
+    site_cache_path : Optional[str]
+        The path to an SQLite file in which mapped sites are cached
+        persistently, so that sites mapped in earlier runs or by other
+        processes are not mapped again. If not given, no persistent site
+        cache is used.
+    poolsize : Optional[int]
+        The number of worker processes to map sites in. If not given, sites
+        are mapped in the current process.
     save : Optional[str]
         The name of a pickle file to save the results (stmts_out) into.
 
@@ -312,11 +348,11 @@ def map_sequence(stmts_in, **kwargs):
     from indra.preassembler.sitemapper import SiteMapper, default_site_map
     logger.info('Mapping sites on %d statements...' % len(stmts_in))
     kwarg_list = ['do_methionine_offset', 'do_orthology_mapping',
-                  'do_isoform_mapping']
+                  'do_isoform_mapping', 'site_cache_path']
     sm = SiteMapper(default_site_map,
                     use_cache=kwargs.pop('use_cache', False),
                     **_filter(kwargs, kwarg_list))
-    valid, mapped = sm.map_sites(stmts_in)
+    valid, mapped = sm.map_sites(stmts_in, poolsize=kwargs.get('poolsize'))
     correctly_mapped_stmts = []
     for ms in mapped:
         correctly_mapped = all([mm.has_mapping() for mm in ms.mapped_mods])
@@ -343,10 +379,10 @@ def run_preassembly(stmts_in, **kwargs):
         all statements are returned irrespective of level of specificity.
         Default: True
     poolsize : Optional[int]
-        The number of worker processes to use to parallelize the
-        comparisons performed by the function. If None (default), no
-        parallelization is performed. NOTE: Parallelization is only
-        available on Python 3.4 and above.
+        The number of worker processes to use to parallelize combining
+        duplicates and the comparisons performed by the function. If None
+        (default), no parallelization is performed. NOTE: Parallelization
+        is only available on Python 3.4 and above.
     size_cutoff : Optional[int]
         Groups with size_cutoff or more statements are sent to worker
         processes, while smaller groups are compared in the parent process.
@@ -382,11 +418,12 @@ def run_preassembly(stmts_in, **kwargs):
         hierarchies
     be = BeliefEngine(scorer=belief_scorer)
     pa = Preassembler(hierarchies, stmts_in)
-    run_preassembly_duplicate(pa, be, save=dump_pkl_unique)
+    poolsize = kwargs.get('poolsize', None)
+    run_preassembly_duplicate(pa, be, save=dump_pkl_unique,
+                              poolsize=poolsize)
 
     dump_pkl = kwargs.get('save')
     return_toplevel = kwargs.get('return_toplevel', True)
-    poolsize = kwargs.get('poolsize', None)
     size_cutoff = kwargs.get('size_cutoff', 100)
     options = {'save': dump_pkl, 'return_toplevel': return_toplevel,
                'poolsize': poolsize, 'size_cutoff': size_cutoff,
@@ -409,6 +446,9 @@ def run_preassembly_duplicate(preassembler, beliefengine, **kwargs):
         A BeliefEngine instance.
     save : Optional[str]
         The name of a pickle file to save the results (stmts_out) into.
+    poolsize : Optional[int]
+        The number of worker processes to use to combine duplicates in
+        parallel. If None (default), no parallelization is performed.
 
     Returns
     -------
@@ -418,7 +458,8 @@ def run_preassembly_duplicate(preassembler, beliefengine, **kwargs):
     logger.info('Combining duplicates on %d statements...' %
                 len(preassembler.stmts))
     dump_pkl = kwargs.get('save')
-    stmts_out = preassembler.combine_duplicates()
+    poolsize = kwargs.get('poolsize', None)
+    stmts_out = preassembler.combine_duplicates(poolsize=poolsize)
     beliefengine.set_prior_probs(stmts_out)
     logger.info('%d unique statements' % len(stmts_out))
     if dump_pkl:
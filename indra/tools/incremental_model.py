@@ -1,11 +1,14 @@
 from __future__ import absolute_import, print_function, unicode_literals
 from builtins import dict, str
+import copy
 import pickle
 import logging
 from indra.statements import Agent
+from indra.util import fast_deepcopy
 import indra.tools.assemble_corpus as ac
 from indra.databases import hgnc_client
 from indra.preassembler.hierarchy_manager import hierarchies
+from indra.preassembler.incremental import IncrementalPreassembler
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +19,11 @@ class IncrementalModel(object):
     Parameters
     ----------
     model_fname : Optional[str]
-        The name of the pickle file in which a set of INDRA Statements are
-        stored in a dict keyed by PubMed IDs. This is the state of an
-        IncrementalModel that is loaded upon instantiation.
+        The name of the pickle file (or statement store file, see
+        :py:func:`indra.tools.assemble_corpus.dump_statements`) in which a
+        set of INDRA Statements are stored in a dict keyed by PubMed IDs.
+        This is the state of an IncrementalModel that is loaded upon
+        instantiation.
 
     Attributes
     ----------
@@ -27,20 +32,28 @@ class IncrementalModel(object):
         state of the IncrementalModel.
     assembled_stmts : list[indra.statements.Statement]
         A list of INDRA Statements after assembly.
+    preassembler : indra.preassembler.incremental.IncrementalPreassembler
+        The state of incremental preassembly, if the model was preassembled
+        with `incremental=True`, otherwise None.
     """
     def __init__(self, model_fname=None):
         if model_fname is None:
             self.stmts = {}
         else:
             try:
-                with open(model_fname, 'rb') as f:
-                    self.stmts = pickle.load(f)
+                self.stmts = ac.load_statements(model_fname, as_dict=True)
             except:
                 logger.warning('Could not load %s, starting new model.' %
                                model_fname)
                 self.stmts = {}
         self.prior_genes = []
         self.assembled_stmts = []
+        self.preassembler = None
+        # The UUIDs of the raw Statements that have already been passed
+        # to the incremental preassembler and the options they were
+        # processed with
+        self._preassembled_uuids = set()
+        self._preassembly_options = None
 
     def save(self, model_fname='model.pkl'):
         """Save the state of the IncrementalModel in a pickle file.
@@ -49,10 +62,49 @@ class IncrementalModel(object):
         ----------
         model_fname : Optional[str]
             The name of the pickle file to save the state of the
-            IncrementalModel in. Default: model.pkl
+            IncrementalModel in. If it ends with `.stmts`, the Statements
+            are saved in a statement store file instead. Default: model.pkl
         """
-        with open(model_fname, 'wb') as fh:
-            pickle.dump(self.stmts, fh, protocol=4)
+        ac.dump_statements(self.stmts, model_fname)
+
+    def save_preassembly(self, fname='preassembly.pkl'):
+        """Save the state of incremental preassembly in a pickle file.
+
+        Parameters
+        ----------
+        fname : Optional[str]
+            The name of the pickle file to save the state of incremental
+            preassembly in. Default: preassembly.pkl
+        """
+        state = {'preassembler': self.preassembler,
+                 'uuids': self._preassembled_uuids,
+                 'options': self._preassembly_options}
+        with open(fname, 'wb') as fh:
+            pickle.dump(state, fh, protocol=4)
+
+    def load_preassembly(self, fname='preassembly.pkl'):
+        """Load the state of incremental preassembly from a pickle file.
+
+        The state is only used by subsequent calls to `preassemble` with
+        `incremental=True` if it was created with the same filters and
+        grounding map, and from Statements that are all still in the model.
+
+        Parameters
+        ----------
+        fname : Optional[str]
+            The name of the pickle file to load the state of incremental
+            preassembly from. Default: preassembly.pkl
+        """
+        try:
+            with open(fname, 'rb') as fh:
+                state = pickle.load(fh)
+        except Exception:
+            logger.warning('Could not load %s, incremental preassembly will '
+                           'start from scratch.' % fname)
+            return
+        self.preassembler = state['preassembler']
+        self._preassembled_uuids = state['uuids']
+        self._preassembly_options = state['options']
 
     def add_statements(self, pmid, stmts):
         """Add INDRA Statements to the incremental model indexed by PMID.
@@ -81,7 +133,8 @@ class IncrementalModel(object):
         logger.info('%d statements after relevance filter' % len(stmts))
         return stmts
 
-    def preassemble(self, filters=None, grounding_map=None):
+    def preassemble(self, filters=None, grounding_map=None,
+                    incremental=False):
         """Preassemble the Statements collected in the model.
 
         Use INDRA's GroundingMapper, Preassembler and BeliefEngine
@@ -103,8 +156,19 @@ class IncrementalModel(object):
             A user supplied grounding map which maps a string to a
             dictionary of database IDs (in the format used by Agents'
             db_refs).
+        incremental : Optional[bool]
+            If True, only the Statements added since the last incremental
+            preassembly are grounded, filtered and merged into the
+            assembled Statements kept in the `preassembler` attribute,
+            instead of preassembling all the Statements from scratch. If
+            the filters or the grounding map changed, or Statements were
+            removed from the model, everything is preassembled again.
+            Default: False
         """
-        stmts = self.get_statements()
+        if incremental:
+            stmts = self._get_new_statements(filters, grounding_map)
+        else:
+            stmts = self.get_statements()
 
         # Filter out hypotheses
         stmts = ac.filter_no_hypothesis(stmts)
@@ -125,7 +189,13 @@ class IncrementalModel(object):
             stmts = ac.filter_human_only(stmts)
 
         # Run preassembly
-        stmts = ac.run_preassembly(stmts, return_toplevel=False)
+        if incremental:
+            self.preassembler.add_statements(stmts)
+            # The assembled Statements are copied so that they can be
+            # modified without affecting the state of the preassembler
+            stmts = fast_deepcopy(self.preassembler.get_statements())
+        else:
+            stmts = ac.run_preassembly(stmts, return_toplevel=False)
 
         # Run relevance filter
         stmts = self._relevance_filter(stmts, filters)
@@ -133,6 +203,25 @@ class IncrementalModel(object):
         # Save Statements
         self.assembled_stmts = stmts
 
+    def _get_new_statements(self, filters, grounding_map):
+        # Return the Statements that haven't been passed to the incremental
+        # preassembler yet, starting over if its state can't be reused
+        stmts = self.get_statements()
+        uuids = {stmt.uuid for stmt in stmts}
+        options = (filters, grounding_map)
+        if self.preassembler is None or \
+                self._preassembly_options != options or \
+                not self._preassembled_uuids <= uuids:
+            logger.info('Starting incremental preassembly from scratch.')
+            self.preassembler = IncrementalPreassembler(hierarchies)
+            self._preassembled_uuids = set()
+            self._preassembly_options = copy.deepcopy(options)
+        new_stmts = [stmt for stmt in stmts
+                     if stmt.uuid not in self._preassembled_uuids]
+        self._preassembled_uuids |= {stmt.uuid for stmt in new_stmts}
+        logger.info('%d new statements to preassemble' % len(new_stmts))
+        return new_stmts
+
     def load_prior(self, prior_fname):
         """Load a set of prior statements from a pickle file.
 
@@ -7,7 +7,8 @@ import argparse
 from flask import Flask, request, jsonify, abort, Response
 # Note: preserve EidosReader install as first one from indra
 from indra.sources.eidos.reader import EidosReader
-from indra.belief import BeliefEngine
+from indra.belief import BeliefEngine, SimpleScorer, tag_evidence_subtype, \
+    _get_random_noise_prior
 from indra.tools import assemble_corpus as ac
 from indra.belief.wm_scorer import get_eidos_bayesian_scorer
 from indra.statements import stmts_from_json_file, stmts_to_json
@@ -41,6 +42,98 @@ class Corpus(object):
         self.statements = {st.uuid: st for st in statements}
         self.raw_statements = [] if not raw_statements else raw_statements
         self.curations = {}
+        self.reset_beliefs()
+
+    def reset_beliefs(self):
+        """Clear the cached beliefs of the corpus.
+
+        This needs to be called if the Statements of the corpus are changed.
+        """
+        # The UUIDs of the Statements with evidence of each (source, subtype)
+        # tag and the probabilities of each tag when beliefs were last set
+        self._tag_uuids = None
+        self._tag_probs = None
+        self._prior_beliefs = None
+        # The beliefs last returned by get_beliefs
+        self._beliefs = {}
+
+    def update_prior_beliefs(self, scorer):
+        """Update the prior beliefs of the Statements given a scorer.
+
+        When the scorer is a SimpleScorer, e.g., a BayesianScorer, only the
+        Statements with evidence from sources or subtypes whose
+        probabilities changed since the last update are rescored.
+
+        Parameters
+        ----------
+        scorer : indra.belief.BeliefScorer
+            The scorer to compute the beliefs with.
+        """
+        if not isinstance(scorer, SimpleScorer):
+            self._prior_beliefs = None
+        if self._prior_beliefs is None:
+            stmts = list(self.statements.values())
+            self._tag_uuids = {}
+            for stmt in stmts:
+                for ev in stmt.evidence:
+                    tag = tag_evidence_subtype(ev)
+                    self._tag_uuids.setdefault(tag, set()).add(stmt.uuid)
+        else:
+            uuids = set()
+            for tag, probs in self._get_tag_probs(scorer).items():
+                if probs != self._tag_probs.get(tag):
+                    uuids |= self._tag_uuids[tag]
+            stmts = [self.statements[uuid] for uuid in uuids]
+        logger.info('Updating the prior beliefs of %d statements.' %
+                    len(stmts))
+        BeliefEngine(scorer, batch=True).set_prior_probs(stmts)
+        if self._prior_beliefs is None:
+            self._prior_beliefs = {}
+        self._prior_beliefs.update({st.uuid: st.belief for st in stmts})
+        if isinstance(scorer, SimpleScorer):
+            self._tag_probs = self._get_tag_probs(scorer)
+
+    def get_beliefs(self, delta=False):
+        """Return the beliefs of the Statements given their curations.
+
+        The beliefs are the prior beliefs set by `update_prior_beliefs` for
+        uncurated Statements and the curations themselves for curated ones.
+
+        Parameters
+        ----------
+        delta : Optional[bool]
+            If True, only the beliefs that changed since this method was
+            last called are returned. Default: False
+
+        Returns
+        -------
+        dict
+            A dict of beliefs keyed by Statement UUID.
+        """
+        beliefs = dict(self._prior_beliefs)
+        for uuid, correct in self.curations.items():
+            stmt = self.statements.get(uuid)
+            if stmt is None:
+                logger.warning('%s is not in the corpus.' % uuid)
+                continue
+            # The prior belief of a curated Statement may have just been
+            # set by update_prior_beliefs so it's reset here
+            stmt.belief = correct
+            beliefs[uuid] = correct
+        changed = {uuid: belief for uuid, belief in beliefs.items()
+                   if self._beliefs.get(uuid) != belief}
+        for uuid, belief in changed.items():
+            self.statements[uuid].belief = belief
+        self._beliefs = beliefs
+        return changed if delta else beliefs
+
+    def _get_tag_probs(self, scorer):
+        return {(source, subtype):
+                (_get_random_noise_prior(source, subtype,
+                                         scorer.prior_probs['rand'],
+                                         scorer.subtype_probs),
+                 scorer.prior_probs['syst'].get(source))
+                for source, subtype in self._tag_uuids}
 
     def __str__(self):
         return 'Corpus(%s -> %s)' % (str(self.statements), str(self.curations))
@@ -171,13 +264,19 @@ class LiveCurator(object):
         # Finally, we update the scorer with the new curation counts
         self.scorer.update_counts(prior_counts, subtype_counts)
 
-    def update_beliefs(self, corpus_id):
+    def update_beliefs(self, corpus_id, return_delta=False):
         """Return updated belief scores for a given corpus.
 
+        Only the Statements whose evidence sources had their probabilities
+        changed by curations since the last update are rescored.
+
         Parameters
         ----------
         corpus_id : str
             The ID of the corpus for which beliefs are to be updated.
+        return_delta : Optional[bool]
+            If True, only the belief scores that changed since the last
+            update are returned. Default: False
 
         Returns
         -------
@@ -186,18 +285,8 @@ class LiveCurator(object):
             UUIDs and values to new belief scores.
         """
         corpus = self.get_corpus(corpus_id)
-        be = BeliefEngine(self.scorer)
-        stmts = list(corpus.statements.values())
-        be.set_prior_probs(stmts)
-        # Here we set beliefs based on actual curation
-        for uuid, correct in corpus.curations.items():
-            stmt = corpus.statements.get(uuid)
-            if stmt is None:
-                logger.warning('%s is not in the corpus.' % uuid)
-                continue
-            stmt.belief = correct
-        belief_dict = {st.uuid: st.belief for st in stmts}
-        return belief_dict
+        corpus.update_prior_beliefs(self.scorer)
+        return corpus.get_beliefs(delta=return_delta)
 
     def update_groundings(self, corpus_id):
         corpus = self.get_corpus(corpus_id)
@@ -218,6 +307,7 @@ class LiveCurator(object):
                 idx += 1
         assembled_statements = default_assembly(corpus.raw_statements)
         corpus.statements = {s.uuid: s for s in assembled_statements}
+        corpus.reset_beliefs()
         return assembled_statements
 
 
@@ -267,13 +357,24 @@ def submit_curation():
 
 @app.route('/update_beliefs', methods=['POST'])
 def update_beliefs():
-    """Return updated beliefs based on current probability model."""
+    """Return updated beliefs based on current probability model.
+
+    Parameters
+    ----------
+    corpus_id : str
+        The ID of the corpus for which beliefs are to be updated.
+    return_delta : Optional[bool]
+        If True, only the beliefs that changed since the last update are
+        returned. Default: False
+    """
     if request.json is None:
         abort(Response('Missing application/json header.', 415))
     # Get input parameters
     corpus_id = request.json.get('corpus_id')
+    return_delta = request.json.get('return_delta', False)
     try:
-        belief_dict = curator.update_beliefs(corpus_id)
+        belief_dict = curator.update_beliefs(corpus_id,
+                                             return_delta=return_delta)
     except InvalidCorpusError:
         abort(Response('The corpus_id "%s" is unknown.' % corpus_id, 400))
         return
@@ -447,13 +447,19 @@ def run_machine(model_path, pmids, belief_threshold, search_genes=None,
     logger.info('Loading original model.')
     inc_model_file = os.path.join(model_path, 'model.pkl')
     model = IncrementalModel(inc_model_file)
+    # Load the state of preassembly from the previous run, if any, so that
+    # only new Statements need to be preassembled
+    preassembly_file = os.path.join(model_path, 'preassembly.pkl')
+    if os.path.exists(preassembly_file):
+        model.load_preassembly(preassembly_file)
     # Include search genes as prior genes
     if search_genes:
         model.prior_genes = search_genes
     stats = {}
     logger.info(time.strftime('%c'))
     logger.info('Preassembling original model.')
-    model.preassemble(filters=global_filters, grounding_map=grounding_map)
+    model.preassemble(filters=global_filters, grounding_map=grounding_map,
+                      incremental=True)
     logger.info(time.strftime('%c'))
 
     # Original statistics
@@ -472,7 +478,8 @@ def run_machine(model_path, pmids, belief_threshold, search_genes=None,
     stats['new_papers'], stats['new_abstracts'], stats['existing'] = \
         extend_model(model_path, model, pmids, start_time_local)
     # Having added new statements, we preassemble the model
-    model.preassemble(filters=global_filters, grounding_map=grounding_map)
+    model.preassemble(filters=global_filters, grounding_map=grounding_map,
+                      incremental=True)
 
     # New statistics
     stats['new_stmts'] = len(model.get_statements())
@@ -489,6 +496,7 @@ def run_machine(model_path, pmids, belief_threshold, search_genes=None,
     logger.info(time.strftime('%c'))
     logger.info('Saving model')
     model.save(inc_model_file)
+    model.save_preassembly(preassembly_file)
     logger.info(time.strftime('%c'))
 
     # Save a time stamped version of the pickle for backup/diagnostic purposes
@@ -151,7 +151,7 @@ def bel_process_pybel_neighborhood():
     response = request.body.read().decode('utf-8')
     body = json.loads(response)
     genes = body.get('genes')
-    bp = bel.process_pybel_neighborhood(genes)
+    bp = bel.process_pybel_neighborhood(genes, use_cache=True)
     return _stmts_from_proc(bp)
 
 